@@ -0,0 +1,82 @@
+"""Mede o início a frio da aplicação: processo novo até a primeira renderização.
+
+Cada medição roda em um processo Python novo, sem pré-aquecimento
+(``MATH_APP_PREWARM=0``), e usa o ``AppTest`` do Streamlit para executar o
+script como o servidor faria. Para cada ferramenta são medidos o tempo da
+primeira renderização da página inicial, o tempo até a ferramenta aparecer
+e quais bibliotecas pesadas já estavam carregadas em cada momento.
+
+Uso: python benchmarks/bench_cold_start.py [--repeat N]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "math_app.py")
+HEAVY = ("sympy", "numpy", "matplotlib")
+
+TOOLS = [
+    "Calculadora Básica",
+    "Resolvedor de Equações",
+    "Calculadora de Somatórios",
+    "Cálculos Avançados (Cálculo)",
+    "Calculadora Gráfica",
+]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+imported = time.perf_counter()
+at = AppTest.from_file({app!r}, default_timeout=120)
+at.run()
+first = time.perf_counter()
+loaded_first = [m for m in {heavy!r} if m in sys.modules]
+tool = {tool!r}
+if tool != at.sidebar.radio[0].value:
+    at.sidebar.radio[0].set_value(tool).run()
+done = time.perf_counter()
+print(json.dumps({{
+    "streamlit_import": imported - start,
+    "first_render": first - imported,
+    "tool_render": done - imported,
+    "loaded_first": loaded_first,
+    "loaded_tool": [m for m in {heavy!r} if m in sys.modules],
+    "errors": [str(e.value) for e in at.exception],
+}}))
+"""
+
+
+def measure(tool):
+    env = dict(os.environ, MATH_APP_PREWARM="0")
+    code = PROBE.format(app=APP, heavy=HEAVY, tool=tool)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                         env=env, cwd=ROOT, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="medições por ferramenta")
+    args = parser.parse_args()
+
+    header = f"{'ferramenta':30s} {'1ª renderização (ms)':>21s} {'até a ferramenta (ms)':>22s}  carregadas na 1ª / na ferramenta"
+    print(header)
+    print("-" * len(header))
+    for tool in TOOLS:
+        runs = [measure(tool) for _ in range(args.repeat)]
+        errors = [e for r in runs for e in r["errors"]]
+        first = statistics.median(r["first_render"] for r in runs) * 1000
+        total = statistics.median(r["tool_render"] for r in runs) * 1000
+        print(f"{tool:30s} {first:21.0f} {total:22.0f}  "
+              f"{','.join(runs[-1]['loaded_first']) or '-'} / {','.join(runs[-1]['loaded_tool']) or '-'}"
+              + (f"  ERROS: {errors}" if errors else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Compara as transformadas de Laplace do SymPy com o motor de regras.
+
+Para entradas típicas da aba (entradas de tabela, deslocamentos, ``t^n f(t)``
+e ``F(s)`` racionais), mede ``laplace_transform`` /
+``inverse_laplace_transform`` contra ``engine.laplace.transform`` (que
+inclui o LaTeX dos passos), com o cache interno do SymPy limpo antes de
+cada medida.
+
+Uso: python benchmarks/bench_laplace.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MATH_APP_WORKERS", "0")
+
+from sympy import inverse_laplace_transform, laplace_transform, symbols  # noqa: E402
+from sympy.core.cache import clear_cache  # noqa: E402
+
+from engine.laplace import TableMiss, transform  # noqa: E402
+from engine.parser import parse_expression  # noqa: E402
+
+FORWARD = ["t^3", "cos(2t + 1)", "t*exp(-a*t)", "exp(2t)*sin(3t)", "t^2*cos(t)",
+           "exp(-t)*cos(2t)*t", "(t + 1)^2*exp(-t)", "t*Heaviside(t - 1)*exp(t)"]
+INVERSE = ["1/(s^2 + 2s + 5)", "(s + 3)/((s + 1)(s + 2))", "5/(s^3 - 1)", "(2s + 1)/(s^2 - 4)",
+           "1/((s + 1)(s + 2)(s + 3)(s + 4))", "(s + 1)exp(-2s)/(s^2 + 4s + 13)", "(1 - exp(-s))/s^2"]
+
+t, s = symbols('t s')
+
+
+def timed_ms(func, *args, **kwargs):
+    clear_cache()
+    start = time.perf_counter()
+    try:
+        func(*args, **kwargs)
+    except TableMiss:
+        return float("nan")
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    print(f"{'entrada':36s} {'SymPy (ms)':>11s} {'regras (ms)':>12s}")
+    sympy_total = rules_total = 0.0
+    for inverse, inputs in ((False, FORWARD), (True, INVERSE)):
+        for text in inputs:
+            expr = parse_expression(text)
+            if inverse:
+                reference = timed_ms(inverse_laplace_transform, expr, s, t)
+            else:
+                reference = timed_ms(laplace_transform, expr, t, s, noconds=True)
+            rules = timed_ms(transform, expr, inverse=inverse)
+            sympy_total += reference
+            rules_total += rules
+            label = ("L⁻¹ " if inverse else "L ") + text
+            print(f"{label:36s} {reference:11.1f} {rules:12.1f}")
+    print(f"{'total':36s} {sympy_total:11.1f} {rules_total:12.1f}")
+
+
+if __name__ == "__main__":
+    main()
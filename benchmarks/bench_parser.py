@@ -0,0 +1,57 @@
+"""Compara o ``parse_expr`` cru com o leitor seguro e com cache.
+
+Para cada entrada mede a primeira leitura (cache vazio) e as repetidas
+(mesmo texto e variantes de escrita, como ``x^2`` e ``x ** 2``), e mostra o
+tempo até recusar entradas patológicas.
+
+Uso: python benchmarks/bench_parser.py
+"""
+
+import os
+import sys
+import time
+
+from sympy import parse_expr
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine.parser import ParseError, _parse_normalized, parse_expression  # noqa: E402
+
+INPUTS = [
+    ("x^3 * cos(x)", "x**3*cos(x)"),
+    ("sin(x) * exp(-x/10)", "sin(x)*exp(-x / 10)"),
+    ("x^2 - 5*x + 6", "x ** 2 - 5 * x + 6"),
+    ("t*exp(-a*t)", "t * exp(-a * t)"),
+    ("sqrt(x^2 + 1)/(x - 1)^3", "sqrt(x**2+1) / (x-1)**3"),
+]
+PATHOLOGICAL = ["9^9^9^9", "x" + "^x" * 400, "(" * 300 + "x" + ")" * 300, "100000!"]
+REPEAT = 200
+
+
+def timed_ms(func, *args):
+    start = time.perf_counter()
+    try:
+        func(*args)
+    except (ParseError, ValueError, SyntaxError, RecursionError):
+        pass
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    print(f"{'entrada':28s} {'parse_expr (ms)':>15s} {'1ª leitura (ms)':>15s} {'repetida (µs)':>14s} {'variante (µs)':>14s}")
+    for text, variant in INPUTS:
+        raw = sum(timed_ms(parse_expr, text.replace('^', '**')) for _ in range(20)) / 20
+        _parse_normalized.cache_clear()
+        first = timed_ms(parse_expression, text)
+        repeated = sum(timed_ms(parse_expression, text) for _ in range(REPEAT)) / REPEAT * 1000
+        again = sum(timed_ms(parse_expression, variant) for _ in range(REPEAT)) / REPEAT * 1000
+        print(f"{text:28s} {raw:15.3f} {first:15.3f} {repeated:14.1f} {again:14.1f}")
+
+    print()
+    print(f"{'entrada patológica':28s} {'recusada em (ms)':>16s}")
+    for text in PATHOLOGICAL:
+        print(f"{text[:28]:28s} {timed_ms(parse_expression, text):16.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Compara o desenho de famílias de curvas curva a curva com a grade difundida.
+
+Para cada família mede três caminhos até as curvas amostradas:
+
+- uma curva por pedido: substitui o valor do parâmetro, faz ``lambdify`` e
+  amostra a curva sozinha, como antes do gráfico com parâmetros;
+- família, primeira vez: compila a família uma vez (com eliminação de
+  subexpressões comuns) e amostra todas as curvas na grade (parâmetro × x);
+- família, controle deslizante: o mesmo, com a função já no cache, que é o
+  que custa mexer num parâmetro depois de plotar.
+
+Uso: python benchmarks/bench_plot_family.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+from sympy import cos, exp, lambdify, sin, symbols, tan
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import compiled  # noqa: E402
+from engine.plotting import adaptive_sample, adaptive_sample_family  # noqa: E402
+
+x, a = symbols('x a')
+FAMILIES = [
+    [sin(a * x) * exp(-x / 10)],
+    [sin(a * x)**2 + sin(a * x) * cos(a * x)],
+    [tan(a * x)],
+    [sin(a * x), cos(a * x) / (1 + a * x**2)],
+]
+X_RANGE = (-10.0, 10.0)
+VALUES = np.linspace(0.5, 5.0, 12)
+POINTS = 1000
+REPEATS = 5
+
+
+def per_curve(exprs):
+    return [adaptive_sample(lambdify(x, expr.subs(a, value), "numpy"), *X_RANGE, POINTS)
+            for expr in exprs for value in VALUES]
+
+
+def family(exprs):
+    f = compiled.compile_numeric(exprs, (x, a))
+    return adaptive_sample_family(f, *X_RANGE, POINTS, (VALUES[:, np.newaxis],), len(VALUES))
+
+
+def best_ms(func, *args, cold=False):
+    times = []
+    for _ in range(REPEATS):
+        if cold:
+            compiled._compile.cache_clear()
+        start = time.perf_counter()
+        func(*args)
+        times.append((time.perf_counter() - start) * 1000)
+    return min(times)
+
+
+def main():
+    header = f"{'família':44s} {'curvas':>6s} {'curva a curva':>14s} {'1ª vez':>8s} {'controle':>9s}"
+    print(header + "   (ms, melhor de %d)" % REPEATS)
+    print("-" * len(header))
+    for exprs in FAMILIES:
+        label = "; ".join(str(expr) for expr in exprs)
+        print(f"{label[:44]:44s} {len(exprs) * len(VALUES):6d} {best_ms(per_curve, exprs):14.1f} "
+              f"{best_ms(family, exprs, cold=True):8.1f} {best_ms(family, exprs):9.1f}")
+    print(f"\ncache: {compiled.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Compara a amostragem adaptativa com a uniforme de 1000/5000 pontos.
+
+Para cada função mede o número de avaliações, os pontos enviados ao
+navegador, o tamanho do payload JSON e o erro de interpolação em relação a
+uma referência densa (percentil 99, relativo à faixa visível).
+
+Uso: python benchmarks/bench_plot_sampling.py
+"""
+
+import json
+import os
+import sys
+import time
+
+import numpy as np
+from sympy import exp, floor, lambdify, sin, sqrt, symbols, tan, tanh
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine.plotting import adaptive_sample, uniform_sample  # noqa: E402
+
+x = symbols('x')
+FUNCTIONS = [
+    sin(x) * exp(-x / 10),
+    x**3 - 5 * x,
+    tan(x),
+    1 / x,
+    sqrt(x),
+    tanh(20 * x),
+    sin(1 / x),
+    floor(x),
+    x / x,
+]
+X_RANGE = (-10.0, 10.0)
+REFERENCE_POINTS = 200_001
+
+
+def payload_bytes(data):
+    ys = [None if np.isnan(v) else float(f"{v:.6g}") for v in data.y]
+    xs = [float(f"{v:.6g}") for v in data.x]
+    return len(json.dumps({"x": xs, "y": ys}))
+
+
+def interpolation_error(data, f):
+    """Percentil 99 do erro de interpolação linear, relativo à faixa visível."""
+    xr = np.linspace(*X_RANGE, REFERENCE_POINTS)
+    with np.errstate(all="ignore"):
+        yr = np.broadcast_to(np.asarray(f(xr), dtype=complex), xr.shape)
+    yr = np.where(np.abs(yr.imag) < 1e-12, yr.real, np.nan)
+    low, high = data.y_limits
+    yi = np.interp(xr, data.x, np.clip(data.y, low, high))
+    mask = np.isfinite(yr) & np.isfinite(yi) & (yr >= low) & (yr <= high)
+    if not mask.any():
+        return float("nan")
+    return float(np.percentile(np.abs(yi[mask] - yr[mask]), 99) / (high - low))
+
+
+def main():
+    header = f"{'função':22s} {'modo':14s} {'avaliações':>10s} {'pontos':>7s} {'payload (B)':>12s} {'erro p99':>9s} {'tempo (ms)':>10s}"
+    print(header)
+    print("-" * len(header))
+    for expr in FUNCTIONS:
+        f = lambdify(x, expr, "numpy")
+        modes = [
+            ("uniforme 1000", lambda: uniform_sample(f, *X_RANGE, 1000)),
+            ("uniforme 5000", lambda: uniform_sample(f, *X_RANGE, 5000)),
+            ("adaptativa 1000", lambda: adaptive_sample(f, *X_RANGE, 1000)),
+            ("adaptativa 5000", lambda: adaptive_sample(f, *X_RANGE, 5000)),
+        ]
+        for name, sample in modes:
+            start = time.perf_counter()
+            data = sample()
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"{str(expr):22s} {name:14s} {data.evaluations:10d} {len(data.x):7d} "
+                  f"{payload_bytes(data):12d} {interpolation_error(data, f):9.2e} {elapsed:10.2f}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
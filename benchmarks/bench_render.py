@@ -0,0 +1,83 @@
+"""Mede o custo do LaTeX e do envio do passo a passo em saídas longas.
+
+Para uma derivada de ordem alta e uma série de Taylor longa, compara:
+
+* o tempo de gerar o LaTeX de todas as expressões dos passos sem cache
+  (``sympy.latex`` a cada uso) e com o cache de ``engine.render``;
+* o tamanho do passo a passo abreviado e completo;
+* quantas mensagens o navegador recebe: três por fórmula e uma por texto no
+  ``render_steps`` antigo, uma só no atual.
+
+Uso: python benchmarks/bench_render.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MATH_APP_WORKERS", "0")
+
+from sympy import Integer, diff, latex, symbols, sympify  # noqa: E402
+
+from engine.derivative import compute_derivative  # noqa: E402
+from engine.render import _latex, _tex, full_latex, tex  # noqa: E402
+from engine.taylor import compute_taylor  # noqa: E402
+
+x = symbols('x')
+CASES = [
+    ("derivada 8ª de x^x sin(x)", lambda: compute_derivative(sympify("x**x*sin(x)"), 8)),
+    ("Taylor ordem 30 de e^sin(x)/(1-x)", lambda: compute_taylor(sympify("exp(sin(x))/(1 - x)"), Integer(0), 30)),
+]
+
+
+def clear():
+    _tex.cache_clear()
+    _latex.cache_clear()
+
+
+def expressions(expr, order):
+    """As expressões que um passo a passo de derivada converte, com as repetições."""
+    chain = [expr]
+    for _ in range(order):
+        chain.append(diff(chain[-1], x))
+    # Cada derivada aparece no passo dela e é reusada no seguinte.
+    return chain + chain[1:]
+
+
+def timed_ms(func):
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+
+def messages(steps):
+    formulas = sum(1 for s in steps if isinstance(s, tuple) or (s.startswith("$$") and s.endswith("$$")))
+    return 3 * formulas + (len(steps) - formulas)
+
+
+def main():
+    exprs = expressions(sympify("x**x*sin(x)"), 8)
+    plain = timed_ms(lambda: [latex(e) for e in exprs])
+    clear()
+    cold = timed_ms(lambda: [tex(e) for e in exprs])
+    warm = timed_ms(lambda: [tex(e) for e in exprs])
+    print(f"LaTeX de {len(exprs)} expressões (derivadas 0–8 de x^x sin(x), cada uma usada duas vezes):")
+    print(f"  sympy.latex a cada uso: {plain:8.1f} ms")
+    print(f"  tex, cache vazio:       {cold:8.1f} ms (abreviando as grandes)")
+    print(f"  tex, cache cheio:       {warm:8.1f} ms")
+    print()
+
+    print(f"{'saída':32s} {'abreviada (KB)':>15s} {'completa (KB)':>14s} {'msgs antes':>11s} {'msgs agora':>11s}")
+    for name, build in CASES:
+        clear()
+        _, steps = build()
+        with full_latex():
+            _, full_steps = build()
+        size = sum(len(str(s)) for s in steps) / 1024
+        full_size = sum(len(str(s)) for s in full_steps) / 1024
+        print(f"{name:32s} {size:15.1f} {full_size:14.1f} {messages(steps):11d} {1:11d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+"""Mede quantas execuções do script e quanto CPU do servidor custa cada interação.
+
+Sobe a aplicação com ``streamlit run`` e a dirige pelo mesmo websocket que o
+navegador usa, imitando o que ele envia: um campo fora de formulário pede uma
+execução assim que muda, e um campo de formulário só segue junto com o envio.
+Em cada ferramenta, uma interação é o caso típico "mudar os campos e clicar
+no botão", alternando entre dois conjuntos de entradas para que toda mudança
+seja de fato uma mudança.
+
+Para cada interação são contadas as execuções (completas e só do fragmento),
+o tempo de CPU do servidor e dos processos filhos (workers do pool), os bytes
+recebidos e o tempo de relógio. A tabela mostra a mediana das repetições e
+quantas interações por segundo um núcleo aguenta com esse custo.
+
+Os cálculos em si ficam no cache de resultados depois do aquecimento, então
+os números medem o custo da interface (execução do script, CSS, barra lateral,
+widgets) e não o do SymPy.
+
+Uso:
+    python benchmarks/bench_reruns.py
+    python benchmarks/bench_reruns.py --tools integral,plot --repeat 20
+    python benchmarks/bench_reruns.py --app /tmp/antes/math_app.py   # outra versão do app
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from websockets.sync.client import connect
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ADVANCED = "Cálculos Avançados (Cálculo)"
+PAGE_RADIO = "Escolha uma ferramenta:"
+
+# Página, cálculo escolhido nela, botão e os dois conjuntos de entradas de
+# cada ferramenta. Campos sem chave na versão antiga do app são achados pelo
+# rótulo.
+TOOLS = {
+    "basic": ("Calculadora Básica", None, "basic_calc", [
+        {"basic_num1": 2.5, "basic_num2": 4.0},
+        {"basic_num1": 7.0, "basic_num2": 3.0},
+    ]),
+    "solve": ("Resolvedor de Equações", None, "poly_solve", [
+        {"poly_equation": "x^2 - 5x + 6 = 0"},
+        {"poly_equation": "x^3 - x = 0"},
+    ]),
+    "summation": ("Calculadora de Somatórios", None, "sum_calc", [
+        {"sum_expr": "k^3", "sum_upper": 20},
+        {"sum_expr": "1/k^2", "sum_upper": 50},
+    ]),
+    "derivative": (ADVANCED, "Derivada", "deriv_calc", [
+        {"deriv_func": "x^2 sin(x)", "deriv_order": 2},
+        {"deriv_func": "exp(x) cos(x)", "deriv_order": 3},
+    ]),
+    "integral": (ADVANCED, "Integral", "int_calc", [
+        {"int_func": "x exp(x)"},
+        {"int_func": "cos(x)^2"},
+    ]),
+    "limit": (ADVANCED, "Limite", "lim_calc", [
+        {"lim_func": "(1 - cos(x))/x^2", "lim_point": "0"},
+        {"lim_func": "(x^2 - 1)/(x - 1)", "lim_point": "1"},
+    ]),
+    "taylor": (ADVANCED, "Série de Taylor", "taylor_calc", [
+        {"taylor_func": "sin(x)", "taylor_n": 5},
+        {"taylor_func": "log(1 + x)", "taylor_n": 4},
+    ]),
+    "laplace": (ADVANCED, "Transformada de Laplace", "transf_calc", [
+        {"transf_func": "t^2 exp(-t)"},
+        {"transf_func": "sin(2t)"},
+    ]),
+    "plot": ("Calculadora Gráfica", None, "plot_func", [
+        {"graph_func": "sin(x)/x", "X máximo:": 12.0},
+        {"graph_func": "x^3 - 3x", "X máximo:": 8.0},
+    ]),
+}
+
+SERVER_TIMEOUT = 60.0
+RUN_TIMEOUT = 120.0
+
+
+class Widget:
+    def __init__(self, kind, proto, fragment_id):
+        self.kind = kind
+        self.id = proto.id
+        self.label = getattr(proto, "label", "")
+        self.form_id = getattr(proto, "form_id", "")
+        self.fragment_id = fragment_id
+
+
+class Client:
+    """Sessão do navegador: guarda o valor de cada campo e conta as execuções."""
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.widgets = {}
+        self.states = {}
+        self.pending = {}
+        self.full_runs = self.fragment_runs = self.bytes = self.errors = 0
+        self._rerun(None)
+
+    def find(self, name):
+        """Campo pela chave (fim do id) ou, na falta dela, pelo rótulo."""
+        for widget in self.widgets.values():
+            if widget.id.endswith(f"-{name}"):
+                return widget
+        for widget in self.widgets.values():
+            if widget.label == name:
+                return widget
+        raise KeyError(name)
+
+    def has(self, name):
+        try:
+            self.find(name)
+        except KeyError:
+            return False
+        return True
+
+    def set(self, name, value):
+        """Muda um campo; fora de um formulário, isso já executa o script."""
+        widget = self.find(name)
+        state = WidgetState(id=widget.id)
+        if isinstance(value, bool):
+            state.bool_value = value
+        elif widget.kind == "number_input":
+            state.double_value = value
+        elif widget.kind == "button_group":
+            state.string_array_value.data.append(value)
+        else:
+            state.string_value = value
+        if widget.form_id:
+            self.pending[widget.id] = state
+        else:
+            self.states[widget.id] = state
+            self._rerun(widget.fragment_id)
+
+    def click(self, name):
+        """Clica no botão, enviando junto o que foi digitado no formulário dele."""
+        widget = self.find(name)
+        self.states.update(self.pending)
+        self.pending.clear()
+        self._rerun(widget.fragment_id, trigger=widget.id)
+
+    def _rerun(self, fragment_id, trigger=None):
+        msg = BackMsg()
+        client = msg.rerun_script
+        client.query_string = ""
+        client.page_script_hash = ""
+        if fragment_id:
+            client.fragment_id = fragment_id
+        client.widget_states.widgets.extend(self.states.values())
+        if trigger:
+            client.widget_states.widgets.append(WidgetState(id=trigger, trigger_value=True))
+        self.ws.send(msg.SerializeToString())
+        self._receive()
+
+    def _receive(self):
+        deadline = time.monotonic() + RUN_TIMEOUT
+        while True:
+            data = self.ws.recv(timeout=max(deadline - time.monotonic(), 0.1))
+            self.bytes += len(data)
+            message = ForwardMsg()
+            message.ParseFromString(data)
+            kind = message.WhichOneof("type")
+            if kind == "delta" and message.delta.WhichOneof("type") == "new_element":
+                element = message.delta.new_element
+                element_kind = element.WhichOneof("type")
+                if element_kind == "exception":
+                    self.errors += 1
+                proto = getattr(element, element_kind)
+                if getattr(proto, "id", "").startswith("$$ID"):
+                    self.widgets[proto.id] = Widget(element_kind, proto, message.delta.fragment_id)
+            elif kind == "script_finished":
+                if message.script_finished == ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY:
+                    self.fragment_runs += 1
+                    return
+                if message.script_finished == ForwardMsg.FINISHED_SUCCESSFULLY:
+                    self.full_runs += 1
+                    return
+                if message.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    raise RuntimeError("o script não compilou")
+
+
+def _cpu_ms(root):
+    """CPU (usuário + sistema) do processo ``root`` e descendentes, em ms."""
+    stats = {}
+    for pid in os.listdir("/proc"):
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        # Campos depois do nome: ppid é o 2º; utime, stime, cutime e cstime, do 12º ao 15º.
+        stats[int(pid)] = (int(fields[1]), sum(int(v) for v in fields[11:15]))
+    ticks, tree = 0, {root}
+    changed = True
+    while changed:
+        changed = False
+        for pid, (ppid, _) in stats.items():
+            if ppid in tree and pid not in tree:
+                tree.add(pid)
+                changed = True
+    for pid in tree:
+        ticks += stats.get(pid, (0, 0))[1]
+    return ticks * 1000 / os.sysconf("SC_CLK_TCK")
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(app):
+    port = _free_port()
+    # O pré-aquecimento em segundo plano gastaria CPU no meio das medidas.
+    env = dict(os.environ, PYTHONPATH=ROOT, MATH_APP_PREWARM="0")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", app, "--server.headless", "true",
+         "--server.port", str(port), "--browser.gatherUsageStats", "false"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + SERVER_TIMEOUT
+    while True:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1)
+            return process, port
+        except OSError:
+            if process.poll() is not None or time.monotonic() > deadline:
+                process.kill()
+                raise RuntimeError("o servidor do Streamlit não subiu")
+            time.sleep(0.2)
+
+
+def interact(client, button, values):
+    for name, value in values.items():
+        client.set(name, value)
+    client.click(button)
+
+
+def measure(process, port, tool, repeat):
+    page, tab, button, cases = TOOLS[tool]
+    with connect(f"ws://127.0.0.1:{port}/_stcore/stream", subprotocols=["streamlit"],
+                 max_size=None, open_timeout=SERVER_TIMEOUT) as ws:
+        client = Client(ws)
+        client.set(PAGE_RADIO, page)
+        if tab and client.has("adv_tab"):
+            client.set("adv_tab", tab)
+        # Aquecimento: os dois conjuntos de entradas vão para o cache de resultados.
+        for values in cases:
+            interact(client, button, values)
+        rows = []
+        for i in range(repeat):
+            before = (client.full_runs, client.fragment_runs, client.bytes, client.errors)
+            cpu, start = _cpu_ms(process.pid), time.perf_counter()
+            interact(client, button, cases[i % len(cases)])
+            wall, cpu = (time.perf_counter() - start) * 1000, _cpu_ms(process.pid) - cpu
+            after = (client.full_runs, client.fragment_runs, client.bytes, client.errors)
+            rows.append((*(b - a for a, b in zip(before, after)), cpu, wall))
+    full, fragment, received, errors, cpu, wall = zip(*rows)
+    return {
+        "full": statistics.median(full),
+        "fragment": statistics.median(fragment),
+        "kb": statistics.median(received) / 1024,
+        "cpu_ms": statistics.median(cpu),
+        "wall_ms": statistics.median(wall),
+        "errors": sum(errors),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app", default=os.path.join(ROOT, "math_app.py"), help="script do Streamlit medido")
+    parser.add_argument("--tools", default=",".join(TOOLS), help="ferramentas separadas por vírgula")
+    parser.add_argument("--repeat", type=int, default=10, help="interações medidas por ferramenta")
+    args = parser.parse_args(argv)
+
+    tools = [tool.strip() for tool in args.tools.split(",") if tool.strip()]
+    unknown = [tool for tool in tools if tool not in TOOLS]
+    if unknown:
+        parser.error(f"ferramentas desconhecidas: {', '.join(unknown)}")
+
+    process, port = start_server(args.app)
+    try:
+        header = (f"{'ferramenta':12s} {'completas':>9s} {'fragmento':>9s} {'KB':>7s} "
+                  f"{'CPU (ms)':>9s} {'relógio (ms)':>12s} {'interações/s/núcleo':>20s} erros")
+        print(f"{args.app}, mediana de {args.repeat} interações por ferramenta")
+        print(header)
+        print("-" * len(header))
+        for tool in tools:
+            row = measure(process, port, tool, args.repeat)
+            rate = 1000 / row["cpu_ms"] if row["cpu_ms"] else float("inf")
+            print(f"{tool:12s} {row['full']:9g} {row['fragment']:9g} {row['kb']:7.1f} "
+                  f"{row['cpu_ms']:9.1f} {row['wall_ms']:12.1f} {rate:20.1f} {row['errors']:5d}")
+    finally:
+        # SIGTERM deixa o Streamlit encerrar o pool de workers.
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+if __name__ == "__main__":
+    main()
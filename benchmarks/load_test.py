@@ -0,0 +1,390 @@
+"""Teste de carga reprodutível de todas as ferramentas, com comparação contra uma linha de base.
+
+Cada ferramenta tem um corpus de entradas típicas e adversárias (derivadas de
+ordem alta, integrais não elementares, polinômios de grau 10, somatórios com
+limites enormes, transformadas inversas de funções racionais...). O teste
+dirige a aplicação de verdade pelo ``AppTest`` do Streamlit: N sessões
+simuladas percorrem o corpus ao mesmo tempo, cada uma começando num ponto
+diferente dele, preenchendo os campos e clicando no botão como um usuário.
+A latência de uma interação vai do clique até o fim da execução do script,
+com o resultado desenhado; uma primeira interação, fora da medida, aquece
+cada sessão.
+
+O ``AppTest`` não aceita execuções simultâneas no mesmo processo (o
+``Runtime`` dele é global), então cada sessão roda num processo próprio,
+com seus workers; todas começam juntas, depois de abrir a ferramenta. Por
+padrão o cache de resultados fica desligado (``MATH_APP_CACHE_SIZE=0``),
+para que toda interação calcule de fato; ``--warm-cache`` o mantém.
+
+Para cada ferramenta são relatados p50/p95/p99 da latência, a vazão
+(interações/s somando as sessões), o pico de RSS (soma dos processos das
+sessões e de seus workers, amostrada em /proc) e as interações que
+terminaram em erro. Os números são comparados com ``load_baseline.json``:
+uma piora além da tolerância faz o teste terminar com código 1.
+
+Uso: python benchmarks/load_test.py [--sessions N] [--rounds R] [--tools derivative,plot]
+     python benchmarks/load_test.py --update-baseline
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# As sessões (e os workers delas) herdam este caminho para importar o ``engine``.
+sys.path.insert(0, ROOT)
+
+APP = os.path.join(ROOT, "math_app.py")
+BASELINE = os.path.join(ROOT, "benchmarks", "load_baseline.json")
+# Tempo máximo (s) de uma execução do script no AppTest.
+RUN_TIMEOUT = 120
+# Intervalo (s) entre as amostras de RSS.
+RSS_INTERVAL = 0.1
+# Folga absoluta (ms) nas latências, para que medidas de poucos ms não oscilem entre passar e falhar.
+LATENCY_SLACK_MS = 25
+
+ADVANCED = "Cálculos Avançados (Cálculo)"
+
+# Página da barra lateral, cálculo escolhido nela (Cálculos Avançados) e botão
+# de cada ferramenta (nomes das métricas do engine).
+TOOLS = {
+    "basic": ("Calculadora Básica", None, "basic_calc"),
+    "solve": ("Resolvedor de Equações", None, "poly_solve"),
+    "summation": ("Calculadora de Somatórios", None, "sum_calc"),
+    "derivative": (ADVANCED, "Derivada", "deriv_calc"),
+    "integral": (ADVANCED, "Integral", "int_calc"),
+    "limit": (ADVANCED, "Limite", "lim_calc"),
+    "taylor": (ADVANCED, "Série de Taylor", "taylor_calc"),
+    "laplace": (ADVANCED, "Transformada de Laplace", "transf_calc"),
+    "plot": ("Calculadora Gráfica", None, "plot_func"),
+}
+
+# Corpus de cada ferramenta: (rótulo, valores dos campos, na ordem em que são preenchidos).
+CORPUS = {
+    "basic": [
+        ("2 ^ 10", {"basic_num1": 2.0, "basic_op": "^", "basic_num2": 10.0}),
+        ("1.0001 ^ 100000", {"basic_num1": 1.0001, "basic_op": "^", "basic_num2": 100000.0}),
+    ],
+    "solve": [
+        ("x^2 - 4", {"poly_equation": "x^2 - 4 = 0", "poly_numeric": False}),
+        ("grau 10 esparso", {"poly_equation": "x^10 - 3x^7 + x^2 - 1 = 0", "poly_numeric": False}),
+        ("x^10 - 1", {"poly_equation": "x^10 - 1 = 0", "poly_numeric": False}),
+        ("quíntica sem radicais", {"poly_equation": "x^5 - x + 1 = 0", "poly_numeric": False}),
+        ("x^4 + 1 numérica, 50 dígitos", {"poly_equation": "x^4 + 1 = 0", "poly_numeric": True, "poly_digits": 50}),
+    ],
+    "summation": [
+        ("k^2, 1..10", {"sum_expr": "k^2", "sum_var": "k", "sum_lower": 1, "sum_upper": 10}),
+        ("1/k^2, 1..10^6", {"sum_expr": "1/k^2", "sum_var": "k", "sum_lower": 1, "sum_upper": 10**6}),
+        ("1/(k(k+1)), 1..10^9", {"sum_expr": "1/(k*(k+1))", "sum_var": "k", "sum_lower": 1, "sum_upper": 10**9}),
+        ("sin(k)/k^2, 1..10^5", {"sum_expr": "sin(k)/k^2", "sum_var": "k", "sum_lower": 1, "sum_upper": 10**5}),
+        ("cos(k)^2/sqrt(k), 1..10^7", {"sum_expr": "cos(k)^2/sqrt(k)", "sum_var": "k", "sum_lower": 1,
+                                       "sum_upper": 10**7}),
+        ("k^3 2^k, 1..50", {"sum_expr": "k^3*2^k", "sum_var": "k", "sum_lower": 1, "sum_upper": 50}),
+    ],
+    "derivative": [
+        ("x^3 cos(x)", {"deriv_func": "x**3 * cos(x)", "deriv_order": 1}),
+        ("x^2 e^x sin(x), ordem 10", {"deriv_func": "x^2*exp(x)*sin(x)", "deriv_order": 10}),
+        ("(x^2+1)/(x-1), ordem 10", {"deriv_func": "(x^2+1)/(x-1)", "deriv_order": 10}),
+        ("e^sin(x), ordem 6", {"deriv_func": "exp(sin(x))", "deriv_order": 6}),
+    ],
+    "integral": [
+        ("x^2 + sin(x)", {"int_type": "Indefinida", "int_func": "x^2 + sin(x)"}),
+        ("e^(-x^2) (erf)", {"int_type": "Indefinida", "int_func": "exp(-x^2)"}),
+        ("1/(x^4+1)", {"int_type": "Indefinida", "int_func": "1/(x^4+1)"}),
+        ("sin(x)/x, 0..1", {"int_type": "Definida", "int_func": "sin(x)/x", "int_a": "0", "int_b": "1"}),
+        ("e^(-x^2) cos(x^3), 0..2", {"int_type": "Definida", "int_func": "exp(-x^2)*cos(x^3)",
+                                     "int_a": "0", "int_b": "2"}),
+        ("x^x, 0..1", {"int_type": "Definida", "int_func": "x^x", "int_a": "0", "int_b": "1"}),
+    ],
+    "limit": [
+        ("sin(x)/x, 0", {"lim_func": "sin(x)/x", "lim_point": "0", "lim_dir": "bilateral", "lim_numeric": False}),
+        ("(1+1/x)^x, oo", {"lim_func": "(1+1/x)^x", "lim_point": "oo", "lim_dir": "bilateral",
+                           "lim_numeric": False}),
+        ("(sin(x)-x)/x^3, 0", {"lim_func": "(sin(x)-x)/x^3", "lim_point": "0", "lim_dir": "bilateral",
+                               "lim_numeric": False}),
+        ("x^x, 0+", {"lim_func": "x^x", "lim_point": "0", "lim_dir": "pela direita (+)", "lim_numeric": False}),
+        ("(tan(x)-sin(x))/x^3, sonda", {"lim_func": "(tan(x)-sin(x))/x^3", "lim_point": "0",
+                                        "lim_dir": "bilateral", "lim_numeric": True}),
+    ],
+    "taylor": [
+        ("e^x, ordem 4", {"taylor_func": "exp(x)", "taylor_x0": "0", "taylor_n": 4}),
+        ("sin(x)/(1-x), ordem 20", {"taylor_func": "sin(x)/(1-x)", "taylor_x0": "0", "taylor_n": 20}),
+        ("tan(x), ordem 30", {"taylor_func": "tan(x)", "taylor_x0": "0", "taylor_n": 30}),
+        ("log(1+x) em 1, ordem 10", {"taylor_func": "log(1+x)", "taylor_x0": "1", "taylor_n": 10}),
+    ],
+    "laplace": [
+        ("t e^(-at)", {"transf_type": "Direta", "transf_func": "t*exp(-a*t)"}),
+        ("e^(2t) sin(3t)", {"transf_type": "Direta", "transf_func": "exp(2t)*sin(3t)"}),
+        ("t^2 cos(t)", {"transf_type": "Direta", "transf_func": "t^2*cos(t)"}),
+        ("1/((s+1)(s+2)(s+3)(s+4))", {"transf_type": "Inversa", "transf_func": "1/((s+1)(s+2)(s+3)(s+4))"}),
+        ("(s+1)e^(-2s)/(s^2+4s+13)", {"transf_type": "Inversa", "transf_func": "(s+1)exp(-2s)/(s^2+4s+13)"}),
+        ("5/(s^3-1)", {"transf_type": "Inversa", "transf_func": "5/(s^3-1)"}),
+    ],
+    "plot": [
+        ("sin(x) e^(-x/10)", {"graph_func": "sin(x) * exp(-x/10)"}),
+        ("tan(x)", {"graph_func": "tan(x)"}),
+        ("sin(1/x)", {"graph_func": "sin(1/x)"}),
+        ("3 curvas", {"graph_func": "sin(x); cos(2x); x^3/100"}),
+        ("sin(a x), parâmetro", {"graph_func": "sin(a*x) * exp(-x^2/20)"}),
+    ],
+}
+
+WIDGET_KINDS = ("text_input", "number_input", "selectbox", "radio", "checkbox", "slider", "segmented_control")
+
+
+def _widget(at, key):
+    for kind in WIDGET_KINDS:
+        try:
+            return getattr(at, kind)(key=key)
+        except KeyError:
+            continue
+    return None
+
+
+def _fill(at, values):
+    """Preenche os campos para o próximo envio.
+
+    Se um campo só aparece depois de outro (os limites de uma integral
+    definida), executa uma vez e preenche tudo de novo: o que foi digitado
+    num formulário se perde numa execução sem envio.
+    """
+    if any(_widget(at, key) is None for key in values):
+        for key, value in values.items():
+            widget = _widget(at, key)
+            if widget is not None:
+                widget.set_value(value)
+        at.run()
+    for key, value in values.items():
+        _widget(at, key).set_value(value)
+
+
+def _session(tool, index, rounds, barrier, results):
+    """Uma sessão simulada: abre a ferramenta e percorre o corpus ``rounds`` vezes."""
+    from streamlit.testing.v1 import AppTest
+
+    page, tab, button = TOOLS[tool]
+    cases = CORPUS[tool]
+    cases = cases[index % len(cases):] + cases[:index % len(cases)]
+    at = AppTest.from_file(APP, default_timeout=RUN_TIMEOUT)
+    at.run()
+    at.sidebar.radio[0].set_value(page).run()
+    if tab:
+        at.segmented_control(key="adv_tab").set_value(tab).run()
+    # Uma interação fora da medida aquece o processo (importações e pool de workers).
+    _fill(at, cases[0][1])
+    at.button(key=button).click().run()
+    barrier.wait()
+
+    samples = []
+    for _ in range(rounds):
+        for label, values in cases:
+            _fill(at, values)
+            start = time.perf_counter()
+            at.button(key=button).click().run()
+            elapsed = time.perf_counter() - start
+            errors = [e.value for e in at.error] + [str(e.value) for e in at.exception]
+            samples.append((label, elapsed, errors))
+    results.put((index, samples, time.time()))
+
+
+def _tree_rss_mb(root):
+    """RSS somado do processo ``root`` e de todos os seus descendentes, em MB (Linux)."""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    total, stack = 0, [root]
+    while stack:
+        pid = stack.pop()
+        stack.extend(children.get(pid, ()))
+        try:
+            with open(f"/proc/{pid}/statm") as f:
+                total += int(f.read().split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+    return total * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+class RssSampler(threading.Thread):
+    """Acompanha o pico de RSS deste processo e de seus descendentes."""
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.peak = 0.0
+        self._finished = threading.Event()
+
+    def run(self):
+        if not os.path.isdir("/proc"):
+            return
+        while not self._finished.wait(RSS_INTERVAL):
+            self.peak = max(self.peak, _tree_rss_mb(os.getpid()))
+
+    def stop(self):
+        self._finished.set()
+        self.join()
+        if not self.peak:
+            # Sem /proc: fica com o pico do próprio processo (ru_maxrss em KB no Linux).
+            self.peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        return self.peak
+
+
+def run_tool(tool, sessions, rounds, warm_cache):
+    """Roda as sessões da ferramenta ao mesmo tempo e resume as medidas."""
+    if not warm_cache:
+        os.environ["MATH_APP_CACHE_SIZE"] = "0"
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(sessions + 1)
+    results = context.Queue()
+    sampler = RssSampler()
+    sampler.start()
+    processes = [context.Process(target=_session, args=(tool, i, rounds, barrier, results))
+                 for i in range(sessions)]
+    for process in processes:
+        process.start()
+    barrier.wait(timeout=RUN_TIMEOUT)
+    start = time.time()
+    finished = [results.get(timeout=RUN_TIMEOUT * len(CORPUS[tool]) * rounds) for _ in processes]
+    for process in processes:
+        process.join()
+    peak_rss = sampler.stop()
+
+    samples = [sample for _, session_samples, _ in finished for sample in session_samples]
+    wall = max(end for _, _, end in finished) - start
+    latencies = sorted(elapsed * 1000 for _, elapsed, _ in samples)
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    failures = sorted({f"{label}: {errors[0][:80]}" for label, _, errors in samples if errors})
+    return {
+        "interactions": len(samples),
+        "p50_ms": round(cuts[49], 1),
+        "p95_ms": round(cuts[94], 1),
+        "p99_ms": round(cuts[98], 1),
+        "throughput": round(len(samples) / wall, 2),
+        "peak_rss_mb": round(peak_rss, 1),
+        "errors": sum(1 for _, _, errors in samples if errors),
+        "failures": failures,
+    }
+
+
+def compare(tool, current, base, tolerance, rss_tolerance):
+    """Lista as pioras de ``current`` em relação a ``base`` além das tolerâncias."""
+    problems = []
+    for metric in ("p50_ms", "p95_ms", "p99_ms"):
+        limit = base[metric] * (1 + tolerance) + LATENCY_SLACK_MS
+        if current[metric] > limit:
+            problems.append(f"{tool}: {metric} {current[metric]:.0f} ms > {limit:.0f} ms "
+                            f"(linha de base {base[metric]:.0f} ms)")
+    if current["throughput"] < base["throughput"] / (1 + tolerance):
+        problems.append(f"{tool}: vazão {current['throughput']:.2f}/s < "
+                        f"{base['throughput'] / (1 + tolerance):.2f}/s (linha de base {base['throughput']:.2f}/s)")
+    if current["peak_rss_mb"] > base["peak_rss_mb"] * (1 + rss_tolerance):
+        problems.append(f"{tool}: RSS pico {current['peak_rss_mb']:.0f} MB > "
+                        f"{base['peak_rss_mb'] * (1 + rss_tolerance):.0f} MB (linha de base {base['peak_rss_mb']:.0f} MB)")
+    if current["errors"] > base["errors"]:
+        problems.append(f"{tool}: {current['errors']} interações com erro (linha de base {base['errors']})")
+    return problems
+
+
+def _delta(current, base):
+    if not base:
+        return ""
+    return f"{(current - base) / base * 100:+.0f}%"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=4, help="sessões simultâneas por ferramenta")
+    parser.add_argument("--rounds", type=int, default=2, help="passadas de cada sessão pelo corpus")
+    parser.add_argument("--tools", default=",".join(TOOLS), help="ferramentas, separadas por vírgula")
+    parser.add_argument("--warm-cache", action="store_true", help="mantém o cache de resultados ligado")
+    parser.add_argument("--baseline", default=BASELINE, help="arquivo da linha de base")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="grava os números desta execução como a nova linha de base")
+    parser.add_argument("--tolerance", type=float, default=0.3,
+                        help="piora relativa tolerada na latência e na vazão (0.3 = 30%%)")
+    parser.add_argument("--rss-tolerance", type=float, default=0.15, help="piora relativa tolerada no RSS")
+    args = parser.parse_args()
+
+    tools = [tool.strip() for tool in args.tools.split(",") if tool.strip()]
+    unknown = sorted(set(tools) - set(TOOLS))
+    if unknown:
+        parser.error(f"ferramentas desconhecidas: {', '.join(unknown)}")
+    config = {"sessions": args.sessions, "rounds": args.rounds, "warm_cache": args.warm_cache}
+
+    baseline = None
+    if not args.update_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline["config"] != config:
+            print(f"A linha de base foi medida com {baseline['config']}; esta execução usa {config}.\n"
+                  "Rode com a mesma configuração ou grave outra linha de base com --update-baseline.")
+            sys.exit(2)
+
+    header = (f"{'ferramenta':11s} {'n':>4s} {'p50 (ms)':>14s} {'p95 (ms)':>14s} {'p99 (ms)':>14s} "
+              f"{'vazão (/s)':>14s} {'RSS pico (MB)':>16s} {'erros':>5s}")
+    print(f"{args.sessions} sessões simultâneas, {args.rounds} passadas pelo corpus, "
+          f"cache {'ligado' if args.warm_cache else 'desligado'}\n")
+    print(header)
+    print("-" * len(header))
+    results, problems = {}, []
+    for tool in tools:
+        current = results[tool] = run_tool(tool, args.sessions, args.rounds, args.warm_cache)
+        base = (baseline or {}).get("tools", {}).get(tool)
+        cells = []
+        for metric, width, fmt in (("p50_ms", 14, ".0f"), ("p95_ms", 14, ".0f"), ("p99_ms", 14, ".0f"),
+                                   ("throughput", 14, ".2f"), ("peak_rss_mb", 16, ".0f")):
+            text = f"{current[metric]:{fmt}}"
+            if base:
+                text += f" {_delta(current[metric], base[metric]):>5s}"
+            cells.append(f"{text:>{width}s}")
+        print(f"{tool:11s} {current['interactions']:4d} {' '.join(cells)} {current['errors']:5d}")
+        for failure in current["failures"]:
+            print(f"    erro em {failure}")
+        if base:
+            problems.extend(compare(tool, current, base, args.tolerance, args.rss_tolerance))
+
+    if args.update_baseline:
+        measured = {tool: {k: v for k, v in r.items() if k != "failures"} for tool, r in results.items()}
+        previous = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                previous = json.load(f)
+        # Com --tools, as demais ferramentas da linha de base (mesma configuração) são mantidas.
+        kept = previous.get("tools", {}) if previous.get("config") == config else {}
+        data = {
+            "config": config,
+            "machine": {"python": platform.python_version(), "cpus": os.cpu_count(),
+                        "platform": platform.platform()},
+            "tools": {**kept, **measured},
+        }
+        with open(args.baseline, "w") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"\nLinha de base gravada em {os.path.relpath(args.baseline, ROOT)}.")
+    elif baseline is None:
+        print("\nSem linha de base para comparar; grave uma com --update-baseline.")
+    elif problems:
+        print("\n" + "!" * 72)
+        print(f"REGRESSÃO: {len(problems)} medida(s) pioraram além da tolerância")
+        print("!" * 72)
+        for problem in problems:
+            print(f"  - {problem}")
+        sys.exit(1)
+    else:
+        print("\nSem regressões em relação à linha de base.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+"""Motores de cálculo reutilizados pela Calculadora Avançada Pro.
+
+Os nomes abaixo são carregados sob demanda: importar ``engine`` (ou um
+submódulo leve como ``engine.workers``) não importa o SymPy nem o NumPy.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "ComputationTimeout": "engine.workers",
+    "ResultCache": "engine.cache",
+    "WorkerPool": "engine.workers",
+    "make_key": "engine.cache",
+    "prewarm": "engine.lazy",
+    "result_cache": "engine.cache",
+    "run_bounded": "engine.workers",
+    "timed": "engine.metrics",
+    "track": "engine.metrics",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module 'engine' has no attribute {name!r}")
+    return getattr(importlib.import_module(_EXPORTS[name]), name)
@@ -0,0 +1,139 @@
+"""API sem interface gráfica para os cálculos da calculadora.
+
+Cada função recebe texto (como digitado na interface) ou expressões do
+SymPy e devolve um ``EngineResult`` com o resultado e a lista de passos. As
+abas do Streamlit e o executor em lote (``engine.batch``) usam as mesmas
+funções, e todas passam pelo cache compartilhado.
+"""
+
+from collections import namedtuple
+
+from sympy import Basic, Eq, Symbol
+
+from engine.calculus import cached_compute, compute_polynomial
+from engine.derivative import compute_derivative
+from engine.integral import compute_integral
+from engine.laplace import compute_laplace
+from engine.limit import compute_limit
+from engine.metrics import observe_size, timed
+from engine.parser import parse_equation, parse_expression
+from engine.polynomial import DEFAULT_DIGITS
+from engine.render import tex
+from engine.summation import compute_summation
+from engine.taylor import compute_taylor
+
+EngineResult = namedtuple("EngineResult", ["result", "steps"])
+
+DIRECTIONS = ("+-", "+", "-")
+
+
+def parse_input(value, equation=False):
+    """Converte o texto digitado pelo usuário em expressão do SymPy.
+
+    Usa o leitor seguro de ``engine.parser``; com ``equation=True``, aceita
+    também ``lhs = rhs`` e devolve um ``Eq``.
+    """
+    if isinstance(value, Basic):
+        return value
+    with timed("parse"):
+        expr = parse_equation(value) if equation else parse_expression(value)
+    observe_size(expr)
+    return expr
+
+
+def derivative(expr, order=1):
+    """Derivada de ordem ``order`` em relação a x."""
+    expr = parse_input(expr)
+    return EngineResult(*cached_compute("derivative", expr, compute_derivative, order=int(order)))
+
+
+def integral(expr, lower=None, upper=None):
+    """Integral indefinida, ou definida quando ``lower`` e ``upper`` são dados."""
+    expr = parse_input(expr)
+    if lower is None and upper is None:
+        return EngineResult(*cached_compute("integral", expr, compute_integral))
+    if lower is None or upper is None:
+        raise ValueError("A integral definida precisa dos dois limites.")
+    return EngineResult(*cached_compute("integral", expr, compute_integral,
+                                        a_expr=parse_input(lower), b_expr=parse_input(upper)))
+
+
+def limit(expr, point=0, direction="+-", numeric=False):
+    """Limite quando x tende a ``point``; ``direction`` é ``"+-"``, ``"+"`` ou ``"-"``.
+
+    Com ``numeric=True`` o limite é estimado pela sonda numérica, sem o
+    ``limit`` do SymPy.
+    """
+    if direction not in DIRECTIONS:
+        raise ValueError(f"Direção inválida: {direction!r}. Use '+-', '+' ou '-'.")
+    expr = parse_input(expr)
+    return EngineResult(*cached_compute("limit", expr, compute_limit, point_expr=parse_input(point),
+                                        direction=direction, numeric=bool(numeric)))
+
+
+def taylor(expr, x0=0, order=4, derivatives=False):
+    """Série de Taylor em torno de ``x0`` até a ordem ``order``.
+
+    Com ``derivatives=True``, o passo a passo das ordens baixas mostra
+    também as derivadas simbólicas (mais lento).
+    """
+    expr = parse_input(expr)
+    return EngineResult(*cached_compute("taylor", expr, compute_taylor, x0_expr=parse_input(x0),
+                                        n=int(order), derivatives=bool(derivatives)))
+
+
+def laplace(expr, inverse=False):
+    """Transformada de Laplace de f(t), ou a inversa de F(s) com ``inverse=True``."""
+    expr = parse_input(expr)
+    return EngineResult(*cached_compute("laplace", expr, compute_laplace, inverse=bool(inverse)))
+
+
+def summation(expr, var="k", lower=1, upper=10):
+    """Somatório de ``expr`` para ``var`` de ``lower`` até ``upper``."""
+    expr = parse_input(expr)
+    var = parse_input(var)
+    if not isinstance(var, Symbol):
+        raise ValueError(f"A variável do somatório deve ser um símbolo, não {var}.")
+    return EngineResult(*cached_compute("summation", expr, compute_summation,
+                                        var=var, lower=int(lower), upper=int(upper)))
+
+
+def solve_equation(equation, numeric=False, digits=DEFAULT_DIGITS):
+    """Resolve em x uma equação ``lhs = rhs`` (ou ``expr``, igualada a zero).
+
+    Com ``numeric=True`` as raízes saem em forma numérica, com ``digits``
+    dígitos significativos.
+    """
+    steps = []
+    expr = parse_input(equation, equation=True)
+    if isinstance(expr, Eq):
+        steps.append("A equação fornecida é:")
+    else:
+        expr = Eq(expr, 0)
+        steps.append("Assumindo que a expressão é igual a zero:")
+    steps.append(f"$${tex(expr)}$$")
+
+    solutions, solve_steps = cached_compute("polynomial", expr, compute_polynomial,
+                                            numeric=bool(numeric), digits=int(digits))
+    return EngineResult(solutions, steps + list(solve_steps))
+
+
+# Nome da operação (como usado pelo executor em lote) -> função da API.
+OPERATIONS = {
+    "derivative": derivative,
+    "integral": integral,
+    "limit": limit,
+    "taylor": taylor,
+    "laplace": laplace,
+    "summation": summation,
+    "solve": solve_equation,
+}
+
+
+def evaluate(op, expr, **params):
+    """Executa a operação ``op`` pelo nome; usado pelo executor em lote."""
+    try:
+        func = OPERATIONS[op]
+    except KeyError:
+        raise ValueError(f"Operação desconhecida: {op!r}. Opções: {', '.join(OPERATIONS)}.") from None
+    return func(expr, **params)
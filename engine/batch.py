@@ -0,0 +1,173 @@
+"""Executor em lote: avalia listas de exercícios sem a interface do Streamlit.
+
+Lê tarefas de um arquivo JSONL ou CSV, avalia em paralelo em um pool de
+processos (cada tarefa com seu limite de tempo) e escreve um resultado JSON
+por linha assim que cada tarefa termina; a ordem de saída é a de conclusão.
+
+Uso::
+
+    python -m engine.batch tarefas.jsonl > resultados.jsonl
+    python -m engine.batch tarefas.csv -o resultados.jsonl --workers 8 --timeout 30 --steps
+    python -m engine.batch tarefas.jsonl --metrics lote.prom > resultados.jsonl
+
+Cada tarefa tem ``op`` (``derivative``, ``integral``, ``limit``, ``taylor``,
+``laplace``, ``summation`` ou ``solve``), ``expr`` e os parâmetros da
+operação em ``engine.api``; ``id`` é opcional. Exemplos em JSONL::
+
+    {"id": "q1", "op": "derivative", "expr": "x**3*cos(x)", "order": 2}
+    {"id": "q2", "op": "integral", "expr": "x^2", "lower": 0, "upper": 1}
+    {"id": "q3", "op": "limit", "expr": "sin(x)/x", "point": 0, "direction": "+"}
+
+No CSV, a primeira linha traz os nomes das colunas e células vazias são
+ignoradas.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from engine.metrics import registry, write_metrics
+from engine.workers import DEFAULT_MEMORY_MB, ComputationTimeout, WorkerPool
+
+DEFAULT_JOB_TIMEOUT = 30.0
+
+
+def _coerce(value):
+    """Converte células de CSV em int/float/bool quando possível."""
+    lowered = value.strip().lower()
+    if lowered in ("true", "false"):
+        return lowered == "true"
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return value
+
+
+def read_jobs(path, fmt=None):
+    """Gera as tarefas (dicionários) de um arquivo JSONL ou CSV; ``-`` lê da entrada padrão."""
+    if fmt is None:
+        fmt = "csv" if path.lower().endswith(".csv") else "jsonl"
+    stream = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+    try:
+        if fmt == "csv":
+            for number, row in enumerate(csv.DictReader(stream), start=1):
+                job = {k: _coerce(v) for k, v in row.items() if k and v not in (None, "")}
+                job.setdefault("id", number)
+                yield job
+        else:
+            for number, line in enumerate(stream, start=1):
+                if line.strip():
+                    job = json.loads(line)
+                    job.setdefault("id", number)
+                    yield job
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def run_job(job, include_steps=False):
+    """Avalia uma tarefa e devolve o registro de saída. Roda dentro de um worker."""
+    from sympy import latex
+
+    from engine.api import evaluate
+
+    params = {k: v for k, v in job.items() if k not in ("id", "op", "expr")}
+    start = time.perf_counter()
+    try:
+        result, steps = evaluate(job["op"], job["expr"], **params)
+    except Exception as e:
+        return {"id": job.get("id"), "op": job.get("op"), "status": "error",
+                "error": f"{type(e).__name__}: {e}"}
+    record = {
+        "id": job.get("id"),
+        "op": job["op"],
+        "status": "ok",
+        "result": str(result),
+        "latex": latex(result),
+        "seconds": round(time.perf_counter() - start, 6),
+    }
+    if include_steps:
+        record["steps"] = [list(step) if isinstance(step, tuple) else step for step in steps]
+    return record
+
+
+def run_batch(jobs, workers=None, timeout=DEFAULT_JOB_TIMEOUT,
+              max_memory_mb=DEFAULT_MEMORY_MB, include_steps=False):
+    """Avalia ``jobs`` em paralelo e gera os registros à medida que ficam prontos.
+
+    Tarefas que excedem ``timeout`` segundos (ou ``max_memory_mb``) viram
+    registros com ``status: "timeout"``; o worker é substituído e o lote segue.
+    """
+    workers = workers or os.cpu_count() or 1
+    pool = WorkerPool(size=workers, preload=("sympy", "engine.api"))
+
+    def dispatch(job):
+        start = time.perf_counter()
+        try:
+            record = pool.run(run_job, (job, include_steps), timeout=timeout,
+                              max_memory_mb=max_memory_mb)
+        except ComputationTimeout as e:
+            record = {"id": job.get("id"), "op": job.get("op"), "status": "timeout", "error": str(e)}
+        tool = str(job.get("op"))
+        registry.observe_stage(tool, "total", time.perf_counter() - start)
+        registry.count_request(tool, record["status"])
+        return record
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = set()
+            for job in jobs:
+                # Janela limitada: arquivos grandes não ficam inteiros na memória.
+                if len(pending) >= 4 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+                pending.add(executor.submit(dispatch, job))
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+    finally:
+        pool.shutdown()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m engine.batch",
+        description="Avalia em lote derivadas, integrais, limites, séries, transformadas, somatórios e equações.",
+    )
+    parser.add_argument("input", help="arquivo de tarefas (.jsonl ou .csv); '-' para a entrada padrão")
+    parser.add_argument("-o", "--output", help="arquivo de saída JSONL (padrão: saída padrão)")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="formato da entrada (padrão: pela extensão)")
+    parser.add_argument("--workers", type=int, default=None, help="processos em paralelo (padrão: número de CPUs)")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_JOB_TIMEOUT, help="limite de tempo por tarefa, em segundos")
+    parser.add_argument("--memory-mb", type=int, default=DEFAULT_MEMORY_MB, help="limite de memória por worker, em MB")
+    parser.add_argument("--steps", action="store_true", help="inclui o passo a passo em cada resultado")
+    parser.add_argument("--metrics", help="grava as métricas do lote (formato do Prometheus) neste arquivo")
+    args = parser.parse_args(argv)
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    counts = {}
+    try:
+        jobs = read_jobs(args.input, args.format)
+        for record in run_batch(jobs, args.workers, args.timeout, args.memory_mb, args.steps):
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            counts[record["status"]] = counts.get(record["status"], 0) + 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if args.metrics:
+            write_metrics(args.metrics)
+    summary = ", ".join(f"{status}: {n}" for status, n in sorted(counts.items()))
+    print(f"Concluído ({summary or 'nenhuma tarefa'}).", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Cache LRU de resultados simbólicos compartilhado entre as sessões do Streamlit.
+
+O Streamlit reexecuta ``math_app.py`` a cada interação, mas os módulos
+importados permanecem vivos durante todo o processo do servidor. Por isso o
+cache mora aqui: uma única instância atende todas as sessões e todos os
+usuários conectados ao mesmo processo.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+
+def _canonical(value):
+    """Converte um parâmetro em uma forma estável e hasheável para a chave."""
+    # Importado aqui para que o cache não carregue o SymPy antes da hora.
+    from sympy import Basic, srepr
+
+    if isinstance(value, Basic):
+        return srepr(value)
+    if isinstance(value, (list, tuple)):
+        return tuple(_canonical(v) for v in value)
+    return value
+
+
+def make_key(operation, expr, **params):
+    """Monta a chave do cache: operação, árvore canônica da expressão e parâmetros.
+
+    A expressão é representada por ``srepr`` depois do parse, então entradas
+    equivalentes como ``x^2`` e ``x**2`` compartilham a mesma entrada.
+    """
+    items = tuple(sorted((name, _canonical(value)) for name, value in params.items()))
+    return (operation, _canonical(expr), items)
+
+
+class ResultCache:
+    """Cache LRU limitado e seguro para threads, com contadores de acertos e falhas.
+
+    Cada valor guardado é o par ``(resultado, passos)`` já pronto para
+    renderização. Os valores são compartilhados entre sessões e não devem ser
+    modificados por quem os lê.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._pending = {}
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        with self._lock:
+            self._store(key, value)
+
+    def _store(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        """Devolve o valor em cache ou executa ``compute()`` e guarda o resultado.
+
+        Requisições simultâneas pela mesma chave esperam o primeiro cálculo em
+        vez de repeti-lo. Exceções não são guardadas: a próxima chamada tenta
+        de novo.
+        """
+        while True:
+            with self._lock:
+                if key in self._data:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return self._data[key]
+                event = self._pending.get(key)
+                if event is None:
+                    self.misses += 1
+                    event = self._pending[key] = threading.Event()
+                    break
+            event.wait()
+
+        try:
+            value = compute()
+        except BaseException:
+            with self._lock:
+                del self._pending[key]
+            event.set()
+            raise
+        with self._lock:
+            self._store(key, value)
+            del self._pending[key]
+        event.set()
+        return value
+
+    def stats(self):
+        """Resumo dos contadores para exibição e monitoramento."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+result_cache = ResultCache(maxsize=int(os.environ.get("MATH_APP_CACHE_SIZE", "1024")))
@@ -0,0 +1,53 @@
+"""Cálculos das ferramentas de equações e o cache compartilhado dos motores.
+
+Cada função devolve o par ``(resultado, passos)`` e pode ser guardada no
+cache compartilhado entre sessões. O módulo só é importado quando uma dessas
+ferramentas é usada pela primeira vez.
+"""
+
+from sympy import solve, symbols
+
+from engine.cache import make_key, result_cache
+from engine.jobs import step_list
+from engine.metrics import timed
+from engine.polynomial import DEFAULT_DIGITS, as_polynomial, solve_polynomial
+from engine.render import full_latex_enabled, tex
+from engine.workers import run_bounded
+
+
+def compute_polynomial(expr, numeric=False, digits=DEFAULT_DIGITS):
+    """Resolve a equação ``expr`` (um ``Eq``) na variável x.
+
+    Polinômios de coeficientes racionais vão para o caminho especializado de
+    ``engine.polynomial``; o resto usa o ``solve`` genérico. Com
+    ``numeric=True`` as raízes saem com ``digits`` dígitos.
+    """
+    x = symbols('x')
+    poly = as_polynomial(expr, x)
+    if poly is not None:
+        solutions, steps = solve_polynomial(poly, numeric=numeric, digits=digits)
+    else:
+        steps = step_list()
+        solutions = run_bounded(solve, expr, x)
+        if numeric:
+            solutions = [sol.evalf(digits) for sol in solutions]
+    if not solutions:
+        steps.append("A equação não possui soluções no conjunto dos números reais.")
+    else:
+        steps.append(f"As soluções para a variável $x$ são:")
+        for i, sol in enumerate(solutions):
+            steps.append(f"$$x_{i+1} = {tex(sol)}$$")
+    return solutions, steps
+
+
+def cached_compute(operation, expr, compute, **params):
+    """Executa ``compute(expr, **params)`` passando pelo cache compartilhado.
+
+    Passos gerados com as expressões longas por completo (``full_latex``)
+    ficam numa entrada separada dos abreviados.
+    """
+    key = make_key(operation, expr, **params)
+    if full_latex_enabled():
+        key += ("full_latex",)
+    with timed("compute"):
+        return result_cache.get_or_compute(key, lambda: compute(expr, **params))
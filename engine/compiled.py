@@ -0,0 +1,45 @@
+"""Cache das funções numéricas compiladas a partir de expressões do SymPy.
+
+``lambdify`` gera e compila código Python a cada chamada, o que custa
+milissegundos a dezenas de milissegundos por expressão. Aqui cada combinação
+de expressões, argumentos e módulo é compilada uma única vez por processo,
+com eliminação de subexpressões comuns (``cse=True``): em
+``sin(a*x)**2 + sin(a*x)`` o seno é avaliado uma vez só, e o mesmo vale entre
+as expressões de uma família de curvas compiladas juntas.
+
+O SymPy só é importado na primeira compilação.
+"""
+
+from functools import lru_cache
+
+from engine.metrics import timed
+
+# Funções compiladas guardadas no cache.
+COMPILED_CACHE_SIZE = 256
+
+
+@lru_cache(maxsize=COMPILED_CACHE_SIZE)
+def _compile(exprs, args, module):
+    from sympy import lambdify
+
+    with timed("lambdify"):
+        return lambdify(args, list(exprs) if isinstance(exprs, tuple) else exprs, module, cse=True)
+
+
+def compile_numeric(exprs, args, module="numpy"):
+    """Função numérica de ``args`` que avalia ``exprs``, compilada uma vez só.
+
+    ``args`` é um símbolo ou uma sequência de símbolos (a variável e os
+    parâmetros), na ordem em que a função os recebe. Com uma sequência de
+    expressões, a função devolve a lista dos valores de cada uma.
+    """
+    if isinstance(exprs, list):
+        exprs = tuple(exprs)
+    if isinstance(args, list):
+        args = tuple(args)
+    return _compile(exprs, args, module)
+
+
+def cache_info():
+    """Estatísticas do cache de funções compiladas (``functools`` ``CacheInfo``)."""
+    return _compile.cache_info()
@@ -0,0 +1,135 @@
+"""Motor incremental de derivadas de ordem n.
+
+Em vez de recalcular ``diff(expr, x, k)`` e aplicar ``simplify`` a cada
+ordem, mantemos uma única cadeia de derivadas: cada ordem é a derivada da
+anterior, passada por uma simplificação barata escolhida pela classe da
+expressão. O ``simplify`` completo roda uma única vez, no resultado final, e
+com orçamento de tempo. A cadeia também tem orçamento: cada ordem roda no
+pool de processos com o tempo que resta, e as ordens já calculadas ficam no
+passo a passo quando ele acaba.
+"""
+
+import time
+
+
+from sympy import (Add, Function, Mul, Pow, cancel, collect, default_sort_key,
+                   diff, expand, simplify, symbols, together)
+
+from engine.jobs import checkpoint, step_list
+from engine.metrics import timed
+from engine.render import tex
+from engine.workers import ComputationTimeout, run_bounded
+
+# Orçamento do simplify completo aplicado apenas ao resultado final.
+FINAL_SIMPLIFY_TIMEOUT = 5.0
+# Orçamento (s) de toda a cadeia de derivadas, somando as ordens.
+CHAIN_TIMEOUT = 10.0
+
+
+def light_simplify(expr, x):
+    """Simplificação barata entre as ordens, escolhida pela classe de ``expr``.
+
+    Polinômios são expandidos e funções racionais passam por ``cancel``. No
+    restante, juntamos tudo sobre um denominador comum, expandimos apenas o
+    numerador e o agrupamos pelas funções elementares de x; isso impede a
+    árvore de crescer sem limite a cada derivação.
+    """
+    if expr.is_polynomial(x):
+        return expand(expr)
+    if expr.is_rational_function(x):
+        return cancel(expr)
+    numer, denom = together(expr).as_numer_denom()
+    numer = expand(numer, power_base=False, power_exp=False, log=False)
+    funcs = sorted(
+        (f for f in numer.atoms(Function) if x in f.free_symbols),
+        key=default_sort_key,
+    )
+    if funcs:
+        numer = collect(numer, funcs)
+    return numer / denom
+
+
+def next_derivative(expr, x):
+    """Uma ordem da cadeia: a derivada de ``expr`` já passada por ``light_simplify``."""
+    with timed("diff"):
+        deriv = diff(expr, x)
+    with timed("light_simplify"):
+        return light_simplify(deriv, x)
+
+
+def derivative_chain(expr, x, order, timeout=CHAIN_TIMEOUT):
+    """Gera ``(k, f^(k))`` para k = 1..order derivando sempre o termo anterior.
+
+    Levanta ``ComputationTimeout`` se a cadeia passar de ``timeout``
+    segundos; as ordens já geradas continuam valendo.
+    """
+    deadline = time.monotonic() + timeout
+    current = expr
+    for k in range(1, order + 1):
+        checkpoint()
+        remaining = deadline - time.monotonic()
+        try:
+            if remaining <= 0:
+                raise ComputationTimeout
+            current = run_bounded(next_derivative, current, x, timeout=remaining)
+        except ComputationTimeout:
+            raise ComputationTimeout(
+                f"a derivada de ordem {k} não terminou dentro do limite de {timeout:g} s; "
+                f"as ordens anteriores estão no passo a passo."
+            ) from None
+        yield k, current
+
+
+def final_simplify(expr, timeout=FINAL_SIMPLIFY_TIMEOUT):
+    """Aplica ``simplify`` completo com orçamento; em caso de estouro mantém ``expr``."""
+    try:
+        return run_bounded(simplify, expr, timeout=timeout)
+    except ComputationTimeout:
+        return expr
+
+
+def _rule_steps(current_expr, x, i):
+    """Passos explicativos da regra de derivação aplicada em ``current_expr``."""
+    steps = []
+    if isinstance(current_expr, Add):
+        steps.append(f"**{i}ª Derivada:** Aplicando a Regra da Soma: $(u+v)' = u' + v'$.")
+    elif isinstance(current_expr, Mul) and len(current_expr.args) == 2:
+        u, v = current_expr.args
+        du, dv = diff(u, x), diff(v, x)
+        steps.append(f"**{i}ª Derivada:** Aplicando a Regra do Produto: $(u \\cdot v)' = u' \\cdot v + u \\cdot v'$.")
+        steps.append(f"Onde $u = {tex(u)}$ e $v = {tex(v)}$.")
+        steps.append(f"As derivadas são $u' = {tex(du)}$ e $v' = {tex(dv)}$.")
+        steps.append("Substituindo na fórmula:")
+        steps.append(f"$$f^{{({i})}}(x) = ({tex(du)}) \\cdot ({tex(v)}) + ({tex(u)}) \\cdot ({tex(dv)})$$")
+    elif isinstance(current_expr, Pow):
+        base, exp_val = current_expr.args
+        if x in base.free_symbols and x not in exp_val.free_symbols:
+            steps.append(f"**{i}ª Derivada:** Aplicando a Regra da Potência: $(u^n)' = n \\cdot u^{{n-1}} \\cdot u'$.")
+        elif x in exp_val.free_symbols:
+            steps.append(f"**{i}ª Derivada:** Aplicando a Regra da Exponencial e/ou Cadeia.")
+    return steps
+
+
+def compute_derivative(expr, order):
+    """Derivada de ordem ``order`` de ``expr`` em relação a x, com o passo a passo."""
+    x = symbols('x')
+    steps = step_list()
+    steps.append(f"Vamos calcular a derivada de ordem {order} da função:")
+    steps.append(f"$$f(x) = {tex(expr)}$$")
+
+    current_expr = expr
+    for i, deriv in derivative_chain(expr, x, order):
+        steps.extend(_rule_steps(current_expr, x, i))
+        if i < order:
+            steps.append(f"O resultado da {i}ª derivada é:")
+            steps.append(f"$$\\frac{{d^{i}}}{{dx^{i}}} f(x) = {tex(deriv)}$$")
+        current_expr = deriv
+
+    final_simplified = final_simplify(current_expr)
+
+    steps.append("**Resultado Final:**")
+    if order == 1:
+        steps.append(f"$$f'(x) = {tex(final_simplified)}$$")
+    else:
+        steps.append(f"$$f^{{({order})}}(x) = {tex(final_simplified)}$$")
+    return final_simplified, steps
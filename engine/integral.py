@@ -0,0 +1,267 @@
+"""Motor de integrais: primitivas por termo e quadratura numérica de reserva.
+
+As primitivas de cada termo de uma soma são calculadas uma única vez (em
+uma só chamada ao pool) e somadas para formar a primitiva completa; o passo
+a passo mostra essas mesmas primitivas.
+
+Nas integrais definidas com limites numéricos, o caminho simbólico corre
+com um orçamento curto (``MATH_APP_INTEGRAL_BUDGET``) enquanto a quadratura
+vetorizada de ``engine.quadrature`` roda em paralelo, numa thread. Se o
+SymPy estourar o orçamento ou devolver uma ``Integral`` não avaliada, o
+resultado é o numérico, com a estimativa de erro; se não, o valor numérico
+serve de conferência. Quando a quadratura converge, o caminho simbólico só
+tem mais ``MATH_APP_INTEGRAL_GRACE`` segundos para terminar.
+
+Se a quadratura não converge, a integral pode ser imprópria: antes de
+aplicar o Teorema Fundamental, a integral definida é pedida ao próprio
+SymPy (que trata singularidades no intervalo) e, se ele não decidir, as
+singularidades do integrando no intervalo são procuradas.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from sympy import Add, Float, Integral, Interval, Symbol, integrate, limit, nan, oo, zoo
+from sympy.calculus.singularities import singularities
+
+from engine.compiled import compile_numeric
+from engine.jobs import step_list
+from engine.metrics import current_tool, timed
+from engine.quadrature import integrate_numeric
+from engine.render import tex
+from engine.workers import ComputationTimeout, run_bounded
+
+# Orçamento (s) do caminho simbólico quando há a quadratura como alternativa.
+SYMBOLIC_BUDGET = float(os.environ.get("MATH_APP_INTEGRAL_BUDGET", "3"))
+# Tempo (s) que o caminho simbólico ainda tem depois que a quadratura converge.
+NUMERIC_GRACE = float(os.environ.get("MATH_APP_INTEGRAL_GRACE", "0.5"))
+# Diferença relativa a partir da qual o valor simbólico é tido como errado
+# (primitiva descontínua dentro do intervalo, por exemplo).
+MISMATCH_TOLERANCE = 1e-6
+
+_METHOD_NAMES = {"gauss_kronrod": "Gauss–Kronrod 7/15 adaptativa", "tanh_sinh": "tanh-sinh"}
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="math-app-quadrature")
+
+
+def _integrate_terms(terms, x):
+    return [integrate(term, x) for term in terms]
+
+
+def term_primitives(expr, x, timeout=None, stop=None):
+    """Termos de ``expr`` e a primitiva de cada um, numa única chamada ao pool."""
+    terms = expr.args if isinstance(expr, Add) else (expr,)
+    return terms, run_bounded(_integrate_terms, terms, x, timeout=timeout, stop=stop)
+
+
+def _numeric_bounds(expr, x, a, b):
+    """Limites como floats (±inf valem), ou ``None`` se a quadratura não se aplica."""
+    if not expr.free_symbols <= {x}:
+        return None
+    if not all(bound.is_number and bound.is_extended_real for bound in (a, b)):
+        return None
+    return float(a), float(b)
+
+
+def _quadrature(expr, x, a, b, tool):
+    with timed("quadrature", tool=tool):
+        return integrate_numeric(compile_numeric(expr, x), a, b)
+
+
+def _stop_when_converged(stop, numeric):
+    """Marca ``stop`` ``NUMERIC_GRACE`` segundos depois de a quadratura convergir."""
+    quad = _numeric_value(numeric)
+    if quad is not None and quad.converged:
+        timer = threading.Timer(NUMERIC_GRACE, stop.set)
+        timer.daemon = True
+        timer.start()
+
+
+def _value_at(primitive, x, point, side, timeout, stop=None):
+    """F(point); nos infinitos ou onde a substituição não vale, o limite lateral."""
+    value = primitive.subs(x, point)
+    if point.is_infinite or value.has(nan, zoo, oo, -oo):
+        value = run_bounded(limit, primitive, x, point, side, timeout=timeout, stop=stop)
+    return value
+
+
+def _improper_value(expr, x, a, b, timeout):
+    """``integrate(expr, (x, a, b))`` com orçamento, ou ``None`` se o SymPy não decidir."""
+    try:
+        value = run_bounded(integrate, expr, (x, a, b), timeout=timeout)
+    except ComputationTimeout:
+        return None
+    return None if value.has(Integral) else value
+
+
+def _singular_points(expr, x, a, b, timeout):
+    """Singularidades de ``expr`` em [a, b], ou uma lista vazia se não der para achá-las."""
+    try:
+        points = run_bounded(singularities, expr, x, Interval(a, b), timeout=timeout)
+    except (ComputationTimeout, NotImplementedError, TypeError, ValueError):
+        return []
+    return sorted(points) if points.is_FiniteSet else []
+
+
+def compute_integral(expr, a_expr=None, b_expr=None):
+    """Integral indefinida de ``expr`` ou definida entre ``a_expr`` e ``b_expr``."""
+    x = Symbol('x')
+    steps = step_list()
+    steps.append("Vamos calcular a integral da função:")
+    steps.append(f"$$f(x) = {tex(expr)}$$")
+
+    bounds = None if a_expr is None else _numeric_bounds(expr, x, a_expr, b_expr)
+    numeric = stop = None
+    if bounds is not None:
+        numeric = _executor.submit(_quadrature, expr, x, *bounds, current_tool())
+        stop = threading.Event()
+        numeric.add_done_callback(partial(_stop_when_converged, stop))
+    deadline = time.monotonic() + SYMBOLIC_BUDGET
+
+    try:
+        terms, primitives = term_primitives(expr, x, timeout=SYMBOLIC_BUDGET if numeric else None, stop=stop)
+    except ComputationTimeout as e:
+        if numeric is None:
+            raise
+        if stop.is_set():
+            steps.append("A integração numérica convergiu antes do cálculo simbólico da primitiva.")
+        else:
+            steps.append(f"O cálculo simbólico da primitiva não terminou em {SYMBOLIC_BUDGET:g} s.")
+        return _numeric_result(expr, a_expr, b_expr, numeric, steps, e)
+
+    if len(terms) > 1:
+        steps.append(r"Aplicando a Regra da Soma para integrais: $\int (u+v) dx = \int u dx + \int v dx$.")
+        for term, term_integral in zip(terms, primitives):
+            steps.append(f"$$\\int {tex(term)} \\, dx = {tex(term_integral)}$$")
+    primitive = Add(*primitives)
+    steps.append("A primitiva (integral indefinida) da função é:")
+    steps.append(f"$$F(x) = \\int {tex(expr)} \\, dx = {tex(primitive)}$$")
+
+    if a_expr is None:
+        steps.append("**Resultado Final (Integral Indefinida):**")
+        steps.append(f"$$\\int {tex(expr)} \\, dx = {tex(primitive)} + C$$")
+        return primitive, steps
+
+    a, b = tex(a_expr), tex(b_expr)
+    if primitive.has(Integral):
+        if numeric is None:
+            result = Integral(expr, (x, a_expr, b_expr))
+            steps.append("O SymPy não encontrou uma primitiva elementar; a integral fica indicada:")
+            steps.append(f"$$\\int_{{{a}}}^{{{b}}} f(x) \\, dx = {tex(result)}$$")
+            return result, steps
+        steps.append("O SymPy não encontrou uma primitiva elementar para a função.")
+        return _numeric_result(expr, a_expr, b_expr, numeric, steps)
+
+    try:
+        remaining = None if numeric is None else max(deadline - time.monotonic(), 0.5)
+        Fb = _value_at(primitive, x, b_expr, "-", remaining, stop)
+        Fa = _value_at(primitive, x, a_expr, "+", remaining, stop)
+    except ComputationTimeout as e:
+        if numeric is None:
+            raise
+        steps.append("Os limites da primitiva nos extremos não terminaram a tempo.")
+        return _numeric_result(expr, a_expr, b_expr, numeric, steps, e)
+    result = Fb - Fa
+
+    check = _numeric_value(numeric)
+    definite = None
+    if check is not None and not check.converged:
+        definite = _improper_value(expr, x, a_expr, b_expr, max(deadline - time.monotonic(), 0.5))
+        if definite is None or not (definite - result).equals(0):
+            improper = _improper_result(expr, x, a_expr, b_expr, result, definite, steps,
+                                        max(deadline - time.monotonic(), 0.5))
+            if improper is not None:
+                return improper, steps
+
+    steps.append("Para a integral definida, aplicamos o Teorema Fundamental do Cálculo:")
+    steps.append(f"$$\\int_{{{a}}}^{{{b}}} f(x) \\, dx = F({b}) - F({a})$$")
+    steps.append("Calculando os valores nos limites:")
+    steps.append(f"$$F({b}) = {tex(Fb)}$$")
+    steps.append(f"$$F({a}) = {tex(Fa)}$$")
+
+    if check is not None and check.converged and result.is_number and result.is_finite:
+        exact = complex(result.evalf())
+        if abs(exact - check.value) > MISMATCH_TOLERANCE * max(1, abs(check.value)) + check.error:
+            steps.append(f"O valor ${tex(result)}$ não confere com a integração numérica "
+                         "(a primitiva deve ser descontínua no intervalo).")
+            return _numeric_result(expr, a_expr, b_expr, numeric, steps)
+
+    steps.append("**Resultado Final (Integral Definida):**")
+    steps.append(f"$$\\int_{{{a}}}^{{{b}}} f(x) \\, dx = {tex(result)}$$")
+    if result.is_number and result.is_finite:
+        steps.append(f"$$\\approx {result.evalf(6)}$$")
+    if check is not None and check.converged:
+        steps.append(f"Conferência numérica ({_METHOD_NAMES[check.method]}): "
+                     f"${check.value:.12g}$, erro estimado ${tex(Float(check.error, 2))}$.")
+    elif definite is not None:
+        steps.append(f"A integração numérica ({_METHOD_NAMES[check.method]}) não convergiu neste intervalo, "
+                     "mas a integral definida calculada pelo SymPy confirma o valor.")
+    elif check is not None:
+        steps.append(f"⚠️ **Resultado não confirmado:** a integração numérica ({_METHOD_NAMES[check.method]}) "
+                     "não convergiu neste intervalo. O integrando pode ter uma singularidade não "
+                     "integrável (a integral seria divergente) ou oscilar demais.")
+    return result, steps
+
+
+def _improper_result(expr, x, a_expr, b_expr, ftc, value, steps, timeout):
+    """Resultado de uma integral cuja quadratura não convergiu e que ``F(b) - F(a)`` não dá.
+
+    ``value`` é a integral definida do SymPy (``None`` se ele não decidiu),
+    que diz se ela diverge ou qual é o seu valor; sem ela, uma singularidade
+    no intervalo basta para não mostrar ``F(b) - F(a)``, que ali não tem
+    sentido. Devolve ``None`` se nada disso impede o Teorema Fundamental.
+    """
+    a, b = tex(a_expr), tex(b_expr)
+    if value is not None and not value.is_finite:
+        steps.append("A integração numérica não convergiu, e a integral definida calculada pelo "
+                     "SymPy, levando em conta as singularidades do intervalo, é:")
+        steps.append(f"$$\\int_{{{a}}}^{{{b}}} f(x) \\, dx = {tex(value)}$$")
+        steps.append("**Resultado Final:** a integral é divergente.")
+        return value
+    if value is not None:
+        steps.append(f"O Teorema Fundamental não vale aqui: $F({b}) - F({a}) = {tex(ftc)}$ não é a integral, "
+                     "porque a primitiva não é contínua em todo o intervalo.")
+        steps.append("**Resultado Final (Integral Definida):**")
+        steps.append(f"$$\\int_{{{a}}}^{{{b}}} f(x) \\, dx = {tex(value)}$$")
+        return value
+    points = _singular_points(expr, x, a_expr, b_expr, timeout)
+    if not points:
+        return None
+    listed = ", ".join(f"${tex(p)}$" for p in points)
+    steps.append(f"⚠️ **Integral imprópria:** o integrando não é limitado em x = {listed}, no intervalo de integração. "
+                 f"Ali o Teorema Fundamental não se aplica (o valor $F({b}) - F({a}) = {tex(ftc)}$ não vale), "
+                 "a integração numérica não convergiu e não foi possível decidir se a integral converge.")
+    return Integral(expr, (x, a_expr, b_expr))
+
+
+def _numeric_value(numeric):
+    """Resultado da quadratura, ou ``None`` se ela não se aplica ou falhou."""
+    if numeric is None:
+        return None
+    try:
+        return numeric.result()
+    except Exception:
+        return None
+
+
+def _numeric_result(expr, a_expr, b_expr, numeric, steps, error=None):
+    """Fecha o passo a passo com o valor da quadratura (ou repassa ``error``)."""
+    quad = _numeric_value(numeric)
+    if quad is None:
+        if error is not None:
+            raise error
+        raise ValueError("A integral não tem primitiva elementar e o integrando não pode ser avaliado numericamente.")
+    a, b = tex(a_expr), tex(b_expr)
+    steps.append(f"Usando integração numérica ({_METHOD_NAMES[quad.method]}), "
+                 "com o integrando avaliado em lote pelo NumPy:")
+    result = Float(quad.value, 15)
+    steps.append("**Resultado Final (Integral Definida, numérico):**")
+    steps.append(f"$$\\int_{{{a}}}^{{{b}}} {tex(expr)} \\, dx \\approx {tex(result)}$$")
+    steps.append(f"Erro estimado: ${tex(Float(quad.error, 2))}$.")
+    if not quad.converged:
+        steps.append("⚠️ A quadratura não atingiu a tolerância pedida: a integral pode ser "
+                     "divergente ou o integrando muito oscilante.")
+    return result, steps
@@ -0,0 +1,131 @@
+"""Execução dos cálculos em segundo plano, com passos transmitidos e cancelamento.
+
+A interface envia cada cálculo para um pool de threads (``submit``) e
+recebe um ``Job``. Enquanto o cálculo anda, os passos aparecem em
+``job.steps`` à medida que são produzidos: os motores montam o passo a passo
+com ``step_list()``, uma lista que, dentro de um job, publica cada passo
+acrescentado.
+
+O cancelamento é cooperativo. ``job.cancel()`` só marca o job; o cálculo
+para no próximo ponto de verificação (``checkpoint()``): a cada passo
+acrescentado, a cada ordem de derivada, a cada bloco de um somatório e
+enquanto espera uma chamada ao pool de processos, que nesse caso tem o
+processo morto na hora (``engine.workers``). O cálculo cancelado levanta
+``ComputationCancelled``.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from engine.metrics import track
+from engine.workers import ComputationCancelled
+
+# Cálculos em andamento ao mesmo tempo (todas as sessões); os demais esperam na fila.
+JOB_THREADS = int(os.environ.get("MATH_APP_JOB_THREADS", "8"))
+
+_local = threading.local()
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class Job:
+    """Um cálculo em segundo plano da ferramenta ``tool`` para as entradas ``inputs``.
+
+    ``steps`` cresce enquanto o cálculo anda e, no fim, passa a ser a lista
+    devolvida pelo cálculo. ``result`` e ``error`` só valem depois de
+    ``done()``.
+    """
+
+    def __init__(self, tool, inputs):
+        self.tool = tool
+        self.inputs = inputs
+        self.steps = []
+        self.result = None
+        self.error = None
+        self.started = time.monotonic()
+        self.elapsed = None
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+
+    def cancel(self):
+        """Pede o cancelamento; o cálculo para no próximo ponto de verificação."""
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """Espera o fim do cálculo por até ``timeout`` segundos; devolve ``done()``."""
+        return self._done.wait(timeout)
+
+    def _run(self, compute, args, kwargs):
+        _local.job = self
+        try:
+            with track(self.tool):
+                self.result, steps = compute(*args, **kwargs)
+            self.steps = list(steps)
+        except BaseException as e:
+            self.error = e
+        finally:
+            _local.job = None
+            self.elapsed = time.monotonic() - self.started
+            self._done.set()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=JOB_THREADS, thread_name_prefix="math-app-job")
+        return _executor
+
+
+def submit(tool, inputs, compute, *args, **kwargs):
+    """Executa ``compute(*args, **kwargs)`` (que devolve ``(resultado, passos)``) em segundo plano."""
+    job = Job(tool, inputs)
+    _get_executor().submit(job._run, compute, args, kwargs)
+    return job
+
+
+def current_job():
+    """Job em execução nesta thread, ou ``None`` fora de um."""
+    return getattr(_local, "job", None)
+
+
+def cancel_event():
+    """Evento de cancelamento do job desta thread (``None`` fora de um job)."""
+    job = current_job()
+    return job._cancel if job is not None else None
+
+
+def checkpoint():
+    """Levanta ``ComputationCancelled`` se o job desta thread foi cancelado."""
+    job = current_job()
+    if job is not None and job.cancelled:
+        raise ComputationCancelled("o cálculo foi cancelado porque as entradas mudaram.")
+
+
+class StepList(list):
+    """Lista de passos que, dentro de um job, publica cada passo acrescentado."""
+
+    def append(self, step):
+        checkpoint()
+        super().append(step)
+        job = current_job()
+        if job is not None:
+            job.steps.append(step)
+
+    def extend(self, steps):
+        for step in steps:
+            self.append(step)
+
+
+def step_list():
+    """Lista vazia para o passo a passo de um cálculo."""
+    return StepList()
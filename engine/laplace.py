@@ -0,0 +1,350 @@
+"""Motor de transformadas de Laplace por regras e tabela.
+
+A maior parte das entradas é combinação de entradas de tabela. Antes de
+recorrer às integrais do SymPy (``laplace_transform`` e
+``inverse_laplace_transform``, que podem levar segundos), a transformada é
+montada com:
+
+* linearidade (somas e fatores constantes);
+* a tabela de ``f(at + b)`` para ``exp``, ``sin``, ``cos``, ``sinh``,
+  ``cosh``, ``Heaviside`` e ``DiracDelta``, indexada pela função, e as
+  potências ``t^ν`` / ``s^{-ν}``;
+* o 1º teorema do deslocamento, ``e^{at} f(t) ↔ F(s - a)``;
+* o 2º teorema do deslocamento, ``u(t - c) f(t - c) ↔ e^{-cs} F(s)``;
+* a multiplicação por ``t^n``, ``t^n f(t) ↔ (-1)^n F^{(n)}(s)``;
+* frações parciais para ``F(s)`` racional, com cada fração
+  ``1/(s - a)^n`` ou ``(bs + c)/((s - h)^2 + k)`` tirada da tabela.
+
+Cada regra aplicada vira um passo. Só o termo que nenhuma regra cobre vai
+para o SymPy, com limite de tempo.
+"""
+
+from sympy import (Add, Dummy, DiracDelta, Heaviside, Integer, Mul, Poly, Symbol, apart, cos,
+                   cancel, cosh, diff, exp, expand, factor, factorial, gamma, inverse_laplace_transform,
+                   laplace_transform, powdenest, sin, sinh, sqrt)
+
+from engine.jobs import step_list
+from engine.metrics import timed
+from engine.render import tex
+from engine.workers import run_bounded
+
+_A, _B, _S = Dummy('a'), Dummy('b'), Dummy('s')
+
+# L{f(at + b)} para as funções da tabela, em termos de a, b e s.
+FORWARD_TABLE = {
+    exp: exp(_B) / (_S - _A),
+    sin: (_S * sin(_B) + _A * cos(_B)) / (_S**2 + _A**2),
+    cos: (_S * cos(_B) - _A * sin(_B)) / (_S**2 + _A**2),
+    sinh: (_S * sinh(_B) + _A * cosh(_B)) / (_S**2 - _A**2),
+    cosh: (_S * cosh(_B) + _A * sinh(_B)) / (_S**2 - _A**2),
+}
+
+
+class TableMiss(Exception):
+    """Nenhuma regra da tabela cobre a expressão."""
+
+
+def _linear(arg, var):
+    """``(a, b)`` com ``arg = a*var + b``, ou ``None`` se ``arg`` não for linear em ``var``."""
+    if var not in arg.free_symbols or not arg.is_polynomial(var):
+        return None
+    poly = Poly(arg, var)
+    if poly.degree() != 1:
+        return None
+    a, b = poly.all_coeffs()
+    return a, b
+
+
+def _table(f, t, s):
+    """F(s) de uma entrada de tabela ``g(at + b)``, ou ``None``."""
+    # Heaviside guarda o valor em 0 como segundo argumento; DiracDelta com
+    # dois argumentos é uma derivada de δ, fora da tabela.
+    if not f.args or len(f.args) > 1 and f.func is not Heaviside:
+        return None
+    coeffs = _linear(f.args[0], t)
+    if coeffs is None:
+        return None
+    a, b = coeffs
+    if f.func in FORWARD_TABLE:
+        return FORWARD_TABLE[f.func].xreplace({_A: a, _B: b, _S: s})
+    if f.func in (Heaviside, DiracDelta) and a.is_positive:
+        # u(at + b) = u(t - c) e δ(at + b) = δ(t - c)/a, com c = -b/a.
+        c = -b / a
+        if c.is_nonpositive:
+            return 1 / s if f.func is Heaviside else (1 / a if c.is_zero else Integer(0))
+        if c.is_positive:
+            return exp(-c * s) / s if f.func is Heaviside else exp(-c * s) / a
+    return None
+
+
+class _Transform:
+    """Uma aplicação das regras, guardando os passos."""
+
+    def __init__(self, t, s):
+        self.t, self.s = t, s
+        self.steps = []
+
+    def note(self, rule, lhs, rhs):
+        self.steps.append(f"{rule}:")
+        self.steps.append(f"$${lhs} = {tex(rhs)}$$")
+
+    def forward_note(self, rule, f, F):
+        self.note(rule, f"\\mathcal{{L}}\\{{{tex(f)}\\}}", F)
+
+    def inverse_note(self, rule, F, f):
+        self.note(rule, f"\\mathcal{{L}}^{{-1}}\\{{{tex(F)}\\}}", f)
+
+    def fallback(self, expr, inverse):
+        """Termo fora da tabela: transformada pela integral, no SymPy."""
+        t, s = self.t, self.s
+        if inverse:
+            result = run_bounded(inverse_laplace_transform, expr, s, t)
+            self.inverse_note("Fora da tabela; calculada pela integral de inversão (SymPy)", expr, result)
+        else:
+            result = run_bounded(laplace_transform, expr, t, s, noconds=True)
+            self.forward_note("Fora da tabela; calculada pela integral (SymPy)", expr, result)
+        return result
+
+    def sum_of(self, terms, transform, inverse):
+        """Linearidade: cada termo pela tabela, ou pelo SymPy se nenhuma regra o cobre."""
+        results = []
+        for term in terms:
+            try:
+                results.append(transform(term))
+            except TableMiss:
+                results.append(self.fallback(term, inverse))
+        return Add(*results)
+
+    # Transformada direta.
+
+    def forward(self, f):
+        t, s = self.t, self.s
+        if t not in f.free_symbols:
+            F = f / s
+            self.forward_note("Tabela, constante: $\\mathcal{L}\\{c\\} = \\frac{c}{s}$", f, F)
+            return F
+        if f.is_Add:
+            F = self.sum_of(f.args, self.forward, inverse=False)
+            self.forward_note("Linearidade: $\\mathcal{L}\\{f + g\\} = F(s) + G(s)$", f, F)
+            return F
+        if f.is_Mul:
+            return self.forward_product(f)
+        if f == t or f.is_Pow and f.base == t and t not in f.exp.free_symbols:
+            nu = Integer(1) if f == t else f.exp
+            if not (nu.is_number and nu.is_real and nu > -1):
+                raise TableMiss(f)
+            F = (factorial(nu) if nu.is_Integer else gamma(nu + 1)) / s**(nu + 1)
+            rule = ("Tabela: $\\mathcal{L}\\{t^n\\} = \\frac{n!}{s^{n+1}}$" if nu.is_Integer
+                    else "Tabela: $\\mathcal{L}\\{t^\\nu\\} = \\frac{\\Gamma(\\nu+1)}{s^{\\nu+1}}$")
+            self.forward_note(rule, f, F)
+            return F
+        F = _table(f, t, s)
+        if F is None:
+            raise TableMiss(f)
+        self.forward_note("Tabela", f, F)
+        return F
+
+    def forward_product(self, f):
+        t, s = self.t, self.s
+        coeff, g = f.as_independent(t, as_Add=False)
+        if coeff != 1:
+            F = coeff * self.forward(g)
+            self.forward_note("Linearidade: $\\mathcal{L}\\{c\\,f\\} = c\\,F(s)$", f, F)
+            return F
+        factors = g.args
+        for term in factors:
+            if term.func is exp and _linear(term.args[0], t):
+                a, b = _linear(term.args[0], t)
+                rest = Mul(*[other for other in factors if other is not term])
+                G = self.forward(rest)
+                F = exp(b) * G.subs(s, s - a)
+                self.forward_note(f"1º teorema do deslocamento, $\\mathcal{{L}}\\{{e^{{at}} f(t)\\}} = F(s - a)$ "
+                                  f"com $a = {tex(a)}$", f, F)
+                return F
+        for term in factors:
+            if term.func is Heaviside and _linear(term.args[0], t):
+                a, b = _linear(term.args[0], t)
+                c = -b / a
+                if not a.is_positive:
+                    continue
+                rest = Mul(*[other for other in factors if other is not term])
+                if c.is_nonpositive:
+                    F = self.forward(rest)
+                    self.forward_note(f"Para $t > 0$, ${tex(term)} = 1$", f, F)
+                    return F
+                if not c.is_positive:
+                    continue
+                G = self.forward(expand(rest.subs(t, t + c)))
+                F = exp(-c * s) * G
+                self.forward_note(f"2º teorema do deslocamento, $\\mathcal{{L}}\\{{u(t - c) f(t)\\}} = "
+                                  f"e^{{-cs}} \\mathcal{{L}}\\{{f(t + c)\\}}$ com $c = {tex(c)}$", f, F)
+                return F
+        for term in factors:
+            n = Integer(1) if term == t else term.exp if term.is_Pow and term.base == t else None
+            if n is not None and n.is_Integer and n > 0:
+                rest = Mul(*[other for other in factors if other is not term])
+                G = self.forward(rest)
+                F = factor((-1)**n * diff(G, s, n))
+                self.forward_note("Multiplicação por $t^n$: $\\mathcal{L}\\{t^n f(t)\\} = (-1)^n F^{(n)}(s)$", f, F)
+                return F
+        raise TableMiss(f)
+
+    # Transformada inversa.
+
+    def inverse(self, F):
+        t, s = self.t, self.s
+        if s not in F.free_symbols:
+            f = F * DiracDelta(t)
+            self.inverse_note("Tabela: $\\mathcal{L}^{-1}\\{c\\} = c\\,\\delta(t)$", F, f)
+            return f
+        if F.is_rational_function(s):
+            return self.inverse_rational(F)
+        if F.is_Add:
+            f = self.sum_of(F.args, self.inverse, inverse=True)
+            self.inverse_note("Linearidade: $\\mathcal{L}^{-1}\\{F + G\\} = f(t) + g(t)$", F, f)
+            return f
+        if F.is_Mul:
+            coeff, G = F.as_independent(s, as_Add=False)
+            if coeff != 1:
+                f = coeff * self.inverse(G)
+                self.inverse_note("Linearidade: $\\mathcal{L}^{-1}\\{c\\,F\\} = c\\,f(t)$", F, f)
+                return f
+            for term in G.args:
+                shift = _linear(term.args[0], s) if term.func is exp else None
+                if shift and shift[0].is_negative and shift[1] == 0:
+                    c = -shift[0]
+                    rest = Mul(*[other for other in G.args if other is not term])
+                    g = self.inverse(rest)
+                    f = g.subs(t, t - c) * Heaviside(t - c)
+                    self.inverse_note(f"2º teorema do deslocamento, $\\mathcal{{L}}^{{-1}}\\{{e^{{-cs}} F(s)\\}} = "
+                                      f"u(t - c) f(t - c)$ com $c = {tex(c)}$", F, f)
+                    return f
+            expanded = expand(F)
+            if expanded.is_Add:
+                return self.inverse(expanded)
+        if F.is_Pow and _linear(F.base, s) and s not in F.exp.free_symbols:
+            # (ps + q)^{-ν} = p^{-ν} (s - a)^{-ν}, com a = -q/p.
+            p, q = _linear(F.base, s)
+            nu = -F.exp
+            if nu.is_positive:
+                a = -q / p
+                f = p**-nu * t**(nu - 1) * exp(a * t) / gamma(nu)
+                self.inverse_note("Tabela: $\\mathcal{L}^{-1}\\{(s - a)^{-\\nu}\\} = "
+                                  "\\frac{t^{\\nu - 1} e^{at}}{\\Gamma(\\nu)}$", F, f)
+                return f
+        raise TableMiss(F)
+
+    def inverse_rational(self, F):
+        # Fatores comuns ((s + 1)/(s² - 1)) saem antes: senão o ``apart`` não separa nada.
+        F = cancel(F)
+        # Frações que já são entradas da tabela dispensam o ``apart``.
+        try:
+            return self.inverse_fraction(F)
+        except TableMiss:
+            pass
+        terms = Add.make_args(apart(F, self.s))
+        if len(terms) == 1:
+            raise TableMiss(F)
+        self.steps.append("Decompondo em frações parciais:")
+        self.steps.append(f"$${tex(F)} = {tex(Add(*terms))}$$")
+        f = self.sum_of(terms, self.inverse_fraction, inverse=True)
+        self.inverse_note("Linearidade: $\\mathcal{L}^{-1}\\{F + G\\} = f(t) + g(t)$", F, f)
+        return f
+
+    def inverse_fraction(self, F):
+        """Uma fração parcial: ``c/(ps + q)^n`` ou ``(bs + c)/(ps² + qs + r)``."""
+        t, s = self.t, self.s
+        if s not in F.free_symbols:
+            return self.inverse(F)
+        numer, denom = F.as_numer_denom()
+        coeff, core = denom.as_independent(s, as_Add=False)
+        base, n = core.as_base_exp()
+        # Denominador já fatorado em vários fatores: fica para as frações parciais.
+        if base.is_Mul or not n.is_Integer or n < 1:
+            raise TableMiss(F)
+        base, numer = Poly(base, s), Poly(numer, s)
+        if numer.degree() >= base.degree():
+            # Parte polinomial que sobrou (δ e derivadas): a tabela não cobre.
+            raise TableMiss(F)
+        if base.degree() == 1:
+            p, q = base.all_coeffs()
+            a = -q / p
+            c = numer.as_expr() / (coeff * p**n)
+            f = c * t**(n - 1) * exp(a * t) / factorial(n - 1)
+            self.inverse_note("Tabela: $\\mathcal{L}^{-1}\\{\\frac{1}{(s - a)^n}\\} = "
+                              "\\frac{t^{n-1} e^{at}}{(n-1)!}$", F, f)
+            return f
+        if base.degree() == 2 and n == 1:
+            # Completando o quadrado: ps² + qs + r = p((s + h)² + k).
+            p, q, r = base.all_coeffs()
+            h = q / (2 * p)
+            k = r / p - h**2
+            if k.is_negative and sqrt(-k).is_rational:
+                # Raízes racionais: as frações parciais dão exponenciais simples.
+                raise TableMiss(F)
+            linear = Poly(numer.as_expr() / (coeff * p), s)
+            b, c = linear.coeff_monomial(s), linear.coeff_monomial(1)
+            # bs + c = b(s + h) + (c - bh)
+            if k.is_zero:
+                # Raiz dupla: b/(s + h) + (c - bh)/(s + h)².
+                f = exp(-h * t) * (b + (c - b * h) * t)
+                rule = ("Tabela: $\\mathcal{L}^{-1}\\{\\frac{1}{s - a}\\} = e^{at}$, "
+                        "$\\mathcal{L}^{-1}\\{\\frac{1}{(s - a)^2}\\} = t\\,e^{at}$")
+            elif k.is_negative:
+                w = sqrt(-k)
+                f = exp(-h * t) * (b * cosh(w * t) + (c - b * h) / w * sinh(w * t))
+                rule = ("Tabela: $\\mathcal{L}^{-1}\\{\\frac{s - a}{(s - a)^2 - w^2}\\} = e^{at}\\cosh wt$, "
+                        "$\\mathcal{L}^{-1}\\{\\frac{w}{(s - a)^2 - w^2}\\} = e^{at}\\sinh wt$")
+            else:
+                # cos(wt) e sin(wt)/w são pares em w: valem para qualquer k = w² não
+                # nulo, e a raiz pode ser tirada sem se preocupar com o sinal.
+                w = powdenest(sqrt(k), force=True)
+                f = exp(-h * t) * (b * cos(w * t) + (c - b * h) / w * sin(w * t))
+                rule = ("Tabela: $\\mathcal{L}^{-1}\\{\\frac{s - a}{(s - a)^2 + w^2}\\} = e^{at}\\cos wt$, "
+                        "$\\mathcal{L}^{-1}\\{\\frac{w}{(s - a)^2 + w^2}\\} = e^{at}\\sin wt$")
+            self.inverse_note(rule, F, expand(f))
+            return expand(f)
+        raise TableMiss(F)
+
+
+def transform(expr, inverse=False):
+    """Transformada (ou inversa) de ``expr`` pelas regras; devolve ``(resultado, passos)``.
+
+    Levanta ``TableMiss`` quando nenhuma regra cobre a expressão inteira.
+    """
+    t, s = Symbol('t'), Symbol('s')
+    rules = _Transform(t, s)
+    with timed("laplace_rules"):
+        if inverse:
+            result = rules.inverse(expr)
+        else:
+            result = rules.forward(expand(expr))
+    return result, rules.steps
+
+
+def compute_laplace(expr, inverse=False):
+    """Transformada de Laplace (ou a inversa, com ``inverse=True``) de ``expr``."""
+    t, s = Symbol('t'), Symbol('s')
+    steps = step_list()
+
+    if not inverse:
+        steps.append(f"Calculando a Transformada de Laplace de $f(t) = {tex(expr)}$:")
+        steps.append(r"$$\mathcal{L}\{f(t)\} = F(s) = \int_0^{\infty} f(t) e^{-st} dt$$")
+    else:
+        steps.append(f"Calculando a Transformada Inversa de Laplace de $F(s) = {tex(expr)}$:")
+        steps.append(r"$$\mathcal{L}^{-1}\{F(s)\} = f(t)$$")
+
+    try:
+        result, rule_steps = transform(expr, inverse=inverse)
+        steps.append("Aplicando as regras e a tabela de transformadas:")
+        steps.extend(rule_steps)
+    except TableMiss:
+        steps.append("A expressão não está na tabela; calculando pela definição com o SymPy.")
+        if inverse:
+            result = run_bounded(inverse_laplace_transform, expr, s, t)
+        else:
+            result = run_bounded(laplace_transform, expr, t, s, noconds=True)
+
+    steps.append("**Resultado:**")
+    steps.append(f"$$f(t) = {tex(result)}$$" if inverse else f"$$F(s) = {tex(result)}$$")
+    return result, steps
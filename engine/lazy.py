@@ -0,0 +1,67 @@
+"""Pré-aquecimento em segundo plano dos módulos pesados da aplicação.
+
+As ferramentas importam SymPy, NumPy e Matplotlib só quando são usadas. Para
+que o primeiro clique não pague esse custo, ``prewarm`` importa esses módulos
+em uma thread de fundo logo depois da primeira página enviada. O Python
+guarda os módulos em ``sys.modules``, então isso acontece uma vez por
+processo, e o lock de importação garante que uma ferramenta usada durante o
+aquecimento apenas espera o import em andamento terminar.
+"""
+
+import importlib
+import os
+import threading
+
+HEAVY_MODULES = (
+    "numpy",
+    "sympy",
+    "engine.api",
+    "engine.calculus",
+    "engine.derivative",
+    "engine.integral",
+    "engine.laplace",
+    "engine.limit",
+    "engine.parser",
+    "engine.plotting",
+    "engine.polynomial",
+    "engine.quadrature",
+    "engine.summation",
+    "engine.taylor",
+    "matplotlib.figure",
+    "matplotlib.backends.backend_agg",
+)
+
+_started = False
+_lock = threading.Lock()
+
+
+def _warm(modules, start_pool):
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+    if start_pool:
+        from engine.workers import DEFAULT_WORKERS, get_pool
+
+        if DEFAULT_WORKERS > 0:
+            get_pool()
+
+
+def prewarm(modules=HEAVY_MODULES, start_pool=True):
+    """Importa ``modules`` (e cria o pool de workers) em uma thread de fundo.
+
+    Só a primeira chamada no processo tem efeito. Desligado com
+    ``MATH_APP_PREWARM=0``. Devolve a thread iniciada, ou ``None``.
+    """
+    global _started
+    if os.environ.get("MATH_APP_PREWARM", "1") == "0":
+        return None
+    with _lock:
+        if _started:
+            return None
+        _started = True
+    thread = threading.Thread(target=_warm, args=(modules, start_pool),
+                              name="math-app-prewarm", daemon=True)
+    thread.start()
+    return thread
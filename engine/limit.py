@@ -0,0 +1,341 @@
+"""Motor de limites: classificação barata da forma, um único ``limit`` e sonda numérica.
+
+1. A substituição direta é feita nó a nó; se nenhum nó dá divisão por
+   zero, ``0^0`` ou infinito e não há funções descontínuas, o valor já é o
+   limite e o ``limit`` do SymPy nem é chamado.
+2. Caso contrário, numerador e denominador (ou base e expoente, fatores,
+   parcelas) são classificados pelo valor no ponto ou pelo termo dominante
+   (``leadterm``), o que identifica a forma indeterminada para o passo a
+   passo sem calcular limites.
+3. O limite é calculado uma vez por lado, e cada lado fica no cache
+   compartilhado: o bilateral reaproveita os laterais já pedidos, e
+   vice-versa.
+4. Se o SymPy estourar o orçamento (``MATH_APP_LIMIT_BUDGET``), a função é
+   avaliada em alta precisão numa sequência de pontos que se aproxima do
+   ponto pelo lado pedido, e o limite é extrapolado (Richardson, via
+   ``mpmath.limit``).
+"""
+
+import os
+
+from sympy import (Abs, DiracDelta, Float, Heaviside, Integer, Piecewise, Pow, Rational, Symbol,
+                   ceiling, floor, frac, limit, nan, oo, sign, zoo)
+
+from engine.cache import make_key, result_cache
+from engine.compiled import compile_numeric
+from engine.jobs import step_list
+from engine.render import tex
+from engine.workers import ComputationTimeout, run_bounded
+
+# Orçamento (s) de cada ``limit`` do SymPy quando a sonda numérica é possível.
+SYMBOLIC_BUDGET = float(os.environ.get("MATH_APP_LIMIT_BUDGET", "3"))
+# Orçamento (s) da classificação da forma (``leadterm`` pode expandir séries).
+CLASSIFY_TIMEOUT = 2.0
+# Dígitos de trabalho da sonda numérica.
+PROBE_DIGITS = 40
+# Expoentes k dos pontos x0 ± 10^-k (ou ±10^k no infinito) mostrados no passo a passo.
+PROBE_EXPONENTS = (1, 2, 4, 6, 8)
+# Expoentes k dos pontos x0 ± 2^-k usados para detectar limites infinitos.
+PROBE_FAR_EXPONENTS = (8, 16, 32, 64, 128)
+# Estimativas menores que isso (em módulo) são arredondadas para zero.
+PROBE_ZERO = 1e-20
+# Erro relativo a partir do qual a extrapolação é dada como não confiável.
+PROBE_UNRELIABLE = 1e-6
+
+_DISCONTINUOUS = (floor, ceiling, frac, sign, Heaviside, DiracDelta, Piecewise)
+_DIRECTION_TEX = {"+-": "", "+": "^+", "-": "^-"}
+_FORMS = {
+    "0/0": r"\frac{0}{0}",
+    "inf/inf": r"\frac{\infty}{\infty}",
+    "0*inf": r"0 \cdot \infty",
+    "inf-inf": r"\infty - \infty",
+    "1^inf": r"1^{\infty}",
+    "0^0": r"0^{0}",
+    "inf^0": r"\infty^{0}",
+}
+
+
+def _is_infinite(value):
+    return value is not None and value.has(oo, -oo, zoo)
+
+
+def direct_value(expr, x, x0):
+    """Valor por substituição direta, ou ``None`` se ela não vale como limite.
+
+    A substituição é feita de baixo para cima, para que ``0^0``, ``1/0`` e
+    ``log(0)`` sejam barrados mesmo quando o SymPy os simplificaria.
+    """
+    if x0.is_infinite or expr.has(*_DISCONTINUOUS):
+        return None
+
+    def walk(node):
+        if not node.args:
+            return x0 if node == x else node
+        args = [walk(arg) for arg in node.args]
+        if any(arg is None for arg in args):
+            return None
+        if isinstance(node, Pow) and args[0] == 0 and not args[1].is_positive:
+            return None
+        value = node.func(*args)
+        if value.has(nan, zoo, oo, -oo):
+            return None
+        return value
+
+    return walk(expr)
+
+
+def _approach(x, x0, side, t):
+    if x0 is oo:
+        return 1 / t
+    if x0 is -oo:
+        return -1 / t
+    return x0 + t if side == "+" else x0 - t
+
+
+def _part_value(part, x, x0, side):
+    """Valor de ``part`` no ponto: finito, ``oo``/``-oo``, ``zoo`` (infinito sem sinal) ou ``None``."""
+    if x not in part.free_symbols:
+        return part
+    value = part.subs(x, x0)
+    if not value.has(nan):
+        return value if value in (oo, -oo) or not _is_infinite(value) else zoo
+    t = Symbol('t', positive=True)
+    try:
+        c, e = part.subs(x, _approach(x, x0, side, t)).leadterm(t)
+    except Exception:
+        return None
+    if e.is_positive:
+        return 0
+    if c.has(t):
+        # Termo dominante com logaritmo: t^e log(t).
+        return zoo
+    if e.is_negative:
+        return oo * c if c.is_extended_real and c.is_nonzero else zoo
+    return c
+
+
+def classify(expr, x, x0, side="+"):
+    """Forma no ponto (chave de ``_FORMS``, ``"c/0"``, ``"determinate"`` ou ``None``) e os valores usados.
+
+    Devolve ``(forma, partes)``, onde ``partes`` é uma lista de pares
+    ``(nome, valor)`` para o passo a passo.
+    """
+    num, den = expr.as_numer_denom()
+    if den != 1:
+        vn, vd = _part_value(num, x, x0, side), _part_value(den, x, x0, side)
+        parts = [("numerador", vn), ("denominador", vd)]
+        if vn is None or vd is None:
+            return None, parts
+        if vn == 0 and vd == 0:
+            return "0/0", parts
+        if _is_infinite(vn) and _is_infinite(vd):
+            return "inf/inf", parts
+        if vd == 0:
+            return "c/0", parts
+        return "determinate", parts
+    if isinstance(expr, Pow):
+        vb, ve = _part_value(expr.base, x, x0, side), _part_value(expr.exp, x, x0, side)
+        parts = [("base", vb), ("expoente", ve)]
+        if vb == 1 and _is_infinite(ve):
+            return "1^inf", parts
+        if vb == 0 and ve == 0:
+            return "0^0", parts
+        if _is_infinite(vb) and ve == 0:
+            return "inf^0", parts
+        return (None if vb is None or ve is None else "determinate"), parts
+    if expr.is_Mul or expr.is_Add:
+        values = [_part_value(arg, x, x0, side) for arg in expr.args]
+        name = "fator" if expr.is_Mul else "parcela"
+        parts = [(f"{name} ${tex(arg)}$", v) for arg, v in zip(expr.args, values)]
+        if None in values:
+            return None, parts
+        infinite = [v for v in values if _is_infinite(v)]
+        if expr.is_Mul and infinite and 0 in values:
+            return "0*inf", parts
+        if expr.is_Add and len(infinite) > 1 and set(infinite) != {oo} and set(infinite) != {-oo}:
+            return "inf-inf", parts
+        return "determinate", parts
+    return "determinate", [("função", _part_value(expr, x, x0, side))]
+
+
+def _probe_points(x0, side, base, exponents):
+    """x0 ± base^-k (ou ±base^k no infinito) para cada k de ``exponents``."""
+    if x0.is_infinite:
+        s = 1 if x0 is oo else -1
+        return [s * Integer(base) ** k for k in exponents]
+    s = 1 if side == "+" else -1
+    return [x0 + s * Rational(1, base ** k) for k in exponents]
+
+
+def probe_limit(expr, x, x0, side):
+    """Limite lateral estimado numericamente: ``(valor, erro, amostras)``.
+
+    ``amostras`` são os pares ``(x, f(x))`` mostrados no passo a passo. O
+    valor vem da extrapolação do ``mpmath`` sobre f(x0 ± 2^-n) (ou f(±2^n)
+    no infinito) e o erro, da diferença entre as extrapolações de Richardson
+    e de Shanks. Se |f| cresce sem parar ao longo de x0 ± 2^-k, o limite é
+    infinito (``erro`` é ``None``).
+    """
+    import mpmath
+
+    f = compile_numeric(expr, x, "mpmath")
+
+    def real(point):
+        value = f(mpmath.mpf(point.evalf(PROBE_DIGITS)))
+        if isinstance(value, mpmath.mpc):
+            if abs(value.imag) > PROBE_ZERO * (1 + abs(value.real)):
+                raise ValueError("A função não assume valores reais perto do ponto, desse lado.")
+            value = value.real
+        return value
+
+    with mpmath.workdps(PROBE_DIGITS):
+        samples = [(Float(p, 15), Float(real(p), 15)) for p in _probe_points(x0, side, 10, PROBE_EXPONENTS)]
+        far = [real(p) for p in _probe_points(x0, side, 2, PROBE_FAR_EXPONENTS)]
+        sizes = [abs(v) for v in far]
+        if all(a < b for a, b in zip(sizes, sizes[1:])) and sizes[-1] > 2 * sizes[0]:
+            return (oo if far[-1] > 0 else -oo), None, samples
+        point = mpmath.inf if x0 is oo else -mpmath.inf if x0 is -oo else mpmath.mpf(x0.evalf(PROBE_DIGITS))
+        direction = 1 if side == "+" else -1
+        richardson = mpmath.limit(f, point, direction=direction, exp=True, method="richardson")
+        shanks = mpmath.limit(f, point, direction=direction, exp=True, method="shanks")
+        estimate, error = mpmath.re(shanks), abs(richardson - shanks)
+        if abs(estimate) < PROBE_ZERO:
+            estimate = 0
+        return Float(estimate, 15), Float(error, 2), samples
+
+
+def _can_probe(expr, x, x0):
+    return expr.free_symbols <= {x} and x0.is_number and x0.is_extended_real
+
+
+def one_sided(expr, x, x0, side, numeric=False):
+    """Limite pelo lado ``side`` (``"+"`` ou ``"-"``), no cache compartilhado.
+
+    Devolve ``(valor, sonda)``: ``sonda`` é ``None`` quando o valor veio do
+    SymPy, ou o resultado de ``probe_limit`` quando veio da sonda numérica.
+    """
+    key = make_key("limit_side", expr, point=x0, side=side, numeric=bool(numeric))
+
+    def compute():
+        probe = _can_probe(expr, x, x0)
+        if not numeric:
+            try:
+                return run_bounded(limit, expr, x, x0, side,
+                                   timeout=SYMBOLIC_BUDGET if probe else None), None
+            except ComputationTimeout:
+                if not probe:
+                    raise
+        elif not probe:
+            raise ValueError("A sonda numérica precisa de uma função só de x e de um ponto real.")
+        result = run_bounded(probe_limit, expr, x, x0, side)
+        return result[0], result
+
+    return result_cache.get_or_compute(key, compute)
+
+
+def _lim_tex(expr, x0_tex, direction):
+    return f"\\lim_{{x \\to {x0_tex}{_DIRECTION_TEX[direction]}}} {tex(expr)}"
+
+
+def _value_tex(value):
+    if value is None:
+        return "?"
+    return r"\infty" if value is zoo else tex(value)
+
+
+def _probe_steps(side_tex, probe):
+    value, error, samples = probe
+    steps = [f"Sonda numérica {side_tex}: avaliando $f$ com {PROBE_DIGITS} dígitos numa sequência de pontos que se aproxima de $x_0$:"]
+    for point, fx in samples:
+        steps.append(f"$$f({tex(point)}) \\approx {tex(fx)}$$")
+    if error is None:
+        steps.append("Os valores crescem sem limitação: o limite é infinito.")
+    else:
+        steps.append(f"Extrapolando a sequência (Richardson/Shanks): ${tex(value)}$, erro estimado ${tex(error)}$.")
+        if error > PROBE_UNRELIABLE * (1 + abs(value)):
+            steps.append("⚠️ A extrapolação não se estabilizou: o limite pode não existir "
+                         "(a função oscila) ou a estimativa é pouco precisa.")
+    return steps
+
+
+def compute_limit(expr, point_expr, direction="+-", numeric=False):
+    """Limite de ``expr`` quando x tende a ``point_expr``.
+
+    ``direction`` é ``"+-"`` (bilateral), ``"+"`` (pela direita) ou ``"-"``
+    (pela esquerda). Com ``numeric=True`` o limite sai direto da sonda
+    numérica, sem o ``limit`` do SymPy.
+    """
+    x = Symbol('x')
+    x0_tex = tex(point_expr)
+    lim_tex = _lim_tex(expr, x0_tex, direction)
+
+    steps = step_list()
+    steps.append(f"Vamos calcular o limite da função quando $x$ tende a ${x0_tex}$:")
+    steps.append(f"$$f(x) = {tex(expr)}$$")
+    steps.append(f"$${lim_tex}$$")
+
+    value = None if numeric else direct_value(expr, x, point_expr)
+    if value is not None:
+        steps.append("A função é contínua no ponto (composição de funções elementares definidas nele), "
+                     "então basta a substituição direta:")
+        steps.append(f"$$f({x0_tex}) = {tex(value)}$$")
+        steps.append("**Resultado Final:**")
+        steps.append(f"$${lim_tex} = {tex(value)}$$")
+        return value, steps
+
+    if not numeric:
+        try:
+            form, parts = run_bounded(classify, expr, x, point_expr, "-" if direction == "-" else "+",
+                                      timeout=CLASSIFY_TIMEOUT)
+        except ComputationTimeout:
+            form, parts = None, []
+        for name, part in parts:
+            steps.append(f"Quando $x \\to {x0_tex}$, {name} $\\to {_value_tex(part)}$.")
+        if form in _FORMS:
+            steps.append(f"A substituição direta resulta na forma indeterminada ${_FORMS[form]}$; "
+                         "o SymPy resolve o limite expandindo em série (algoritmo de Gruntz).")
+        elif form == "c/0":
+            steps.append("O denominador tende a zero e o numerador não: o limite, se existir, é infinito "
+                         "e o sinal depende do lado.")
+        else:
+            steps.append("A substituição direta não é trivial. Vamos calcular o limite diretamente.")
+
+    sides = ("+",) if point_expr is oo else ("-",) if point_expr is -oo else \
+        ("+", "-") if direction == "+-" else (direction,)
+    results = {}
+    for side in sides:
+        results[side], probe = one_sided(expr, x, point_expr, side, numeric=numeric)
+        if probe is not None:
+            side_tex = "pela direita" if side == "+" else "pela esquerda"
+            if point_expr.is_infinite:
+                side_tex = f"em ${x0_tex}$"
+            if not numeric:
+                steps.append(f"O cálculo simbólico {side_tex} não terminou em {SYMBOLIC_BUDGET:g} s.")
+            steps.extend(_probe_steps(side_tex, probe))
+
+    if len(results) == 2:
+        right, left = results["+"], results["-"]
+        steps.append(f"$${_lim_tex(expr, x0_tex, '+')} = {tex(right)}, \\quad "
+                     f"{_lim_tex(expr, x0_tex, '-')} = {tex(left)}$$")
+        if not _same(left, right):
+            steps.append("Os limites laterais são diferentes, então o limite bilateral não existe.")
+            steps.append("**Resultado Final:**")
+            steps.append(f"$${lim_tex} \\; \\text{{não existe}}$$")
+            return nan, steps
+        steps.append("Os limites laterais coincidem.")
+    result = next(iter(results.values()))
+
+    steps.append("**Resultado Final:**")
+    relation = "\\approx" if result.is_Float else "="
+    steps.append(f"$${lim_tex} {relation} {tex(result)}$$")
+    return result, steps
+
+
+def _same(left, right):
+    if left == right:
+        return True
+    if left.is_Float or right.is_Float:
+        if left.is_infinite or right.is_infinite:
+            return False
+        return Abs(left - right) <= 1e-9 * (1 + Abs(right))
+    return False
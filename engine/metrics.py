@@ -0,0 +1,307 @@
+"""Métricas de latência por ferramenta e etapa, no formato texto do Prometheus.
+
+Cada pedido de uma ferramenta roda dentro de ``track(tool)``, que conta o
+resultado (``ok``, ``error``, ``timeout`` ou ``cancelled``) e mede o tempo
+total. Dentro dele, ``timed(stage)`` mede as etapas (``parse``,
+``compute``, a operação do SymPy, ``latex``, ``render``...) e
+``observe_size`` registra o tamanho das expressões; as etapas herdam a
+ferramenta do ``track`` em andamento na mesma thread.
+
+As métricas ficam em memória no processo do servidor e podem ser expostas
+em ``http://localhost:$MATH_APP_METRICS_PORT/metrics`` ou gravadas em
+``$MATH_APP_METRICS_FILE`` ao fim de cada pedido. Com
+``MATH_APP_PROFILE_SLOW_MS`` definido, cada pedido roda sob ``cProfile`` e
+os que passam do limite têm o perfil gravado (formato ``pstats``, aberto por
+``snakeviz``, ``pstats`` ou convertido por ``flameprof``) em
+``$MATH_APP_PROFILE_DIR``. O perfil cobre a thread do pedido e as chamadas
+que ela manda para o pool de processos (``run_bounded``); outras threads
+que o pedido use, como a da integração numérica, ficam de fora.
+"""
+
+import logging
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, suppress
+
+from engine.workers import ComputationCancelled, ComputationTimeout
+
+# Limites superiores (em segundos) das faixas dos histogramas de latência.
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Limites superiores (em nós da árvore) das faixas do histograma de tamanho.
+SIZE_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 10000)
+
+PROFILE_SLOW_MS = os.environ.get("MATH_APP_PROFILE_SLOW_MS")
+PROFILE_DIR = os.environ.get("MATH_APP_PROFILE_DIR", "profiles")
+METRICS_FILE = os.environ.get("MATH_APP_METRICS_FILE")
+
+_local = threading.local()
+_log = logging.getLogger(__name__)
+# Um só perfil por vez: o cProfile não aceita dois ativos no mesmo processo.
+_profile_lock = threading.Lock()
+_write_lock = threading.Lock()
+
+
+class Histogram:
+    """Histograma cumulativo com faixas fixas, como os do Prometheus."""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def cumulative(self):
+        running = 0
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            running += n
+            yield bound, running
+
+
+class MetricsRegistry:
+    """Contadores e histogramas rotulados, seguros para várias threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stage_seconds = {}
+        self.expression_nodes = {}
+        self.requests = {}
+
+    def observe_stage(self, tool, stage, seconds):
+        with self._lock:
+            hist = self.stage_seconds.get((tool, stage))
+            if hist is None:
+                hist = self.stage_seconds[(tool, stage)] = Histogram(LATENCY_BUCKETS)
+            hist.observe(seconds)
+
+    def observe_size(self, tool, nodes):
+        with self._lock:
+            hist = self.expression_nodes.get(tool)
+            if hist is None:
+                hist = self.expression_nodes[tool] = Histogram(SIZE_BUCKETS)
+            hist.observe(nodes)
+
+    def count_request(self, tool, status):
+        with self._lock:
+            self.requests[(tool, status)] = self.requests.get((tool, status), 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self.stage_seconds.clear()
+            self.expression_nodes.clear()
+            self.requests.clear()
+
+    def render(self):
+        """Texto no formato de exposição do Prometheus (versão 0.0.4)."""
+        lines = []
+        with self._lock:
+            lines.append("# HELP math_app_stage_seconds Latência de cada etapa, por ferramenta.")
+            lines.append("# TYPE math_app_stage_seconds histogram")
+            for (tool, stage), hist in sorted(self.stage_seconds.items()):
+                lines.extend(_histogram_lines("math_app_stage_seconds",
+                                              f'tool="{tool}",stage="{stage}"', hist))
+            lines.append("# HELP math_app_expression_nodes Tamanho (nós da árvore) das expressões recebidas.")
+            lines.append("# TYPE math_app_expression_nodes histogram")
+            for tool, hist in sorted(self.expression_nodes.items()):
+                lines.extend(_histogram_lines("math_app_expression_nodes", f'tool="{tool}"', hist))
+            lines.append("# HELP math_app_requests_total Pedidos por ferramenta e resultado.")
+            lines.append("# TYPE math_app_requests_total counter")
+            for (tool, status), n in sorted(self.requests.items()):
+                lines.append(f'math_app_requests_total{{tool="{tool}",status="{status}"}} {n}')
+        return "\n".join(lines) + "\n"
+
+
+def _format_bound(bound):
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+def _histogram_lines(name, labels, hist):
+    for bound, n in hist.cumulative():
+        yield f'{name}_bucket{{{labels},le="{_format_bound(bound)}"}} {n}'
+    yield f"{name}_sum{{{labels}}} {hist.total!r}"
+    yield f"{name}_count{{{labels}}} {hist.count}"
+
+
+registry = MetricsRegistry()
+
+
+def current_tool():
+    """Ferramenta do ``track`` em andamento nesta thread (``"none"`` fora de um)."""
+    return getattr(_local, "tool", None) or "none"
+
+
+@contextmanager
+def timed(stage, tool=None):
+    """Mede o bloco como a etapa ``stage`` da ferramenta atual."""
+    tool = tool or current_tool()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        registry.observe_stage(tool, stage, time.perf_counter() - start)
+
+
+def observe_size(expr, tool=None):
+    """Registra o número de nós da árvore de ``expr``."""
+    from sympy import preorder_traversal
+
+    nodes = sum(1 for _ in preorder_traversal(expr))
+    registry.observe_size(tool or current_tool(), nodes)
+    return nodes
+
+
+class _WorkerProfile:
+    """Estatísticas vindas de um worker, no formato que ``pstats.Stats`` carrega."""
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+def profile_sink():
+    """Lista que recebe os perfis dos workers do pedido em andamento nesta thread.
+
+    ``None`` quando o pedido não está sob o perfilador.
+    """
+    return getattr(_local, "worker_profiles", None)
+
+
+def _dump_profile(profiler, worker_profiles, tool, elapsed):
+    import pstats
+
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    name = f"{tool}-{time.strftime('%Y%m%d-%H%M%S')}-{int(elapsed * 1000)}ms.prof"
+    stats = pstats.Stats(profiler)
+    for worker_stats in worker_profiles:
+        stats.add(_WorkerProfile(worker_stats))
+    stats.dump_stats(os.path.join(PROFILE_DIR, name))
+
+
+@contextmanager
+def track(tool):
+    """Marca um pedido da ferramenta ``tool``: tempo total, resultado e perfil opcional.
+
+    Exceções são contadas (``timeout`` para ``ComputationTimeout``,
+    ``cancelled`` para ``ComputationCancelled``, ``error`` para as demais) e
+    propagadas.
+
+    Com outro pedido já sob o perfilador, este roda sem perfil. O perfil
+    inclui o que as chamadas a ``run_bounded`` feitas nesta thread
+    executaram nos workers, mas não o de outras threads. Falhas ao gravar as
+    métricas ou o perfil só vão para o log, sem afetar o pedido.
+    """
+    outer = getattr(_local, "tool", None) is None
+    previous, _local.tool = getattr(_local, "tool", None), tool
+    profiler = None
+    if outer and PROFILE_SLOW_MS and _profile_lock.acquire(blocking=False):
+        import cProfile
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Outro perfilador (de fora do app) já está ativo.
+            profiler = None
+            _profile_lock.release()
+    if profiler is not None:
+        _local.worker_profiles = []
+    status = "ok"
+    start = time.perf_counter()
+    try:
+        yield
+    except ComputationTimeout:
+        status = "timeout"
+        raise
+    except ComputationCancelled:
+        status = "cancelled"
+        raise
+    except Exception:
+        status = "error"
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        _local.tool = previous
+        if profiler is not None:
+            profiler.disable()
+            _profile_lock.release()
+            worker_profiles, _local.worker_profiles = _local.worker_profiles, None
+            if elapsed * 1000 >= float(PROFILE_SLOW_MS):
+                try:
+                    _dump_profile(profiler, worker_profiles, tool, elapsed)
+                except OSError:
+                    _log.exception("Não foi possível gravar o perfil de %s.", tool)
+        registry.observe_stage(tool, "total", elapsed)
+        registry.count_request(tool, status)
+        if METRICS_FILE and outer:
+            try:
+                write_metrics(METRICS_FILE)
+            except OSError:
+                _log.exception("Não foi possível gravar as métricas em %s.", METRICS_FILE)
+
+
+def write_metrics(path):
+    """Grava as métricas em ``path`` (troca atômica, para leitores como o node_exporter).
+
+    Cada gravação usa o seu próprio arquivo temporário, e as gravações do
+    processo são feitas uma de cada vez.
+    """
+    directory, name = os.path.split(os.path.abspath(path))
+    with _write_lock:
+        f = tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=directory, prefix=f".{name}.",
+                                        suffix=".tmp", delete=False)
+        try:
+            with f:
+                f.write(registry.render())
+            os.replace(f.name, path)
+        except BaseException:
+            with suppress(OSError):
+                os.remove(f.name)
+            raise
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port=None, host="127.0.0.1"):
+    """Serve ``/metrics`` em uma thread de fundo; uma vez por processo.
+
+    Sem ``port``, usa ``MATH_APP_METRICS_PORT``; se nenhum dos dois estiver
+    definido, não faz nada. Devolve o servidor, ou ``None``.
+    """
+    global _server
+    port = port or os.environ.get("MATH_APP_METRICS_PORT")
+    if not port:
+        return None
+    with _server_lock:
+        if _server is not None:
+            return _server
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        _server = ThreadingHTTPServer((host, int(port)), Handler)
+        threading.Thread(target=_server.serve_forever, name="math-app-metrics", daemon=True).start()
+    return _server
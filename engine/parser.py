@@ -0,0 +1,208 @@
+"""Leitura segura e com cache das expressões digitadas pelo usuário.
+
+Em vez de passar o texto cru para ``parse_expr`` (que faz ``eval`` com todo
+o namespace do SymPy), o texto é primeiro normalizado e verificado:
+
+* aceita ``^`` para potência, multiplicação implícita (``2x``,
+  ``(x+1)(x-1)``, ``sin x``), ``sin^2(x)`` e alguns símbolos Unicode;
+* só as funções e constantes de ``FUNCTIONS``/``CONSTANTS`` existem; os
+  demais nomes viram símbolos, e acesso a atributos, strings e colchetes são
+  recusados antes do ``eval``;
+* o tamanho do texto, o aninhamento e a profundidade da árvore são
+  limitados, assim como potências e fatoriais numéricos gigantes;
+* a árvore resultante fica em cache pelo texto normalizado, de modo que
+  ``x^2``, ``x**2`` e ``x ** 2`` são lidos uma única vez.
+"""
+
+import keyword
+import math
+import re
+from functools import lru_cache
+from tokenize import TokenError
+
+import sympy
+from sympy import Basic, Eq, Pow
+from sympy.parsing.sympy_parser import (convert_xor, function_exponentiation,
+                                        implicit_application, implicit_multiplication,
+                                        parse_expr, standard_transformations)
+
+# Tamanho máximo do texto de uma expressão.
+MAX_LENGTH = 500
+# Aninhamento máximo de parênteses e profundidade máxima da árvore final.
+MAX_DEPTH = 50
+# Maior resultado (em bits) aceito para uma potência entre números.
+MAX_POWER_BITS = 100_000
+# Maior argumento inteiro aceito em fatorial, gama e binomial.
+MAX_FACTORIAL = 5_000
+# Textos diferentes guardados no cache de leitura.
+PARSE_CACHE_SIZE = 1024
+
+FUNCTIONS = {
+    "sin": sympy.sin, "sen": sympy.sin, "cos": sympy.cos, "tan": sympy.tan, "tg": sympy.tan,
+    "cot": sympy.cot,
+    "sec": sympy.sec, "csc": sympy.csc, "asin": sympy.asin, "acos": sympy.acos,
+    "atan": sympy.atan, "acot": sympy.acot, "atan2": sympy.atan2,
+    "sinh": sympy.sinh, "cosh": sympy.cosh, "tanh": sympy.tanh, "coth": sympy.coth,
+    "asinh": sympy.asinh, "acosh": sympy.acosh, "atanh": sympy.atanh,
+    "exp": sympy.exp, "log": sympy.log, "ln": sympy.log,
+    "sqrt": sympy.sqrt, "cbrt": sympy.cbrt, "root": sympy.root,
+    "Abs": sympy.Abs, "abs": sympy.Abs, "sign": sympy.sign,
+    "floor": sympy.floor, "ceiling": sympy.ceiling,
+    "factorial": sympy.factorial, "gamma": sympy.gamma, "binomial": sympy.binomial,
+    "erf": sympy.erf, "Heaviside": sympy.Heaviside, "DiracDelta": sympy.DiracDelta,
+    "re": sympy.re, "im": sympy.im, "Min": sympy.Min, "Max": sympy.Max,
+}
+
+CONSTANTS = {"pi": sympy.pi, "E": sympy.E, "I": sympy.I, "oo": sympy.oo}
+
+_TRANSFORMATIONS = standard_transformations + (
+    convert_xor, implicit_multiplication, implicit_application, function_exponentiation,
+)
+# Nomes que o código gerado pelas transformações usa; não podem vir do usuário.
+_INTERNAL = {name: getattr(sympy, name)
+             for name in ("Symbol", "Integer", "Float", "Rational", "Number", "Function",
+                          "Add", "Mul", "Pow")}
+_UNICODE = {"×": "*", "·": "*", "÷": "/", "−": "-", "π": "pi", "√": "sqrt", "∞": "oo",
+            "²": "^2", "³": "^3"}
+_ALLOWED_CHARS = re.compile(r"^[0-9A-Za-z_+\-*/^().,!= ]*$")
+_NAME = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_SPACES_AROUND = re.compile(r"\s*([+\-*/^(),=!])\s*")
+
+
+class ParseError(ValueError):
+    """Texto recusado pelo leitor de expressões (mensagem pronta para o usuário)."""
+
+
+def normalize(text):
+    """Forma canônica do texto: símbolos Unicode trocados, ``**`` como ``^`` e espaços enxutos."""
+    text = str(text).strip()
+    for old, new in _UNICODE.items():
+        text = text.replace(old, new)
+    text = " ".join(text.split())
+    text = _SPACES_AROUND.sub(r"\1", text)
+    return text.replace("**", "^")
+
+
+def _check_text(text):
+    if not text:
+        raise ParseError("A expressão está vazia.")
+    if len(text) > MAX_LENGTH:
+        raise ParseError(f"A expressão é longa demais ({len(text)} caracteres; máximo {MAX_LENGTH}).")
+    if not _ALLOWED_CHARS.match(text):
+        bad = sorted({c for c in text if not _ALLOWED_CHARS.match(c)})
+        raise ParseError(f"Caracteres não permitidos: {' '.join(bad)}")
+    for i, char in enumerate(text):
+        if char == ".":
+            prev, nxt = text[i - 1:i], text[i + 1:i + 2]
+            if prev.isalpha() or prev in ("_", ")") or not (prev.isdigit() or nxt.isdigit()):
+                raise ParseError("Uso inválido de '.': use o ponto apenas em números decimais.")
+    depth = 0
+    for char in text:
+        depth += {"(": 1, ")": -1}.get(char, 0)
+        if depth > MAX_DEPTH:
+            raise ParseError(f"Parênteses aninhados demais (máximo {MAX_DEPTH} níveis).")
+        if depth < 0:
+            raise ParseError("Parênteses desbalanceados.")
+    if depth:
+        raise ParseError("Parênteses desbalanceados.")
+    for match in _NAME.finditer(text):
+        name = match.group()
+        if keyword.iskeyword(name) or name.startswith("_") or name in _INTERNAL:
+            raise ParseError(f"Nome não permitido: {name!r}.")
+        # ``x(x+1)`` é multiplicação implícita; nomes maiores seguidos de
+        # parênteses só podem ser funções conhecidas.
+        if text[match.end():match.end() + 1] == "(" and len(name) > 1 and name not in FUNCTIONS:
+            raise ParseError(f"Função desconhecida: {name!r}.")
+
+
+def _check_factorial(func, args):
+    """Recusa fatoriais, gamas e binomiais de números enormes antes de calculá-los."""
+    for arg in args:
+        if getattr(arg, "is_Number", False) and arg.is_finite and abs(arg) > MAX_FACTORIAL:
+            raise ParseError(f"Número grande demais para {func.__name__}: {arg}.")
+
+
+def _guarded(func):
+    """Versão de ``func`` que passa por ``_check_factorial`` (argumentos já numéricos na leitura)."""
+    def call(*args):
+        _check_factorial(func, args)
+        return func(*args)
+    return call
+
+
+def _power_bits(base, exp):
+    if not (base.is_Rational and exp.is_Integer) or exp <= 0:
+        return 0
+    magnitude = max(abs(base.p), base.q)
+    return int(exp) * math.log2(magnitude) if magnitude > 1 else 0
+
+
+def _evaluate(expr):
+    """Reconstrói a árvore avaliada, de baixo para cima, barrando potências e fatoriais gigantes.
+
+    Os argumentos só viram números aqui (``factorial(2^20)`` chega da leitura
+    com ``2^20`` não avaliado), então a verificação é feita de novo sobre os
+    argumentos já avaliados, antes de chamar a função.
+    """
+    if not expr.args:
+        return expr
+    args = [_evaluate(arg) for arg in expr.args]
+    if isinstance(expr, Pow) and _power_bits(*args) > MAX_POWER_BITS:
+        raise ParseError("Potência numérica grande demais.")
+    if expr.func in _FACTORIALS:
+        _check_factorial(expr.func, args)
+    return expr.func(*args)
+
+
+def _depth(expr):
+    return 1 + max((_depth(arg) for arg in expr.args), default=0)
+
+
+_FACTORIALS = (sympy.factorial, sympy.gamma, sympy.binomial)
+_GLOBALS = {"__builtins__": {}, **_INTERNAL, **CONSTANTS, **FUNCTIONS}
+for _name in ("factorial", "gamma", "binomial"):
+    _GLOBALS[_name] = _guarded(FUNCTIONS[_name])
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_normalized(text):
+    _check_text(text)
+    if "=" in text:
+        raise ParseError("Use '=' apenas em equações.")
+    try:
+        raw = parse_expr(text, local_dict={}, global_dict=dict(_GLOBALS),
+                         transformations=_TRANSFORMATIONS, evaluate=False)
+    except ParseError:
+        raise
+    except (SyntaxError, TypeError, TokenError, sympy.SympifyError) as e:
+        raise ParseError(f"Não foi possível entender a expressão {text!r}.") from e
+    if not isinstance(raw, Basic):
+        raise ParseError(f"Não foi possível entender a expressão {text!r}.")
+    expr = _evaluate(raw)
+    if _depth(expr) > MAX_DEPTH:
+        raise ParseError(f"Expressão aninhada demais (profundidade máxima {MAX_DEPTH}).")
+    return expr
+
+
+def parse_expression(text):
+    """Lê ``text`` e devolve a expressão do SymPy (do cache, quando já lida)."""
+    return _parse_normalized(normalize(text))
+
+
+def parse_equation(text):
+    """Lê ``lhs = rhs`` (``==`` também vale) como ``Eq``; sem ``=``, devolve a expressão."""
+    text = normalize(text).replace("==", "=")
+    if "=" not in text:
+        return parse_expression(text)
+    sides = text.split("=")
+    if len(sides) != 2:
+        raise ParseError("A equação deve ter um único sinal de igual (=).")
+    lhs, rhs = sides
+    if not lhs or not rhs:
+        raise ParseError("Os dois lados da equação precisam ser preenchidos.")
+    return Eq(parse_expression(lhs), parse_expression(rhs), evaluate=False)
+
+
+def cache_info():
+    """Estatísticas do cache de leitura (``functools`` ``CacheInfo``)."""
+    return _parse_normalized.cache_info()
@@ -0,0 +1,332 @@
+"""Amostragem adaptativa e vetorizada de funções para a calculadora gráfica.
+
+A amostragem uniforme gasta a maior parte dos pontos em trechos quase retos
+e, perto de polos como os de ``tan(x)`` ou ``1/x``, desenha picos enormes
+ligando os dois ramos. Aqui fazemos uma passada grossa e refinamos só os
+segmentos onde a curva dobra ou some (NaN/infinito). No fim, quebramos a
+linha nas descontinuidades e cortamos os valores fora da faixa visível.
+
+Famílias de curvas (várias expressões e/ou valores de parâmetros) são
+amostradas juntas numa grade x compartilhada: cada rodada de refinamento
+avalia a grade (curva × x) inteira numa única chamada difundida do NumPy.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+PlotData = namedtuple("PlotData", ["x", "y", "evaluations", "y_limits"])
+
+# Ângulo (em radianos, no espaço normalizado) a partir do qual um vértice é refinado.
+ANGLE_TOLERANCE = 0.05
+# Número máximo de bissecções de um segmento da passada inicial.
+MAX_DEPTH = 12
+# Pontos da passada grossa uniforme (no máximo).
+INITIAL_POINTS = 201
+# Curvas desenhadas juntas, no máximo (expressões × valores do parâmetro varrido).
+MAX_CURVES = 24
+
+
+def evaluate(f, xs):
+    """Avalia ``f`` vetorialmente em ``xs`` e devolve um array de floats.
+
+    Resultados escalares (expressões constantes) são difundidos para o
+    formato de ``xs`` e valores complexos viram NaN quando a parte imaginária
+    não é desprezível.
+    """
+    with np.errstate(all="ignore"):
+        ys = np.asarray(f(xs))
+    if ys.shape != xs.shape:
+        ys = np.broadcast_to(ys, xs.shape)
+    return _real_values(ys)
+
+
+def evaluate_family(f, xs, params=(), rows=1):
+    """Avalia a família ``f`` na grade (parâmetro × x) numa única chamada.
+
+    ``f`` recebe ``(x, *params)`` e devolve a lista dos valores de cada
+    expressão (``engine.compiled.compile_numeric`` com uma lista).
+    ``params`` são escalares ou colunas ``(rows, 1)`` com os valores de um
+    parâmetro varrido. Devolve um array ``(expressões · rows, len(xs))``,
+    com as linhas de cada expressão juntas.
+    """
+    shape = (rows, len(xs))
+    with np.errstate(all="ignore"):
+        values = f(xs[np.newaxis, :], *params)
+    ys = np.concatenate([np.broadcast_to(np.asarray(value), shape) for value in values])
+    return _real_values(ys)
+
+
+def _real_values(ys):
+    """Floats com NaN no lugar de infinitos e de valores complexos de verdade."""
+    if np.iscomplexobj(ys):
+        real = ys.real
+        ys = np.where(np.abs(ys.imag) <= 1e-12 * (1 + np.abs(real)), real, np.nan)
+    ys = np.array(ys, dtype=float)
+    ys[~np.isfinite(ys)] = np.nan
+    return ys
+
+
+def _view_limits(ys):
+    """Faixa visível em y, robusta a picos perto de polos."""
+    finite = ys[np.isfinite(ys)]
+    if not len(finite):
+        return -1.0, 1.0
+    low, high = np.percentile(finite, [5, 95])
+    span = high - low
+    if span == 0:
+        span = max(abs(high), 1.0)
+    low = max(finite.min(), low - 3 * span)
+    high = min(finite.max(), high + 3 * span)
+    if high == low:
+        return low - 1.0, high + 1.0
+    margin = 0.05 * (high - low)
+    return low - margin, high + margin
+
+
+def _extend_limits(ys, y_limits):
+    """Alarga a faixa visível para incluir valores legítimos achados no refinamento.
+
+    Valores próximos da faixa (como ``sqrt(x)`` perto de zero) entram; picos
+    de polos, ordens de grandeza acima, continuam de fora.
+    """
+    low, high = y_limits
+    span = high - low
+    finite = ys[np.isfinite(ys)]
+    near = finite[(finite >= low - span / 2) & (finite <= high + span / 2)]
+    if not len(near):
+        return y_limits
+    return min(low, near.min()), max(high, near.max())
+
+
+def _refinement_scores(xs, ys, x_span, y_limits):
+    """Nota de cada segmento: quanto a curva dobra em suas pontas.
+
+    ``ys`` pode ter uma linha por curva; a nota é a maior entre as curvas.
+    """
+    low, high = y_limits
+    y_span = high - low
+    ys = np.atleast_2d(ys)
+    nx = (xs - xs[0]) / x_span
+    ny = (np.clip(ys, low - y_span, high + y_span) - low) / y_span
+    angles = np.arctan2(np.diff(ny), np.diff(nx))
+    bend = np.abs(np.diff(angles))
+    bend[np.isnan(bend)] = 0.0
+
+    scores = np.zeros((len(ys), len(xs) - 1))
+    scores[:, :-1] = bend
+    scores[:, 1:] = np.maximum(scores[:, 1:], bend)
+    finite = np.isfinite(ys)
+    scores[finite[:, :-1] != finite[:, 1:]] = np.pi
+    return scores.max(axis=0)
+
+
+def _discontinuities(ys, y_limits):
+    """Índices dos segmentos que atravessam um salto ou um polo."""
+    low, high = y_limits
+    span = high - low
+    y0, y1 = ys[:-1], ys[1:]
+    jump = np.abs(y1 - y0) > 0.5 * span
+    outside = (y0 < low) | (y0 > high) | (y1 < low) | (y1 > high)
+    return np.nonzero(jump & outside & (np.sign(y0) != np.sign(y1)))[0]
+
+
+def _adaptive_grid(evaluate_rows, x_min, x_max, max_points, initial):
+    """Grade x refinada e os valores ``(linhas, pontos)`` de todas as curvas nela."""
+    max_points = max(int(max_points), 3)
+    if initial is None:
+        initial = min(max(max_points // 10, 33), INITIAL_POINTS, max_points)
+    xs = np.linspace(x_min, x_max, initial)
+    ys = evaluate_rows(xs)
+    columns = initial
+    y_limits = _view_limits(ys)
+    x_span = (x_max - x_min) or 1.0
+    min_width = x_span / (initial - 1) / 2 ** MAX_DEPTH
+
+    while columns < max_points:
+        scores = _refinement_scores(xs, ys, x_span, y_limits)
+        scores[np.diff(xs) <= min_width] = 0.0
+        candidates = np.nonzero(scores > ANGLE_TOLERANCE)[0]
+        if not len(candidates):
+            break
+        budget = max_points - columns
+        if len(candidates) > budget:
+            best = np.argsort(scores[candidates])[::-1][:budget]
+            candidates = np.sort(candidates[best])
+        midpoints = (xs[candidates] + xs[candidates + 1]) / 2
+        xs = np.insert(xs, candidates + 1, midpoints)
+        ys = np.insert(ys, candidates + 1, evaluate_rows(midpoints), axis=1)
+        columns += len(midpoints)
+
+    return xs, ys, _extend_limits(ys, y_limits)
+
+
+def _finish(xs, ys, evaluations, y_limits):
+    """Quebra a linha de uma curva nas descontinuidades e corta o que sai da faixa."""
+    breaks = _discontinuities(ys, y_limits)
+    if len(breaks):
+        xs = np.insert(xs, breaks + 1, (xs[breaks] + xs[breaks + 1]) / 2)
+        ys = np.insert(ys, breaks + 1, np.nan)
+    ys = np.clip(ys, *y_limits)
+    return PlotData(xs, ys, evaluations, y_limits)
+
+
+def adaptive_sample(f, x_min, x_max, max_points=1000, initial=None):
+    """Amostra ``f`` em ``[x_min, x_max]`` usando no máximo ``max_points`` avaliações.
+
+    Devolve ``PlotData`` com os pontos prontos para desenhar (NaN onde a
+    linha deve ser interrompida), o número de avaliações feitas e a faixa
+    visível sugerida para o eixo y.
+    """
+    xs, ys, y_limits = _adaptive_grid(lambda xs: evaluate(f, xs)[np.newaxis], x_min, x_max, max_points, initial)
+    return _finish(xs, ys[0], len(xs), y_limits)
+
+
+def adaptive_sample_family(f, x_min, x_max, max_points=1000, params=(), rows=1, initial=None):
+    """Amostra uma família de curvas numa grade x compartilhada.
+
+    ``f``, ``params`` e ``rows`` são os de ``evaluate_family``; cada rodada
+    de refinamento avalia todas as curvas nos novos pontos de uma vez e
+    refina onde qualquer uma delas dobra. ``max_points`` limita os pontos de
+    x. Devolve um ``PlotData`` por curva, todos com a mesma faixa em y;
+    ``evaluations`` conta as avaliações de todas as curvas.
+    """
+    xs, ys, y_limits = _adaptive_grid(lambda xs: evaluate_family(f, xs, params, rows),
+                                      x_min, x_max, max_points, initial)
+    return [_finish(xs, row, ys.size, y_limits) for row in ys]
+
+
+def uniform_sample(f, x_min, x_max, points=1000):
+    """Amostragem uniforme simples, mantida como referência para comparação."""
+    xs = np.linspace(x_min, x_max, int(points))
+    ys = evaluate(f, xs)
+    return PlotData(xs, ys, len(xs), _view_limits(ys))
+
+
+# Pontos enviados ao navegador, no máximo, depois da decimação.
+MAX_PAYLOAD_POINTS = 2000
+
+
+def decimate(data, max_points=MAX_PAYLOAD_POINTS):
+    """Reduz os pontos mantendo o mínimo e o máximo de cada faixa de x.
+
+    Devolve os arrays ``(x, y, segment)`` sem NaN: ``segment`` numera os
+    trechos contínuos da curva, que o gráfico desenha como linhas separadas.
+    """
+    breaks = np.isnan(data.y)
+    segment = np.cumsum(breaks)[~breaks]
+    xs, ys = data.x[~breaks], data.y[~breaks]
+    if len(xs) > max_points:
+        buckets = max(max_points // 2, 1)
+        x_min, x_max = xs[0], xs[-1]
+        bucket = np.minimum(((xs - x_min) / ((x_max - x_min) or 1.0) * buckets).astype(int), buckets - 1)
+        # Ordena por (trecho, faixa, y): o primeiro e o último de cada grupo
+        # são o mínimo e o máximo da faixa.
+        order = np.lexsort((ys, bucket, segment))
+        group = segment[order] * buckets + bucket[order]
+        first = np.r_[True, group[1:] != group[:-1]]
+        last = np.r_[group[1:] != group[:-1], True]
+        keep = np.unique(order[first | last])
+        xs, ys, segment = xs[keep], ys[keep], segment[keep]
+    return xs, ys, segment
+
+
+def plot_payload(data, max_points=MAX_PAYLOAD_POINTS):
+    """Colunas compactas (float32) prontas para um gráfico no navegador."""
+    xs, ys, segment = decimate(data, max_points)
+    return {
+        "x": xs.astype(np.float32),
+        "y": ys.astype(np.float32),
+        "segment": segment.astype(np.int32),
+    }
+
+
+def family_payload(curves, labels, max_points=MAX_PAYLOAD_POINTS):
+    """Colunas de várias curvas num só conjunto, com a coluna ``curve`` (rótulo).
+
+    O orçamento de pontos é dividido entre as curvas e os trechos são
+    renumerados para continuarem únicos no conjunto.
+    """
+    per_curve = max(max_points // len(curves), 200)
+    columns = {"x": [], "y": [], "segment": [], "curve": []}
+    offset = 0
+    for data, label in zip(curves, labels):
+        xs, ys, segment = decimate(data, per_curve)
+        columns["x"].append(xs.astype(np.float32))
+        columns["y"].append(ys.astype(np.float32))
+        columns["segment"].append((segment + offset).astype(np.int32))
+        columns["curve"].append(np.full(len(xs), label, dtype=object))
+        offset += int(segment.max()) + 1 if len(segment) else 0
+    return {name: np.concatenate(parts) for name, parts in columns.items()}
+
+
+def vega_lite_spec(title, x_range, y_limits, x_label="x", y_label="f(x)", labels=None):
+    """Especificação Vega-Lite do gráfico, com seleção de intervalo para zoom.
+
+    Arrastar sobre o gráfico seleciona um intervalo de x (parâmetro
+    ``zoom``); a aplicação usa esse intervalo para reamostrar a função.
+    Com ``labels`` (os dados de ``family_payload``), cada curva ganha uma cor.
+    """
+    mark = {"type": "line", "strokeWidth": 2.5, "clip": True}
+    encoding = {
+        "x": {"field": "x", "type": "quantitative", "title": x_label,
+              "scale": {"domain": [float(x_range[0]), float(x_range[1])], "nice": False}},
+        "y": {"field": "y", "type": "quantitative", "title": y_label,
+              "scale": {"domain": [float(y_limits[0]), float(y_limits[1])], "nice": False}},
+        "detail": {"field": "segment", "type": "nominal"},
+    }
+    if labels:
+        encoding["color"] = {"field": "curve", "type": "nominal", "title": None,
+                             "scale": {"domain": list(labels)}}
+        mark["strokeWidth"] = 2
+    else:
+        mark["color"] = "#4CAF50"
+    return {
+        "width": "container",
+        "height": 450,
+        "title": title,
+        "mark": mark,
+        "encoding": encoding,
+        "params": [{"name": "zoom", "select": {"type": "interval", "encodings": ["x"]}}],
+    }
+
+
+def render_png(data, expr_latex, var_latex="x", dpi=100):
+    """Renderiza o gráfico com Matplotlib e devolve os bytes do PNG.
+
+    ``data`` é um ``PlotData`` com a curva de ``expr_latex`` ou uma lista de
+    pares ``(PlotData, rótulo LaTeX)`` de uma família de curvas. Usa a API
+    orientada a objetos (``Figure`` + ``FigureCanvasAgg``), sem o estado
+    global do ``pyplot``; a figura é liberada antes de retornar.
+    """
+    from io import BytesIO
+
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(10, 6), dpi=dpi)
+    try:
+        canvas = FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        if isinstance(data, PlotData):
+            ax.plot(data.x, data.y, label=f'${expr_latex}$', color='#4CAF50', linewidth=2.5)
+            ax.set_ylim(*data.y_limits)
+        else:
+            for curve, label in data:
+                ax.plot(curve.x, curve.y, label=f'${label}$', linewidth=2)
+            ax.set_ylim(*data[0][0].y_limits)
+        ax.axhline(0, color='black', linewidth=0.7)
+        ax.axvline(0, color='black', linewidth=0.7)
+        ax.grid(True, which='both', linestyle='--', linewidth=0.5, alpha=0.7)
+        ax.legend(fontsize=14 if isinstance(data, PlotData) else 10)
+        ax.set_xlabel(f'${var_latex}$', fontsize=14)
+        ax.set_ylabel(f'$f({var_latex})$', fontsize=14)
+        ax.set_title(f'Gráfico de $f({var_latex}) = {expr_latex}$', fontsize=16)
+        ax.set_facecolor('#f0f2f6')
+        fig.patch.set_facecolor('#f0f2f6')
+
+        buffer = BytesIO()
+        canvas.print_png(buffer)
+        return buffer.getvalue()
+    finally:
+        fig.clear()
@@ -0,0 +1,148 @@
+"""Resolução especializada de equações polinomiais em uma variável.
+
+O ``solve`` genérico do SymPy é lento a partir do grau 5 e devolve objetos
+``CRootOf`` ou radicais enormes, caros até para converter em LaTeX. Para
+polinômios com coeficientes racionais fazemos:
+
+1. decomposição livre de quadrados e fatoração sobre os racionais (as raízes
+   racionais aparecem como fatores lineares);
+2. fórmulas fechadas para fatores até o grau 4, só quando o resultado é
+   compacto;
+3. nos demais fatores, raízes numéricas: autovalores da matriz companheira
+   (``numpy.roots``), refinados por Newton até a precisão pedida.
+"""
+
+import numpy as np
+from sympy import (Float, I, Mul, Poly, Pow, count_ops, factor_list, nsimplify,
+                   roots, sqf_list)
+
+from engine.jobs import step_list
+from engine.render import tex
+
+# Precisão padrão (dígitos significativos) das raízes numéricas.
+DEFAULT_DIGITS = 15
+# Maior grau em que tentamos fórmulas fechadas (até a quártica).
+CLOSED_FORM_DEGREE = 4
+# Raízes fechadas com mais operações que isso são trocadas pelas numéricas.
+MAX_CLOSED_FORM_OPS = 40
+# Iterações de Newton no refinamento de cada raiz.
+NEWTON_ITERATIONS = 50
+
+
+def as_polynomial(equation, x):
+    """``Poly`` em ``x`` com coeficientes racionais para ``lhs - rhs``, ou ``None``.
+
+    Equações com outras variáveis, denominadores em ``x`` ou funções não
+    polinomiais ficam com o ``solve`` genérico.
+    """
+    lhs, rhs = getattr(equation, "lhs", None), getattr(equation, "rhs", None)
+    if lhs is None:
+        return None
+    expr = lhs - rhs
+    if expr.free_symbols != {x} or not expr.is_polynomial(x):
+        return None
+    poly = Poly(nsimplify(expr, rational=True), x)
+    if poly.degree() < 1 or not poly.domain.is_QQ and not poly.domain.is_ZZ:
+        return None
+    return poly
+
+
+def _closed_form_roots(factor):
+    """Raízes exatas e compactas de um fator irredutível, ou ``None``."""
+    if factor.degree() > CLOSED_FORM_DEGREE:
+        return None
+    found = roots(factor, multiple=True)
+    if len(found) != factor.degree():
+        return None
+    for r in found:
+        if count_ops(r) > MAX_CLOSED_FORM_OPS:
+            return None
+        z = complex(r.evalf())
+        if r.has(I) and abs(z.imag) <= 1e-12 * (1 + abs(z.real)):
+            # Casus irreducibilis: raiz real escrita com radicais complexos.
+            return None
+    return found
+
+
+def _to_sympy(z, digits):
+    re, im = Float(z.real, digits), Float(z.imag, digits)
+    return re if z.imag == 0 else re + im * I
+
+
+def numeric_roots(factor, digits=DEFAULT_DIGITS):
+    """Raízes de um fator livre de quadrados com ``digits`` dígitos significativos.
+
+    Os autovalores da matriz companheira dão aproximações em precisão dupla;
+    cada uma é refinada por Newton em ``mpmath``. Se o refinamento não
+    convergir para raízes distintas (polinômios mal condicionados), usamos
+    ``Poly.nroots``.
+    """
+    import mpmath
+
+    coeffs = factor.clear_denoms()[1].all_coeffs()
+    guesses = np.roots([float(c) for c in coeffs])
+    with mpmath.workdps(digits + 10):
+        mp_coeffs = [mpmath.mpf(int(c)) for c in coeffs]
+        tolerance = mpmath.mpf(10) ** (-digits - 3)
+        refined = []
+        for guess in guesses:
+            z = mpmath.mpc(guess.real, guess.imag) if guess.imag else mpmath.mpf(guess.real)
+            for _ in range(NEWTON_ITERATIONS):
+                value, slope = mpmath.polyval(mp_coeffs, z, derivative=True)
+                if slope == 0:
+                    break
+                step = value / slope
+                z -= step
+                if abs(step) <= tolerance * max(abs(z), 1):
+                    break
+            else:
+                return factor.nroots(n=digits)
+            refined.append(z)
+        separation = mpmath.mpf(10) ** (-digits)
+        for i, a in enumerate(refined):
+            if any(abs(a - b) <= separation * max(abs(a), 1) for b in refined[i + 1:]):
+                return factor.nroots(n=digits)
+        return [_to_sympy(z, digits) for z in refined]
+
+
+def _root_order(root):
+    """Reais primeiro, em ordem crescente; depois as complexas."""
+    z = complex(root.evalf())
+    return z.imag != 0, z.real, z.imag
+
+
+def solve_polynomial(poly, numeric=False, digits=DEFAULT_DIGITS):
+    """Raízes distintas de ``poly`` e o passo a passo.
+
+    Com ``numeric=True`` as raízes irracionais saem sempre em forma
+    numérica, mesmo quando há fórmula fechada.
+    """
+    x = poly.gen
+    steps = step_list()
+    steps.append(f"A equação é polinomial de grau {poly.degree()} em ${tex(x)}$.")
+
+    factors = []
+    for part, multiplicity in sqf_list(poly)[1]:
+        for factor, _ in factor_list(part)[1]:
+            factors.append((factor, multiplicity))
+    factors.sort(key=lambda item: (item[0].degree(), str(item[0].as_expr())))
+
+    if len(factors) > 1 or factors[0][1] > 1:
+        product = Mul(*(Pow(f.as_expr(), m) for f, m in factors), evaluate=False)
+        steps.append("Fatorando sobre os racionais (parte livre de quadrados e raízes racionais):")
+        steps.append(f"$${tex(product)} = 0$$")
+
+    solutions = []
+    for factor, multiplicity in factors:
+        degree = factor.degree()
+        found = None if numeric and degree > 1 else _closed_form_roots(factor)
+        if found is not None:
+            method = "raiz racional" if degree == 1 else "fórmula fechada"
+        else:
+            found = numeric_roots(factor, digits)
+            method = f"raízes numéricas com {digits} dígitos (matriz companheira + Newton)"
+        note = f", multiplicidade {multiplicity}" if multiplicity > 1 else ""
+        steps.append(f"Fator ${tex(factor.as_expr())}$ (grau {degree}{note}): {method}.")
+        solutions.extend(found)
+    solutions.sort(key=_root_order)
+    return solutions, steps
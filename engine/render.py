@@ -0,0 +1,125 @@
+"""LaTeX memoizado e com tamanho limitado para o passo a passo.
+
+O mesmo objeto (a função, os limites de integração, a derivada anterior)
+aparece em vários passos de um mesmo cálculo; ``tex`` guarda o LaTeX de cada
+expressão num cache LRU, de modo que ele é gerado uma única vez por processo.
+
+Expressões com mais de ``MATH_APP_LATEX_NODES`` nós na árvore são abreviadas:
+numa soma ficam os primeiros termos e um ``\\cdots`` com o número de termos
+omitidos; nas demais, as subárvores grandes viram ``\\cdots``. Com
+``full_latex(True)`` (a opção "Mostrar expressões longas por completo" da
+interface), nada é abreviado.
+
+O SymPy só é importado na primeira expressão convertida, para que a
+interface possa ligar a opção sem pagar a importação.
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+
+from engine.metrics import timed
+
+# Expressões com mais nós que isso são abreviadas.
+LATEX_NODE_LIMIT = int(os.environ.get("MATH_APP_LATEX_NODES", "300"))
+# Expressões diferentes guardadas no cache de LaTeX.
+LATEX_CACHE_SIZE = 4096
+
+_state = threading.local()
+
+
+def node_count(expr):
+    """Número de nós da árvore de ``expr``."""
+    from sympy import preorder_traversal
+
+    return sum(1 for _ in preorder_traversal(expr))
+
+
+def full_latex_enabled():
+    """Verdadeiro quando a abreviação está desligada nesta thread."""
+    return getattr(_state, "full", False)
+
+
+@contextmanager
+def full_latex(enabled=True):
+    """Desliga (ou religa) a abreviação das expressões longas dentro do bloco."""
+    previous, _state.full = full_latex_enabled(), bool(enabled)
+    try:
+        yield
+    finally:
+        _state.full = previous
+
+
+def _join_terms(pieces):
+    text = pieces[0]
+    for piece in pieces[1:]:
+        text += f" {piece}" if piece.startswith("-") else f" + {piece}"
+    return text
+
+
+def _elided(expr, budget):
+    """LaTeX de ``expr`` com no máximo ~``budget`` nós visíveis."""
+    from sympy import Symbol, latex
+
+    if not expr.args or node_count(expr) <= budget:
+        return _latex(expr)
+    if expr.is_Add:
+        terms = expr.as_ordered_terms()
+        pieces, used = [], 0
+        for term in terms:
+            size = node_count(term)
+            if pieces and used + size > budget:
+                break
+            pieces.append(_elided(term, max(budget - used, 1)))
+            used += size
+        hidden = len(terms) - len(pieces)
+        text = _join_terms(pieces)
+        if hidden:
+            noun = "termo" if hidden == 1 else "termos"
+            text += f" + \\underbrace{{\\cdots}}_{{\\text{{mais {hidden} {noun}}}}}"
+        return text
+    # Nos demais nós, cada argumento grande vira um marcador, trocado depois
+    # pelo LaTeX abreviado do próprio argumento.
+    share = max(budget // len(expr.args), 1)
+    marks = {}
+    for i, arg in enumerate(expr.args):
+        if arg.args and node_count(arg) > share:
+            marks[arg] = Symbol(f"ElidedMark{chr(ord('a') + i % 26)}{'z' * (i // 26)}")
+    text = _latex(expr.xreplace(marks))
+    for arg, mark in marks.items():
+        inner = _elided(arg, share) if share > 1 else "\\cdots"
+        if arg.is_Add and (expr.is_Mul or expr.is_Pow and arg == expr.base):
+            inner = f"\\left({inner}\\right)"
+        text = text.replace(latex(mark), f"{{{inner}}}")
+    return text
+
+
+@lru_cache(maxsize=LATEX_CACHE_SIZE)
+def _latex(expr):
+    from sympy import latex
+
+    # Só a conversão de fato conta na etapa "latex"; acertos no cache não.
+    with timed("latex"):
+        return latex(expr)
+
+
+@lru_cache(maxsize=LATEX_CACHE_SIZE)
+def _tex(expr, full):
+    if full or node_count(expr) <= LATEX_NODE_LIMIT:
+        return _latex(expr)
+    return _elided(expr, LATEX_NODE_LIMIT)
+
+
+def tex(value):
+    """LaTeX de ``value`` (do cache), abreviado se a expressão for grande demais."""
+    from sympy import Basic, latex
+
+    if not isinstance(value, Basic):
+        return latex(value)
+    return _tex(value, full_latex_enabled())
+
+
+def cache_info():
+    """Estatísticas do cache de LaTeX (``functools`` ``CacheInfo``)."""
+    return _tex.cache_info()
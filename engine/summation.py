@@ -0,0 +1,256 @@
+"""Motor de somatórios em camadas.
+
+1. Somandos polinomiais usam as fórmulas de Faulhaber (números de
+   Bernoulli), pré-calculadas: custo constante, qualquer que seja o número
+   de termos.
+2. Somandos geométricos e hipergeométricos usam a forma fechada do SymPy.
+3. O resto, com limites numéricos, é avaliado vetorialmente com NumPy em
+   blocos. Quando os termos são racionais, o acúmulo é exato (inteiros do
+   Python em arrays de objetos, reduzidos em árvore); senão, em ponto
+   flutuante.
+
+A ``summation`` genérica do SymPy fica como último recurso para limites
+simbólicos ou infinitos.
+"""
+
+import math
+from functools import lru_cache
+
+import numpy as np
+from sympy import (Add, Dummy, Float, Integer, Poly, Rational, binomial, bernoulli, ceiling,
+                   expand, factor, factorial, floor, gamma, hypersimp, summation)
+
+from engine.compiled import compile_numeric
+from engine.jobs import checkpoint, step_list
+from engine.plotting import evaluate
+from engine.render import tex
+from engine.workers import ComputationTimeout, run_bounded
+
+# Acima disso o acúmulo racional exato fica caro demais (denominadores enormes).
+EXACT_TERMS_LIMIT = 20_000
+# Acima disso nem a avaliação numérica vetorizada compensa.
+NUMERIC_TERMS_LIMIT = 10**8
+CHUNK_SIZE = 1 << 20
+# Graus com fórmula de Faulhaber pré-calculada na importação.
+PRECOMPUTED_DEGREES = 20
+# Número máximo de termos mostrados na expansão do passo a passo.
+EXPANDED_TERMS = 15
+# Frações exatas com mais bits que isso (~60 dígitos) são mostradas arredondadas.
+MAX_EXACT_BITS = 200
+
+_n = Dummy('n')
+_gcd = np.frompyfunc(math.gcd, 2, 1)
+# Funções que o NumPy não avalia em arrays (fatorial, binomial) ou cujo valor
+# inteiro se perderia em ponto flutuante: somandos com elas somam termo a termo, exatos.
+_EXACT_FUNCTIONS = (factorial, binomial, gamma, floor, ceiling)
+
+
+def _bernoulli_plus(j):
+    """Número de Bernoulli com a convenção B_1 = +1/2."""
+    return Rational(1, 2) if j == 1 else bernoulli(j)
+
+
+@lru_cache(maxsize=None)
+def faulhaber(p):
+    """Polinômio S_p(n) = 1^p + 2^p + ... + n^p, pela fórmula de Faulhaber."""
+    terms = [binomial(p + 1, j) * _bernoulli_plus(j) * _n**(p + 1 - j) for j in range(p + 1)]
+    return expand(Add(*terms) / (p + 1))
+
+
+for _p in range(PRECOMPUTED_DEGREES + 1):
+    faulhaber(_p)
+
+
+def _is_numeric(value):
+    return getattr(value, "is_Integer", False) or isinstance(value, int)
+
+
+def sum_polynomial(expr, var, lower, upper):
+    """Soma de um polinômio em ``var`` por Faulhaber: S_p(m) - S_p(n - 1) por monômio."""
+    total = Integer(0)
+    for (p,), coeff in Poly(expr, var).terms():
+        formula = faulhaber(p)
+        total += coeff * (formula.subs(_n, upper) - formula.subs(_n, lower - 1))
+    if _is_numeric(lower) and _is_numeric(upper):
+        return expand(total)
+    return factor(total)
+
+
+def _rational_parts(expr, var):
+    """Numerador e denominador com coeficientes inteiros, ou ``None`` se não for racional."""
+    if expr.free_symbols - {var} or not expr.is_rational_function(var):
+        return None
+    numer, denom = expr.as_numer_denom()
+    try:
+        numer, denom = Poly(numer, var, domain='QQ'), Poly(denom, var, domain='QQ')
+    except Exception:
+        return None
+    scale = math.lcm(*(int(c.q) for c in numer.all_coeffs() + denom.all_coeffs()))
+    return ([int(c * scale) for c in numer.all_coeffs()],
+            [int(c * scale) for c in denom.all_coeffs()])
+
+
+def _horner(coeffs, ks):
+    acc = np.full(len(ks), coeffs[0], dtype=object)
+    for c in coeffs[1:]:
+        acc = acc * ks + c
+    return acc
+
+
+def sum_rational_exact(numer, denom, lower, upper):
+    """Soma exata de p(k)/q(k) para k inteiro em [lower, upper].
+
+    Numerador e denominador de todos os termos são avaliados de uma vez
+    (arrays de inteiros do Python) e as frações são somadas em árvore, com
+    redução pelo mdc a cada nível.
+    """
+    ks = np.arange(lower, upper + 1, dtype=object)
+    nums, dens = _horner(numer, ks), _horner(denom, ks)
+    if np.any(dens == 0):
+        k = ks[np.nonzero(dens == 0)[0][0]]
+        raise ValueError(f"O termo para k = {k} tem denominador zero.")
+    while len(nums) > 1:
+        if len(nums) % 2:
+            nums = np.append(nums, 0)
+            dens = np.append(dens, 1)
+        a, b = nums[0::2], nums[1::2]
+        c, d = dens[0::2], dens[1::2]
+        nums, dens = a * d + b * c, c * d
+        g = _gcd(nums, dens)
+        nums, dens = nums // g, dens // g
+    return Rational(int(nums[0]), int(dens[0]))
+
+
+def _needs_exact_terms(expr):
+    return expr.has(*_EXACT_FUNCTIONS)
+
+
+def exact_terms(expr, var, lower, upper):
+    """Valores exatos dos termos, substituindo ``var`` termo a termo."""
+    values = []
+    for k in range(lower, upper + 1):
+        if k % 1024 == 0:
+            checkpoint()
+        values.append(expr.xreplace({var: Integer(k)}))
+    return values
+
+
+def _rounded(result):
+    """Frações exatas enormes viram ``Float`` (não há erro acumulado, só o do arredondamento)."""
+    if result.is_Rational and max(abs(result.p), result.q).bit_length() > MAX_EXACT_BITS:
+        # ``evalf`` e não ``Float(result)``: a conversão passaria por texto, limitado a 4300 dígitos.
+        return result.evalf(15)
+    return result
+
+
+def sum_float(expr, var, lower, upper):
+    """Soma em ponto flutuante, avaliando o somando ``lambdify``-ado em blocos."""
+    f = compile_numeric(expr, var)
+    partials = []
+    for start in range(lower, upper + 1, CHUNK_SIZE):
+        checkpoint()
+        ks = np.arange(start, min(start + CHUNK_SIZE, upper + 1), dtype=float)
+        values = evaluate(f, ks)
+        if not np.all(np.isfinite(values)):
+            k = int(ks[np.nonzero(~np.isfinite(values))[0][0]])
+            raise ValueError(f"O termo para k = {k} não é um número real finito.")
+        partials.append(np.sum(values))
+    return math.fsum(partials)
+
+
+def term_values(expr, var, lower, upper):
+    """Valores de todos os termos de ``lower`` a ``upper`` em uma única chamada vetorizada.
+
+    Somandos racionais são avaliados exatamente (Horner sobre inteiros do
+    Python); os demais, em ponto flutuante. Somandos com outros símbolos
+    além de ``var`` (``a*k``, ``x^k``) são substituídos termo a termo.
+    Devolve ``(valores, exatos)``.
+    """
+    if expr.free_symbols - {var}:
+        return [expr.subs(var, k) for k in range(lower, upper + 1)], True
+    if _needs_exact_terms(expr):
+        return exact_terms(expr, var, lower, upper), True
+    rational = _rational_parts(expr, var)
+    if rational:
+        ks = np.arange(lower, upper + 1, dtype=object)
+        numer, denom = rational
+        return [Rational(p, q) for p, q in zip(_horner(numer, ks), _horner(denom, ks))], True
+    ks = np.arange(lower, upper + 1, dtype=float)
+    return evaluate(compile_numeric(expr, var), ks), False
+
+
+def tiered_sum(expr, var, lower, upper):
+    """Escolhe o caminho mais barato e devolve ``(resultado, método)``.
+
+    ``método`` é ``"faulhaber"``, ``"closed_form"``, ``"exact"``,
+    ``"exact_terms"``, ``"float"`` ou ``"symbolic"``.
+    """
+    numeric = _is_numeric(lower) and _is_numeric(upper)
+    if numeric and upper < lower:
+        # Convenção de Karr: soma vazia ou com limites trocados.
+        if upper == lower - 1:
+            return Integer(0), "exact"
+        result, method = tiered_sum(expr, var, upper + 1, lower - 1)
+        return -result, method
+
+    if expr.is_polynomial(var):
+        return sum_polynomial(expr, var, lower, upper), "faulhaber"
+
+    terms = int(upper - lower + 1) if numeric else None
+    rational = _rational_parts(expr, var)
+    if numeric and rational and terms <= EXACT_TERMS_LIMIT:
+        return _rounded(sum_rational_exact(*rational, int(lower), int(upper))), "exact"
+    exact_only = _needs_exact_terms(expr)
+    if numeric and exact_only and terms <= EXACT_TERMS_LIMIT:
+        return _rounded(Add(*exact_terms(expr, var, int(lower), int(upper)))), "exact_terms"
+    if numeric and rational and terms <= NUMERIC_TERMS_LIMIT:
+        return Float(sum_float(expr, var, int(lower), int(upper)), 15), "float"
+
+    hypergeometric = hypersimp(expr, var) is not None
+    # Com outros símbolos além de ``var``, ou com fatoriais e afins, não há
+    # como somar em ponto flutuante.
+    parametric = bool(expr.free_symbols - {var}) or exact_only
+    if hypergeometric or parametric or not numeric or terms > NUMERIC_TERMS_LIMIT:
+        try:
+            result = run_bounded(summation, expr, (var, lower, upper))
+            return result, "closed_form" if hypergeometric else "symbolic"
+        except ComputationTimeout:
+            if parametric or not numeric or terms > NUMERIC_TERMS_LIMIT:
+                raise
+    return Float(sum_float(expr, var, int(lower), int(upper)), 15), "float"
+
+
+_METHOD_STEPS = {
+    "faulhaber": ("O somando é um polinômio: usamos as fórmulas de Faulhaber, "
+                  "$\\sum_{k=1}^{m} k^p = \\frac{1}{p+1}\\sum_{j=0}^{p} \\binom{p+1}{j} B_j\\, m^{p+1-j}$, "
+                  "e fazemos $S_p(m) - S_p(n-1)$ para cada potência."),
+    "closed_form": "O somando é geométrico/hipergeométrico: usamos a sua forma fechada.",
+    "exact": "Os termos são racionais: somamos todos eles de forma exata.",
+    "exact_terms": "O somando tem fatoriais, binomiais ou partes inteiras: somamos os termos um a um, de forma exata.",
+    "float": "O somando não tem forma fechada simples: somamos os termos numericamente (ponto flutuante).",
+    "symbolic": "Calculando o somatório simbolicamente.",
+}
+
+
+def compute_summation(expr, var, lower, upper):
+    """Calcula o somatório de ``expr`` para ``var`` de ``lower`` até ``upper``."""
+    result, method = tiered_sum(expr, var, lower, upper)
+
+    v, e = tex(var), tex(expr)
+    sum_tex = f"\\sum_{{{v}={tex(lower)}}}^{{{tex(upper)}}} {e}"
+    steps = step_list()
+    steps.append(f"Calculando o somatório da expressão ${e}$ de ${v}={tex(lower)}$ até ${v}={tex(upper)}$.")
+    steps.append(f"$${sum_tex}$$")
+    steps.append(_METHOD_STEPS[method])
+
+    if _is_numeric(lower) and _is_numeric(upper) and 0 <= upper - lower < EXPANDED_TERMS:
+        values, exact = term_values(expr, var, int(lower), int(upper))
+        steps.append("Expandindo os termos da soma:")
+        for i, value in zip(range(int(lower), int(upper) + 1), values):
+            shown = tex(value) if exact else f"\\approx {value:.6g}"
+            steps.append(f"$$\\text{{Para }} {v}={i}: {shown}$$")
+
+    steps.append("O resultado do somatório é:")
+    relation = "\\approx" if result.is_Float else "="
+    steps.append(f"$${sum_tex} {relation} {tex(result)}$$")
+    return result, steps
@@ -0,0 +1,277 @@
+"""Motor de séries de Taylor em uma única passada.
+
+Os coeficientes ``c_k = f^(k)(x0)/k!`` são calculados uma única vez e
+usados tanto no passo a passo quanto no polinômio final. Eles saem da
+composição de séries conhecidas (``exp``, ``sin``, ``log``, potências...)
+em aritmética de séries truncadas, sem derivar nada: o número de operações
+cresce com n² em vez de com o tamanho das derivadas. Em pontos de expansão
+não nulos os próprios coeficientes crescem (``tan`` em x0 = 1 tem
+coeficientes em ``sin(1)`` e ``cos(1)``), então a composição roda no pool,
+com orçamento, e cai para o ``series`` se o estourar.
+
+O passo a passo mostra os valores ``f^(k)(x0) = k! c_k`` tirados desses
+coeficientes; a cadeia de derivadas simbólicas (``engine.derivative``) só é
+calculada a pedido, nas ordens baixas. Expressões que a composição não
+cobre usam o ``series`` do SymPy, com orçamento de tempo.
+"""
+
+from sympy import (Add, Dummy, Integer, acos, asin, asinh, atan, atanh, cos, cosh, exp,
+                   expand, factorial, log, series, sin, sinh, symbols, tan, tanh)
+
+from engine.derivative import derivative_chain
+from engine.jobs import checkpoint, step_list
+from engine.metrics import timed
+from engine.render import tex
+from engine.workers import ComputationTimeout, run_bounded
+
+# Maior ordem aceita pela interface.
+MAX_ORDER = 60
+# Até esta ordem o passo a passo mostra os valores das derivadas (e, a pedido, as derivadas), um a um.
+DERIVATIVE_STEPS_ORDER = 10
+# Coeficientes mostrados no passo a passo do caminho por composição.
+SHOWN_COEFFICIENTS = 12
+# Orçamento (s) da cadeia de derivadas mostrada no passo a passo.
+DERIVATIVE_STEPS_TIMEOUT = 3.0
+# Orçamento (s) da composição de séries antes de tentar o ``series`` do SymPy.
+COMPOSITION_TIMEOUT = 5.0
+
+
+class UnsupportedSeries(Exception):
+    """A composição de séries não cobre esta expressão (ou ela não é analítica em x0)."""
+
+
+class NotAnalytic(ValueError):
+    """A função não tem série de Taylor em x0; ``expansion`` é a expansão geral do SymPy."""
+
+    def __init__(self, expansion):
+        super().__init__("a função não é analítica no ponto de expansão")
+        self.expansion = expansion
+
+
+def _tidy(c):
+    return c if c.is_Rational else expand(c)
+
+
+def _mul(a, b):
+    result = []
+    for k in range(len(a)):
+        checkpoint()
+        result.append(_tidy(Add(*[a[i] * b[k - i] for i in range(k + 1)])))
+    return result
+
+
+def _int_pow(a, m):
+    result = [Integer(1)] + [Integer(0)] * (len(a) - 1)
+    while m:
+        if m & 1:
+            result = _mul(result, a)
+        m >>= 1
+        if m:
+            a = _mul(a, a)
+    return result
+
+
+def _real_pow(a, alpha):
+    """a^alpha pela recorrência de J. C. P. Miller (exige a_0 != 0)."""
+    if a[0] == 0:
+        raise UnsupportedSeries("potência não inteira de série com termo constante nulo")
+    b = [a[0] ** alpha]
+    for k in range(1, len(a)):
+        checkpoint()
+        acc = Add(*[((alpha + 1) * j - k) * a[j] * b[k - j] for j in range(1, k + 1)])
+        b.append(_tidy(acc / (k * a[0])))
+    return b
+
+
+def _exp(a):
+    b = [exp(a[0])]
+    for k in range(1, len(a)):
+        checkpoint()
+        b.append(_tidy(Add(*[j * a[j] * b[k - j] for j in range(1, k + 1)]) / k))
+    return b
+
+
+def _log(a):
+    if a[0] == 0:
+        raise UnsupportedSeries("log de série com termo constante nulo")
+    b = [log(a[0])]
+    for k in range(1, len(a)):
+        checkpoint()
+        acc = Add(*[j * b[j] * a[k - j] for j in range(1, k)]) / k
+        b.append(_tidy((a[k] - acc) / a[0]))
+    return b
+
+
+def _sin_cos(a, hyperbolic=False):
+    s, c = [(sinh if hyperbolic else sin)(a[0])], [(cosh if hyperbolic else cos)(a[0])]
+    sign = 1 if hyperbolic else -1
+    for k in range(1, len(a)):
+        checkpoint()
+        s.append(_tidy(Add(*[j * a[j] * c[k - j] for j in range(1, k + 1)]) / k))
+        c.append(_tidy(sign * Add(*[j * a[j] * s[k - j] for j in range(1, k + 1)]) / k))
+    return s, c
+
+
+def _derivative(a):
+    return [k * a[k] for k in range(1, len(a))] + [Integer(0)]
+
+
+def _antiderivative(d, constant):
+    return [constant] + [d[k - 1] / k for k in range(1, len(d))]
+
+
+def _inverse_trig(func, a):
+    """Funções inversas pela integral da derivada: (f∘g)' = f'(g) g'."""
+    one = [Integer(1)] + [Integer(0)] * (len(a) - 1)
+    sq = _mul(a, a)
+    if func in (atan, atanh):
+        sign = 1 if func is atan else -1
+        inner = _real_pow([o + sign * q for o, q in zip(one, sq)], -1)
+    else:
+        sign = 1 if func is asinh else -1
+        inner = _real_pow([o + sign * q for o, q in zip(one, sq)], Integer(-1) / 2)
+    d = _mul(_derivative(a), inner)
+    if func is acos:
+        d = [-c for c in d]
+    return _antiderivative(d, func(a[0]))
+
+
+_INVERSE = (atan, atanh, asin, acos, asinh)
+
+
+def _series(expr, x, x0, n):
+    """Coeficientes de ``expr`` em potências de (x - x0), até a ordem n."""
+    if x not in expr.free_symbols:
+        return [expr] + [Integer(0)] * n
+    if expr == x:
+        return [x0, Integer(1)] + [Integer(0)] * (n - 1)
+    if expr.is_Add:
+        parts = [_series(arg, x, x0, n) for arg in expr.args]
+        return [Add(*column) for column in zip(*parts)]
+    if expr.is_Mul:
+        result = None
+        for arg in expr.args:
+            part = _series(arg, x, x0, n)
+            result = part if result is None else _mul(result, part)
+        return result
+    if expr.is_Pow:
+        base, power = expr.args
+        if x in power.free_symbols:
+            return _exp(_series(power * log(base), x, x0, n))
+        a = _series(base, x, x0, n)
+        if power.is_Integer and power >= 0:
+            return _int_pow(a, int(power))
+        return _real_pow(a, power)
+    func = expr.func
+    if len(expr.args) != 1:
+        raise UnsupportedSeries(f"função {func}")
+    a = _series(expr.args[0], x, x0, n)
+    if func is exp:
+        return _exp(a)
+    if func is log:
+        return _log(a)
+    if func in (sin, cos, sinh, cosh):
+        s, c = _sin_cos(a, hyperbolic=func in (sinh, cosh))
+        return s if func in (sin, sinh) else c
+    if func in (tan, tanh):
+        s, c = _sin_cos(a, hyperbolic=func is tanh)
+        return _mul(s, _real_pow(c, -1))
+    if func in _INVERSE:
+        return _inverse_trig(func, a)
+    raise UnsupportedSeries(f"função {func}")
+
+
+def coefficients_by_composition(expr, x, x0, n):
+    """``c_0..c_n`` pela composição de séries truncadas."""
+    with timed("series_composition"):
+        return [_tidy(c) for c in _series(expr, x, x0, n)]
+
+
+def taylor_coefficients(expr, x, x0, n):
+    """Coeficientes ``c_0..c_n`` e o caminho usado (``"composition"`` ou ``"series"``).
+
+    Quando a composição não cobre a expressão (funções fora da tabela ou
+    singularidades removíveis, como ``sin(x)/x``) ou não termina em
+    ``COMPOSITION_TIMEOUT`` segundos, os coeficientes saem do ``series`` do
+    SymPy, também com orçamento de tempo.
+    """
+    try:
+        coeffs = run_bounded(coefficients_by_composition, expr, x, x0, n, timeout=COMPOSITION_TIMEOUT)
+        return coeffs, "composition"
+    except (UnsupportedSeries, ComputationTimeout):
+        pass
+    result = run_bounded(series, expr, x, x0, n + 1).removeO()
+    u = Dummy('u')
+    shifted = expand(result.subs(x, x0 + u))
+    if not shifted.is_polynomial(u):
+        raise NotAnalytic(result)
+    return [_tidy(shifted.coeff(u, k)) for k in range(n + 1)], "series"
+
+
+def _derivatives(expr, x, n):
+    return [expr] + [deriv for _, deriv in derivative_chain(expr, x, n)]
+
+
+def taylor_polynomial(coeffs, x, x0):
+    """Polinômio de Taylor com os coeficientes dados."""
+    shift = x - x0
+    return Add(*[c * shift**k for k, c in enumerate(coeffs)])
+
+
+def compute_taylor(expr, x0_expr, n, derivatives=False):
+    """Série de Taylor de ``expr`` em torno de ``x0_expr`` até a ordem ``n``.
+
+    Os coeficientes são calculados uma vez; as ordens baixas mostram os
+    valores em ``x0`` tirados desses mesmos coeficientes
+    (``f^(k)(x0) = k! c_k``). Com ``derivatives=True``, mostram também a
+    cadeia de derivadas simbólicas, calculada à parte e com orçamento.
+    """
+    x = symbols('x')
+    x0_tex = tex(x0_expr)
+    steps = step_list()
+    steps.append(f"Calculando a expansão em Série de Taylor para $f(x) = {tex(expr)}$ em torno de $x_0 = {x0_tex}$ até a ordem {n}.")
+    steps.append("A fórmula da Série de Taylor é:")
+    steps.append(r"$$f(x) \approx \sum_{k=0}^{n} \frac{f^{(k)}(x_0)}{k!}(x-x_0)^k$$")
+
+    try:
+        coeffs, method = taylor_coefficients(expr, x, x0_expr, n)
+    except NotAnalytic as e:
+        steps.append("A função não é analítica em $x_0$ (não tem série de Taylor nesse ponto). "
+                     "A expansão geral do SymPy, com potências negativas ou fracionárias, é:")
+        steps.append(f"$$f(x) \\approx {tex(e.expansion)}$$")
+        return e.expansion, steps
+
+    derivs = None
+    if derivatives and n <= DERIVATIVE_STEPS_ORDER:
+        # As derivadas são só para o passo a passo; se demorarem, ficam de fora.
+        try:
+            derivs = run_bounded(_derivatives, expr, x, n, timeout=DERIVATIVE_STEPS_TIMEOUT)
+        except ComputationTimeout:
+            steps.append("(As derivadas simbólicas não terminaram a tempo e foram omitidas.)")
+    if derivs is not None:
+        steps.append("Calculando as derivadas (cada uma a partir da anterior) e seus valores em $x_0$:")
+        for k, (deriv, c) in enumerate(zip(derivs, coeffs)):
+            value = _tidy(c * factorial(k))
+            steps.append(f"$$f^{{({k})}}(x) = {tex(deriv)} \\implies f^{{({k})}}({x0_tex}) = {tex(value)}$$")
+    else:
+        if method == "composition":
+            steps.append("Em vez de derivar n vezes, compomos as séries conhecidas "
+                         "($e^u$, $\\sin u$, $\\log u$, potências...) com aritmética de séries truncadas.")
+        else:
+            steps.append("Calculando a série diretamente com o SymPy.")
+        if n <= DERIVATIVE_STEPS_ORDER:
+            steps.append("Os valores das derivadas em $x_0$ saem dos coeficientes, "
+                         "$f^{(k)}(x_0) = k!\\, c_k$:")
+            for k, c in enumerate(coeffs):
+                steps.append(f"$$f^{{({k})}}({x0_tex}) = {tex(_tidy(c * factorial(k)))}$$")
+        else:
+            steps.append("Os coeficientes $c_k = \\frac{f^{(k)}(x_0)}{k!}$ são:")
+            for k, c in enumerate(coeffs[:SHOWN_COEFFICIENTS]):
+                steps.append(f"$$c_{{{k}}} = {tex(c)}$$")
+            if len(coeffs) > SHOWN_COEFFICIENTS:
+                steps.append(f"(… mais {len(coeffs) - SHOWN_COEFFICIENTS} coeficientes, usados no resultado abaixo.)")
+
+    result = taylor_polynomial(coeffs, x, x0_expr)
+    steps.append(f"**Resultado da Série de Taylor (ordem {n}):**")
+    steps.append(f"$$f(x) \\approx {tex(result)}$$")
+    return result, steps
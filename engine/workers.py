@@ -0,0 +1,270 @@
+"""Pool de processos isolados para operações do SymPy com orçamento de tempo e memória.
+
+Algumas entradas (``integrate(exp(x**2)*sin(x**3), x)``, por exemplo) fazem o
+SymPy rodar por minutos ou consumir gigabytes. Executadas na thread do script
+do Streamlit, elas travam o worker do servidor para todos os usuários. Aqui
+cada chamada vai para um processo já aquecido (com o SymPy importado) e, se
+estourar o limite de tempo ou de memória, o processo é morto e substituído.
+"""
+
+import atexit
+import importlib
+import multiprocessing
+import os
+import queue
+import resource
+import threading
+import time
+
+DEFAULT_TIMEOUT = float(os.environ.get("MATH_APP_TIMEOUT", "10"))
+DEFAULT_MEMORY_MB = int(os.environ.get("MATH_APP_MEMORY_MB", "512"))
+DEFAULT_WORKERS = int(os.environ.get("MATH_APP_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Tempo máximo para um processo novo terminar de importar o SymPy.
+_WARMUP_TIMEOUT = 120.0
+# Intervalo (s) entre as verificações de cancelamento enquanto um worker calcula.
+_CANCEL_POLL = 0.1
+
+# Verdadeiro dentro dos processos do pool: chamadas aninhadas rodam direto.
+_IN_WORKER = False
+
+
+class ComputationTimeout(Exception):
+    """A operação excedeu o orçamento de tempo ou de memória e foi interrompida."""
+
+
+class ComputationCancelled(Exception):
+    """A operação foi cancelada por quem a pediu (as entradas mudaram, por exemplo)."""
+
+
+def _rss_mb():
+    """Memória residente atual do processo, em MB."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _address_space_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[0])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _set_memory_limit(max_memory_mb, baseline_mb):
+    """Limita o espaço de endereçamento do worker a ``baseline + max_memory_mb``."""
+    if baseline_mb is None:
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    soft = int((baseline_mb + max_memory_mb) * 1024 * 1024)
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (soft, hard))
+    except (ValueError, OSError):
+        pass
+
+
+def _worker_main(conn, preload):
+    global _IN_WORKER
+    _IN_WORKER = True
+    for name in preload:
+        importlib.import_module(name)
+    baseline_mb = _address_space_mb()
+    try:
+        conn.send("ready")
+    except OSError:
+        # O servidor encerrou antes de o worker terminar de iniciar.
+        return
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            return
+        if message is None:
+            return
+        func, args, kwargs, max_memory_mb, profile = message
+        _set_memory_limit(max_memory_mb, baseline_mb)
+        profiler = None
+        if profile:
+            import cProfile
+
+            profiler = cProfile.Profile()
+            profiler.enable()
+        try:
+            reply = ("ok", func(*args, **kwargs))
+        except MemoryError:
+            reply = ("memory", None)
+        except Exception as e:
+            reply = ("error", e)
+        stats = None
+        if profiler is not None:
+            profiler.disable()
+            profiler.create_stats()
+            stats = profiler.stats
+        try:
+            conn.send((reply, _rss_mb(), stats))
+        except Exception as e:
+            # Resultado ou exceção que não pode ser serializado.
+            conn.send((("error", RuntimeError(repr(e))), _rss_mb(), stats))
+
+
+class _Worker:
+    def __init__(self, context, preload):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main, args=(child_conn, preload), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.ready = False
+
+    def wait_ready(self):
+        if not self.ready:
+            if not self.conn.poll(_WARMUP_TIMEOUT) or self.conn.recv() != "ready":
+                raise RuntimeError("O processo de cálculo não iniciou.")
+            self.ready = True
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=5)
+        self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=1)
+        self.kill()
+
+
+class WorkerPool:
+    """Pool de processos pré-aquecidos que executam chamadas com orçamento.
+
+    Cada processo atende uma chamada por vez. Se a chamada excede
+    ``timeout`` segundos, ou se a memória residente do processo passa de
+    ``max_memory_mb`` depois dela, o processo é morto e um novo é criado.
+    """
+
+    def __init__(self, size=DEFAULT_WORKERS, preload=("sympy",), start_method="forkserver"):
+        self.size = size
+        self.preload = tuple(preload)
+        self._context = multiprocessing.get_context(start_method)
+        if start_method == "forkserver":
+            # O servidor de fork importa o SymPy uma única vez; cada worker
+            # novo já nasce aquecido e a substituição após um timeout é barata.
+            self._context.set_forkserver_preload(list(self.preload))
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        for _ in range(size):
+            self._idle.put(_Worker(self._context, self.preload))
+
+    def run(self, func, args=(), kwargs=None, timeout=DEFAULT_TIMEOUT,
+            max_memory_mb=DEFAULT_MEMORY_MB, cancel=None, stop=None, profile=None):
+        """Executa ``func(*args, **kwargs)`` em um worker e devolve o resultado.
+
+        Levanta ``ComputationTimeout`` quando o orçamento é excedido e repassa
+        qualquer outra exceção levantada por ``func``. Se o evento ``cancel``
+        for marcado durante o cálculo, o worker é morto e a chamada levanta
+        ``ComputationCancelled``; se for o evento ``stop``, ela levanta
+        ``ComputationTimeout``, como se o orçamento tivesse acabado.
+
+        Com uma lista em ``profile``, o worker roda ``func`` sob ``cProfile``
+        e as estatísticas (no formato de ``Profile.stats``) são acrescentadas
+        a ela quando a chamada termina.
+        """
+        worker = self._idle.get()
+        recycle = True
+        try:
+            worker.wait_ready()
+            worker.conn.send((func, tuple(args), kwargs or {}, max_memory_mb, profile is not None))
+            deadline = time.monotonic() + timeout
+            while not worker.conn.poll(min(_CANCEL_POLL, max(deadline - time.monotonic(), 0))):
+                if cancel is not None and cancel.is_set():
+                    raise ComputationCancelled("o cálculo foi cancelado porque as entradas mudaram.")
+                if stop is not None and stop.is_set():
+                    raise ComputationTimeout("a operação foi interrompida porque o resultado não é mais necessário.")
+                if time.monotonic() >= deadline:
+                    raise ComputationTimeout(
+                        f"a operação excedeu o limite de {timeout:g} s e foi interrompida."
+                    )
+            (status, value), rss_mb, stats = worker.conn.recv()
+            if stats is not None:
+                profile.append(stats)
+            recycle = status == "memory" or rss_mb > max_memory_mb
+            if status == "memory":
+                raise ComputationTimeout(
+                    f"a operação excedeu o limite de {max_memory_mb} MB de memória e foi interrompida."
+                )
+            if status == "error":
+                raise value
+            return value
+        except (EOFError, OSError):
+            raise ComputationTimeout("o processo de cálculo terminou inesperadamente.")
+        finally:
+            if recycle:
+                worker.kill()
+                worker = _Worker(self._context, self.preload)
+            self._idle.put(worker)
+
+    def shutdown(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        for _ in range(self.size):
+            self._idle.get().stop()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Devolve o pool compartilhado pelo processo, criando-o na primeira chamada."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = WorkerPool()
+            atexit.register(_pool.shutdown)
+        return _pool
+
+
+def run_bounded(func, *args, timeout=None, max_memory_mb=None, stop=None, **kwargs):
+    """Executa ``func(*args, **kwargs)`` com limite de tempo e memória.
+
+    Com ``MATH_APP_WORKERS=0``, ou quando já estamos dentro de um worker, a
+    chamada roda diretamente no processo atual, sem limites. O tempo entra
+    nas métricas como a etapa com o nome de ``func`` (``integrate``,
+    ``limit``, ``simplify``...).
+
+    Dentro de um cálculo em segundo plano (``engine.jobs``), a chamada é
+    interrompida assim que o job é cancelado. Marcar o evento ``stop``, de
+    qualquer thread, também a interrompe, com ``ComputationTimeout``. Se o pedido em andamento está
+    sob o perfilador (``MATH_APP_PROFILE_SLOW_MS``), o worker também é
+    perfilado e o seu perfil entra no do pedido.
+    """
+    from engine.jobs import cancel_event, checkpoint
+    from engine.metrics import profile_sink, timed
+
+    checkpoint()
+    with timed(getattr(func, "__name__", "call")):
+        if _IN_WORKER or DEFAULT_WORKERS <= 0:
+            return func(*args, **kwargs)
+        return get_pool().run(
+            func, args, kwargs,
+            timeout=DEFAULT_TIMEOUT if timeout is None else timeout,
+            max_memory_mb=DEFAULT_MEMORY_MB if max_memory_mb is None else max_memory_mb,
+            cancel=cancel_event(),
+            stop=stop,
+            profile=profile_sink(),
+        )
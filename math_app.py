@@ -1,10 +1,20 @@
+import functools
+import time
+
 import streamlit as st
-import numpy as np
-import matplotlib.pyplot as plt
-from sympy import (symbols, diff, integrate, series, parse_expr, sin, cos, tan,
-                   exp, log, sqrt, latex, solve, summation, Eq, Symbol, lambdify,
-                   limit, laplace_transform, inverse_laplace_transform, simplify, 
-                   Add, Mul, Pow, zoo, oo)
+
+# SymPy, NumPy e Matplotlib são importados dentro de cada ferramenta, na
+# primeira vez em que ela é usada, e ficam em cache no processo (sys.modules).
+# A Calculadora Básica não depende de nenhum deles.
+from engine.cache import result_cache
+from engine.jobs import submit
+from engine.lazy import prewarm
+from engine.metrics import start_metrics_server, timed, track
+from engine.render import LATEX_NODE_LIMIT, full_latex, full_latex_enabled
+from engine.workers import ComputationCancelled, ComputationTimeout
+
+# Intervalo (s) entre as atualizações do passo a passo de um cálculo em andamento.
+STREAM_INTERVAL = 0.2
 
 # Configuração da página e Estilos CSS
 st.set_page_config(
@@ -14,6 +24,9 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Enviado só nas execuções completas da página (primeira carga, troca de
+# ferramenta, opções da barra lateral): as interações dentro de uma
+# ferramenta reexecutam apenas o fragmento dela (``tool_fragment``).
 st.markdown("""
 <style>
 /* Estilos gerais */
@@ -21,7 +34,7 @@ st.markdown("""
     background-color: #f0f2f6;
 }
 /* Botões */
-div.stButton > button {
+div.stButton > button, div.stFormSubmitButton > button {
     width: 100%;
     background-color: #4CAF50;
     color: white;
@@ -34,7 +47,7 @@ div.stButton > button {
     font-weight: bold;
     transition: background-color 0.3s ease;
 }
-div.stButton > button:hover {
+div.stButton > button:hover, div.stFormSubmitButton > button:hover {
     background-color: #45a049;
     box-shadow: 0 4px 8px rgba(0,0,0,0.2);
 }
@@ -66,415 +79,469 @@ div.stButton > button:hover {
     box-shadow: 0 2px 4px rgba(0,0,0,0.1);
     text-align: center;
 }
-/* Estilo das abas */
-.stTabs [data-baseweb="tab-list"] {
-	gap: 24px;
-}
-.stTabs [data-baseweb="tab"] {
-	height: 50px;
-    white-space: pre-wrap;
-	background-color: #F0F0F0;
-	border-radius: 8px 8px 0px 0px;
-	gap: 1px;
-	padding-top: 10px;
-	padding-bottom: 10px;
-}
-.stTabs [aria-selected="true"] {
-  	background-color: #4CAF50;
-	color: white;
-	font-weight: bold;
-}
 </style>
 """, unsafe_allow_html=True)
 
 
 # --- Funções de Renderização ---
 
-def render_latex_step(latex_expr):
-    """Renderiza uma expressão LaTeX usando o método nativo do Streamlit."""
-    st.markdown('<div class="latex-container">', unsafe_allow_html=True)
-    st.latex(latex_expr)
-    st.markdown('</div>', unsafe_allow_html=True)
-
-def render_steps(steps_list, title=""):
-    """Renderiza uma lista de passos matemáticos."""
-    if title:
-        st.markdown(f"### {title}")
+def latex_block(latex_expr):
+    """Markdown de uma fórmula LaTeX em destaque (dentro do container estilizado)."""
+    return f'<div class="latex-container">\n\n$$\n{latex_expr}\n$$\n\n</div>'
 
+def step_blocks(steps_list):
+    """Markdown de cada passo: fórmulas em destaque, texto no container de passos."""
+    blocks = []
     for step in steps_list:
         if isinstance(step, tuple) and step[0] == 'latex':
             # Se for uma tupla marcada como latex
-            render_latex_step(step[1])
+            blocks.append(latex_block(step[1]))
         elif step.startswith("$$") and step.endswith("$$"):
             # Se for uma string delimitada por $$
-            latex_content = step.strip("$")
-            render_latex_step(latex_content)
+            blocks.append(latex_block(step.strip("$")))
         else:
             # Texto explicativo normal
-            st.markdown(f'<div class="step-container">{step}</div>', unsafe_allow_html=True)
+            blocks.append(f'<div class="step-container">\n\n{step}\n\n</div>')
+    return blocks
+
+def render_steps(steps_list, title=""):
+    """Renderiza uma lista de passos matemáticos.
+
+    Todos os passos vão num único ``st.markdown`` (uma só mensagem para o
+    navegador, em vez de três por fórmula).
+    """
+    with timed("render"):
+        blocks = [f"### {title}"] if title else []
+        blocks.extend(step_blocks(steps_list))
+        st.markdown("\n\n".join(blocks), unsafe_allow_html=True)
+
+
+# --- Cálculos em segundo plano ---
+
+def _with_full_latex(full, compute, *args, **kwargs):
+    with full_latex(full):
+        return compute(*args, **kwargs)
+
+def start_job(tool, inputs, compute, *args, **kwargs):
+    """Inicia ``compute(*args, **kwargs)`` em segundo plano para as entradas ``inputs``.
+
+    O job fica em ``st.session_state["jobs"][tool]``: trocar de ferramenta
+    e voltar mostra o mesmo resultado, sem recalcular. Um cálculo anterior
+    da mesma ferramenta ainda em andamento é cancelado.
+    """
+    jobs = st.session_state.setdefault("jobs", {})
+    previous = jobs.get(tool)
+    if previous is not None and not previous.done():
+        previous.cancel()
+    full = full_latex_enabled()
+    jobs[tool] = submit(tool, (inputs, full), _with_full_latex, full, compute, *args, **kwargs)
+
+def show_job(tool, inputs, title, on_result=None, error_label="Erro no cálculo"):
+    """Mostra o cálculo da ferramenta, transmitindo os passos enquanto ele anda.
+
+    Se as entradas mudaram desde o pedido, o cálculo é cancelado e o
+    resultado antigo, descartado. ``on_result(result)`` desenha o que vem
+    antes do passo a passo (as soluções de uma equação, por exemplo).
+    """
+    jobs = st.session_state.setdefault("jobs", {})
+    job = jobs.get(tool)
+    if job is None:
+        return
+    if job.inputs != (inputs, full_latex_enabled()):
+        job.cancel()
+        del jobs[tool]
+        return
+
+    top = st.container()
+    st.markdown(f"### {title}")
+    area, status = st.empty(), st.empty()
+    box, shown = area.container(), []
+    while True:
+        finished = job.done()
+        steps = list(job.steps)
+        if steps[:len(shown)] != shown:
+            # O cálculo devolveu uma lista diferente da transmitida (veio do cache, por exemplo).
+            box, shown = area.container(), []
+        if len(steps) > len(shown):
+            with timed("render", tool=tool):
+                box.markdown("\n\n".join(step_blocks(steps[len(shown):])), unsafe_allow_html=True)
+            shown = steps
+        if finished:
+            break
+        # Cada atualização também dá ao Streamlit a chance de interromper esta
+        # execução quando o usuário muda uma entrada.
+        status.caption(f"⏳ Calculando... {time.monotonic() - job.started:.1f} s")
+        job.wait(STREAM_INTERVAL)
+    status.empty()
+
+    if isinstance(job.error, ComputationTimeout):
+        st.warning(f"⏱️ **Tempo esgotado:** {job.error}")
+    elif isinstance(job.error, ComputationCancelled):
+        st.info("O cálculo foi cancelado.")
+    elif job.error is not None:
+        st.error(f"❌ **{error_label}:** {job.error}")
+    elif on_result is not None:
+        with top:
+            on_result(job.result)
 
 
 # --- Funções da Calculadora ---
 
-def plot_function(expr, var, x_range=(-10, 10), points=1000):
-    """Gera o gráfico de uma função matemática."""
+def tool_fragment(tool):
+    """Executa a ferramenta como um fragmento do Streamlit.
+
+    Mudar um controle da ferramenta reexecuta só a função dela, não o script
+    inteiro (CSS, barra lateral e escolha da ferramenta ficam como estão).
+    Como o fragmento roda sozinho, ele mesmo lê a opção de LaTeX completo.
+    """
+    @st.fragment
+    @functools.wraps(tool)
+    def run():
+        with full_latex(st.session_state.get("latex_full", False)):
+            tool()
+    return run
+
+
+def plot_function(f, curves, title, x_range=(-10, 10), points=1000, params=(), rows=1,
+                  interactive=True, key="graph_chart"):
+    """Gera o gráfico de uma família de funções matemáticas.
+
+    ``f`` é a função compilada de ``engine.compiled`` (recebe ``(x,
+    *params)`` e devolve a lista dos valores de cada expressão); ``params``
+    e ``rows`` são os de ``engine.plotting.evaluate_family``. ``curves``
+    lista os rótulos ``(texto, LaTeX)`` de cada curva e ``title``, o par do
+    título. No modo interativo o navegador recebe só as colunas decimadas
+    das curvas e desenha o gráfico com Vega-Lite; arrastar sobre ele pede uma
+    reamostragem no intervalo escolhido. O modo imagem usa Matplotlib.
+    """
+    from engine.plotting import (adaptive_sample_family, family_payload, plot_payload, render_png,
+                                 vega_lite_spec)
+
     try:
-        x_vals = np.linspace(x_range[0], x_range[1], points)
-        f = lambdify(var, expr, 'numpy')
-        y_vals = f(x_vals)
-
-        fig, ax = plt.subplots(figsize=(10, 6))
-        ax.plot(x_vals, y_vals, label=f'${latex(expr)}$', color='#4CAF50', linewidth=2.5)
-        ax.axhline(0, color='black', linewidth=0.7)
-        ax.axvline(0, color='black', linewidth=0.7)
-        ax.grid(True, which='both', linestyle='--', linewidth=0.5, alpha=0.7)
-        ax.legend(fontsize=14)
-        ax.set_xlabel(f'${latex(var)}$', fontsize=14)
-        ax.set_ylabel(f'$f({latex(var)})$', fontsize=14)
-        ax.set_title(f'Gráfico de $f({latex(var)}) = {latex(expr)}$', fontsize=16)
-        ax.set_facecolor('#f0f2f6')
-        fig.patch.set_facecolor('#f0f2f6')
-
-        st.pyplot(fig)
+        with timed("sample"):
+            family = adaptive_sample_family(f, x_range[0], x_range[1], points, params, rows)
+
+        with timed("render"):
+            if interactive:
+                labels = [text for text, _ in curves] if len(family) > 1 else None
+                spec = vega_lite_spec(title[0], x_range, family[0].y_limits,
+                                      x_label="x", y_label="f(x)", labels=labels)
+                payload = family_payload(family, labels) if labels else plot_payload(family[0])
+                st.vega_lite_chart(payload, spec, on_select="rerun", selection_mode="zoom", key=key)
+            elif len(family) > 1:
+                st.image(render_png(list(zip(family, [tex for _, tex in curves])), title[1]))
+            else:
+                st.image(render_png(family[0], title[1]))
     except Exception as e:
         st.error(f"❌ **Erro ao gerar gráfico:** {e}")
 
+@tool_fragment
 def basic_calculator():
     st.header("Calculadora Básica")
-    col1, col2, col3 = st.columns([2, 1, 2])
-    with col1: num1 = st.number_input("Primeiro número:", value=0.0, format="%.4f")
-    with col2: operation = st.selectbox("Operação:", ["+", "-", "×", "÷", "^"])
-    with col3: num2 = st.number_input("Segundo número:", value=0.0, format="%.4f")
-
-    if st.button("Calcular", key="basic_calc"):
-        try:
-            op_map = {"+": "+", "-": "-", "×": "\times", "÷": "/", "^": "^"}
-            result_map = {
-                "+": lambda a, b: a + b,
-                "×": lambda a, b: a * b,
-                "-": lambda a, b: a - b,
-                "÷": lambda a, b: a / b if b != 0 else None,
-                "^": lambda a, b: a ** b,
-            }
-            result = result_map[operation](num1, num2)
-            if result is None:
-                st.error("❌ **Erro:** Divisão por zero")
-            else:
-                steps = []
-                steps.append("Cálculo da operação:")
-                if operation == "÷":
-                    latex_expr = f"\frac{{{num1}}}{{{num2}}} = {result}"
-                else:
-                    latex_expr = f"{num1} {op_map[operation]} {num2} = {result}"
-                steps.append(f"$${latex_expr}$$")
-                render_steps(steps)
-        except Exception as e:
-            st.error(f"❌ **Erro no cálculo:** {e}")
-
-
-def polynomial_solver():
-    st.header("Resolvedor de Equações Polinomiais")
-    equation = st.text_input("Digite a equação (ex: x^2 - 5*x + 6 = 0):", "x^2 - 4 = 0")
-    if st.button("Resolver Equação", key="poly_solve"):
-        if not equation:
-            st.warning("Por favor, insira uma equação.")
-            return
-        try:
-            x = symbols('x')
-            eq_clean = equation.replace('^', '**')
-            steps = []
-            if '=' in eq_clean:
-                lhs, rhs = eq_clean.split('=')
-                expr = Eq(parse_expr(lhs), parse_expr(rhs))
-                steps.append("A equação fornecida é:")
-                steps.append(f"$${latex(expr)}$$")
-            else:
-                expr = Eq(parse_expr(eq_clean), 0)
-                steps.append("Assumindo que a expressão é igual a zero:")
-                steps.append(f"$${latex(expr)}$$")
-
-            solutions = solve(expr, x)
-            if not solutions:
-                steps.append("A equação não possui soluções no conjunto dos números reais.")
-            else:
-                sol_latex = [latex(s) for s in solutions]
-                steps.append(f"As soluções para a variável $x$ são:")
-                st.success(f"**Soluções encontradas:** {', '.join([f'x = {s}' for s in sol_latex])}")
-                for i, sol in enumerate(solutions):
-                    steps.append(f"$$x_{i+1} = {latex(sol)}$$")
-            render_steps(steps, title="Passo a Passo da Resolução")
-        except Exception as e:
-            st.error(f"❌ **Erro ao resolver:** {e}")
-
-def summation_calculator():
-    st.header("Calculadora de Somatórios")
-    col1, col2, col3, col4 = st.columns(4)
-    sum_expr = col1.text_input("Expressão:", "k^2")
-    sum_var = col2.text_input("Variável:", "k")
-    lower = col3.number_input("Início (n):", value=1, step=1)
-    upper = col4.number_input("Fim (m):", value=10, step=1)
-
-    if st.button("Calcular Somatório", key="sum_calc"):
-        try:
-            var = symbols(sum_var)
-            expr = parse_expr(sum_expr.replace('^', '**'))
-            result = summation(expr, (var, lower, upper))
-
-            steps = []
-            steps.append(f"Calculando o somatório da expressão ${latex(expr)}$ de ${latex(var)}={lower}$ até ${latex(var)}={upper}$.")
-            steps.append(f"$$\sum_{{{latex(var)}={int(lower)}}}^{{{int(upper)}}} {latex(expr)}$$")
-
-            if upper - lower < 15:
-                steps.append("Expandindo os termos da soma:")
-                for i in range(int(lower), int(upper) + 1):
-                    term_val = expr.subs(var, i)
-                    steps.append(f"$$\text{{Para }} {latex(var)}={i}: {latex(term_val)}$$")
-
-            steps.append("O resultado do somatório é:")
-            steps.append(f"$$\sum_{{{latex(var)}={int(lower)}}}^{{{int(upper)}}} {latex(expr)} = {latex(result)}$$")
-            render_steps(steps, "Cálculo do Somatório")
-        except Exception as e:
-            st.error(f"❌ **Erro no cálculo:** {e}")
-
-def advanced_calculator():
-    st.header("Cálculos Avançados com Passo a Passo")
-    tabs = st.tabs(["Derivada", "Integral", "Limite", "Série de Taylor", "Transformada de Laplace"])
-
-    with tabs[0]: # Derivada
-        func_str = st.text_input("Função para derivar f(x):", "x**3 * cos(x)", key="deriv_func")
-        order = st.number_input("Ordem da derivada:", 1, 10, 1, key="deriv_order")
-        if st.button("Calcular Derivada", key="deriv_calc"):
+    with st.form("basic_form", border=False):
+        col1, col2, col3 = st.columns([2, 1, 2])
+        with col1: num1 = st.number_input("Primeiro número:", value=0.0, format="%.4f", key="basic_num1")
+        with col2: operation = st.selectbox("Operação:", ["+", "-", "×", "÷", "^"], key="basic_op")
+        with col3: num2 = st.number_input("Segundo número:", value=0.0, format="%.4f", key="basic_num2")
+        submitted = st.form_submit_button("Calcular", key="basic_calc")
+
+    if submitted:
+        with track("basic"):
             try:
-                x = symbols('x')
-                expr = parse_expr(func_str.replace('^', '**'))
-                steps = []
-                steps.append(f"Vamos calcular a derivada de ordem {order} da função:")
-                steps.append(f"$$f(x) = {latex(expr)}$$")
-
-                current_expr = expr
-                for i in range(1, order + 1):
-                    deriv = diff(current_expr, x)
-                    if isinstance(current_expr, Add):
-                        steps.append(f"**{i}ª Derivada:** Aplicando a Regra da Soma: $(u+v)' = u' + v'$.")
-                    elif isinstance(current_expr, Mul) and len(current_expr.args) == 2:
-                        u, v = current_expr.args
-                        du, dv = diff(u, x), diff(v, x)
-                        steps.append(f"**{i}ª Derivada:** Aplicando a Regra do Produto: $(u \cdot v)' = u' \cdot v + u \cdot v'$.")
-                        steps.append(f"Onde $u = {latex(u)}$ e $v = {latex(v)}$.")
-                        steps.append(f"As derivadas são $u' = {latex(du)}$ e $v' = {latex(dv)}$.")
-                        steps.append("Substituindo na fórmula:")
-                        steps.append(f"$$f^{{({i})}}(x) = ({latex(du)}) \cdot ({latex(v)}) + ({latex(u)}) \cdot ({latex(dv)})$$")
-                    elif isinstance(current_expr, Pow):
-                        base, exp_val = current_expr.args
-                        if x in base.free_symbols and x not in exp_val.free_symbols:
-                            steps.append(f"**{i}ª Derivada:** Aplicando a Regra da Potência: $(u^n)' = n \cdot u^{{n-1}} \cdot u'$.")
-                        elif x in exp_val.free_symbols:
-                             steps.append(f"**{i}ª Derivada:** Aplicando a Regra da Exponencial e/ou Cadeia.")
-
-                    simplified = simplify(deriv)
-                    if order > 1 and i < order:
-                        steps.append(f"O resultado da {i}ª derivada é:")
-                        steps.append(f"$$\frac{{d^{i}}}{{dx^{i}}} f(x) = {latex(simplified)}$$")
-                    current_expr = deriv
-
-                final_deriv = diff(expr, x, order)
-                final_simplified = simplify(final_deriv)
-
-                steps.append("**Resultado Final:**")
-                if order == 1:
-                    steps.append(f"$$f'(x) = {latex(final_simplified)}$$")
+                op_map = {"+": "+", "-": "-", "×": "\times", "÷": "/", "^": "^"}
+                result_map = {
+                    "+": lambda a, b: a + b,
+                    "×": lambda a, b: a * b,
+                    "-": lambda a, b: a - b,
+                    "÷": lambda a, b: a / b if b != 0 else None,
+                    "^": lambda a, b: a ** b,
+                }
+                result = result_map[operation](num1, num2)
+                if result is None:
+                    st.error("❌ **Erro:** Divisão por zero")
                 else:
-                    steps.append(f"$$f^{{({order})}}(x) = {latex(final_simplified)}$$")
-
-                render_steps(steps, "Cálculo da Derivada")
-
-            except Exception as e:
-                st.error(f"❌ **Erro no cálculo:** {e}")
-
-    with tabs[1]: # Integral
-        func_str = st.text_input("Função para integrar f(x):", "x**2 + sin(x)", key="int_func")
-        int_type = st.radio("Tipo de integral:", ["Indefinida", "Definida"], key="int_type", horizontal=True)
-        a, b = "0", "1"
-        if int_type == "Definida":
-            col_a, col_b = st.columns(2)
-            a = col_a.text_input("Limite inferior (a):", "0", key="int_a")
-            b = col_b.text_input("Limite superior (b):", "1", key="int_b")
-
-        if st.button("Calcular Integral", key="int_calc"):
-            try:
-                x = Symbol('x')
-                expr = parse_expr(func_str.replace('^', '**'))
-
-                steps = []
-                steps.append("Vamos calcular a integral da função:")
-                steps.append(f"$$f(x) = {latex(expr)}$$")
-
-                if isinstance(expr, Add):
-                    steps.append("Aplicando a Regra da Soma para integrais: $\int (u+v) dx = \int u dx + \int v dx$.")
-                    for arg in expr.args:
-                        arg_integral = integrate(arg, x)
-                        steps.append(f"$$\int {latex(arg)} \, dx = {latex(arg_integral)}$$")
-
-                primitive = integrate(expr, x)
-                steps.append("A primitiva (integral indefinida) da função é:")
-                steps.append(f"$$F(x) = \int {latex(expr)} \, dx = {latex(primitive)}$$")
-
-                if int_type == "Indefinida":
-                    steps.append("**Resultado Final (Integral Indefinida):**")
-                    steps.append(f"$$\int {latex(expr)} \, dx = {latex(primitive)} + C$$")
-                else:
-                    a_expr, b_expr = parse_expr(a), parse_expr(b)
-                    Fa = primitive.subs(x, a_expr)
-                    Fb = primitive.subs(x, b_expr)
-                    result = Fb - Fa
-
-                    steps.append("Para a integral definida, aplicamos o Teorema Fundamental do Cálculo:")
-                    steps.append(f"$$\int_{{{latex(a_expr)}}}^{{{latex(b_expr)}}} f(x) \, dx = F({latex(b_expr)}) - F({latex(a_expr)})$$")
-                    steps.append("Calculando os valores nos limites:")
-                    steps.append(f"$$F({latex(b_expr)}) = {latex(Fb)}$$")
-                    steps.append(f"$$F({latex(a_expr)}) = {latex(Fa)}$$")
-                    steps.append("**Resultado Final (Integral Definida):**")
-                    steps.append(f"$$\int_{{{latex(a_expr)}}}^{{{latex(b_expr)}}} f(x) \, dx = {latex(result)}$$")
-                    if result.is_number:
-                         steps.append(f"$$\approx {result.evalf(6)}$$")
-
-                render_steps(steps, "Cálculo da Integral")
-
-            except Exception as e:
-                st.error(f"❌ **Erro no cálculo:** {e}")
-
-    with tabs[2]: # Limite
-        func_str = st.text_input("Função para limite f(x):", "sin(x)/x", key="lim_func")
-        point = st.text_input("Ponto de aproximação x₀:", "0", key="lim_point")
-        direction = st.selectbox("Direção:", ["bilateral", "pela direita (+)", "pela esquerda (-)"], key="lim_dir")
-
-        if st.button("Calcular Limite", key="lim_calc"):
-            try:
-                x = Symbol('x')
-                expr = parse_expr(func_str.replace('^', '**'))
-                point_expr = parse_expr(point.replace('^', '**'))
-
-                dir_map = {"bilateral": None, "pela direita (+)": "+", "pela esquerda (-)": "-"}
-                dir_symbol_map = {"bilateral": "", "pela direita (+)": "^+", "pela esquerda (-)": "^-"}
-
-                steps = []
-                steps.append(f"Vamos calcular o limite da função quando $x$ tende a ${latex(point_expr)}$:")
-                steps.append(f"$$f(x) = {latex(expr)}$$")
-                steps.append(f"$$\lim_{{x \to {latex(point_expr)}{dir_symbol_map[direction]}}} {latex(expr)}$$")
-
-                # Tentar substituição direta
-                try:
-                    num = limit(expr.as_numer_denom()[0], x, point_expr)
-                    den = limit(expr.as_numer_denom()[1], x, point_expr)
-
-                    is_indeterminate = False
-                    if (num == 0 and den == 0):
-                        is_indeterminate = True
-                    elif num.has(zoo, oo, -oo) or den.has(zoo, oo, -oo):
-                        is_indeterminate = True
-
-                    if is_indeterminate:
-                        steps.append("A substituição direta resulta em uma forma indeterminada.")
-                        steps.append("O SymPy aplicará técnicas avançadas, como a Regra de L'Hôpital, para resolver o limite.")
+                    steps = []
+                    steps.append("Cálculo da operação:")
+                    if operation == "÷":
+                        latex_expr = f"\frac{{{num1}}}{{{num2}}} = {result}"
                     else:
-                        direct_sub = expr.subs(x, point_expr)
-                        steps.append("Tentando a substituição direta:")
-                        steps.append(f"$$f({latex(point_expr)}) = {latex(direct_sub)}$$")
-                except Exception:
-                    steps.append("A substituição direta não é trivial. Vamos calcular o limite diretamente.")
-
-                result = limit(expr, x, point_expr, dir_map[direction])
-
-                steps.append("**Resultado Final:**")
-                steps.append(f"$$\lim_{{x \to {latex(point_expr)}{dir_symbol_map[direction]}}} {latex(expr)} = {latex(result)}$$")
-
-                render_steps(steps, "Cálculo do Limite")
-
+                        latex_expr = f"{num1} {op_map[operation]} {num2} = {result}"
+                    steps.append(f"$${latex_expr}$$")
+                    render_steps(steps)
             except Exception as e:
                 st.error(f"❌ **Erro no cálculo:** {e}")
 
-    with tabs[3]: # Série de Taylor
-        func_str = st.text_input("Função f(x):", "exp(x)", key="taylor_func")
-        x0 = st.text_input("Ponto de expansão (x₀):", "0", key="taylor_x0")
-        n = st.number_input("Ordem (n):", 1, 10, 4, key="taylor_n")
 
-        if st.button("Calcular Série de Taylor", key="taylor_calc"):
-            try:
-                x = Symbol('x')
-                expr = parse_expr(func_str.replace('^','**'))
-                x0_expr = parse_expr(x0.replace('^','**'))
-
-                steps = []
-                steps.append(f"Calculando a expansão em Série de Taylor para $f(x) = {latex(expr)}$ em torno de $x_0 = {latex(x0_expr)}$ até a ordem {n}.")
-                steps.append("A fórmula da Série de Taylor é:")
-                steps.append("$$f(x) \approx \sum_{k=0}^{n} \frac{f^{(k)}(x_0)}{k!}(x-x_0)^k$$")
-                steps.append("Calculando as derivadas e seus valores em $x_0$:")
-
-                for i in range(n + 1):
-                    deriv = diff(expr, x, i)
-                    deriv_val = deriv.subs(x, x0_expr)
-                    steps.append(f"$$f^{{({i})}}(x) = {latex(deriv)} \implies f^{{({i})}}({latex(x0_expr)}) = {latex(deriv_val)}$$")
+# --- Ferramentas da Interface ---
 
-                result = series(expr, x, x0_expr, n+1).removeO()
-                steps.append(f"**Resultado da Série de Taylor (ordem {n}):**")
-                steps.append(f"$$f(x) \approx {latex(result)}$$")
+@tool_fragment
+def polynomial_solver():
+    from sympy import latex
 
-                render_steps(steps, "Cálculo da Série de Taylor")
+    from engine import api
 
-            except Exception as e:
-                st.error(f"❌ **Erro no cálculo:** {e}")
-
-    with tabs[4]: # Transformada de Laplace
-        func_str = st.text_input("Função f(t):", "t*exp(-a*t)", key="transf_func")
-        transf_type = st.radio("Tipo:", ["Direta", "Inversa"], key="transf_type", horizontal=True)
+    st.header("Resolvedor de Equações Polinomiais")
+    with st.form("poly_form", border=False):
+        equation = st.text_input("Digite a equação (ex: x^2 - 5*x + 6 = 0):", "x^2 - 4 = 0",
+                                 key="poly_equation", persist_state="session")
+        col1, col2 = st.columns(2)
+        numeric = col1.checkbox("Raízes numéricas", value=False, key="poly_numeric", persist_state="session",
+                                help="Mostra todas as raízes em forma decimal, mesmo quando há fórmula fechada.")
+        digits = col2.number_input("Precisão (dígitos):", min_value=5, max_value=100, value=15, step=1,
+                                   key="poly_digits", persist_state="session")
+        submitted = st.form_submit_button("Resolver Equação", key="poly_solve")
+    inputs = (equation, numeric, digits)
+    if submitted:
+        if not equation:
+            st.warning("Por favor, insira uma equação.")
+            return
+        start_job("solve", inputs, api.solve_equation, equation, numeric=numeric, digits=digits)
 
-        if st.button("Calcular Transformada", key="transf_calc"):
-            try:
-                t, s, a = symbols('t s a')
-                expr = parse_expr(func_str.replace('^','**'))
-                steps = []
-
-                if transf_type == "Direta":
-                    steps.append(f"Calculando a Transformada de Laplace de $f(t) = {latex(expr)}$:")
-                    steps.append("$$\mathcal{{L}}\{{f(t)\}} = F(s) = \int_0^{\infty} f(t) e^{{-st}} dt$$")
-                    result = laplace_transform(expr, t, s, noconds=True)
-                    steps.append("**Resultado:**")
-                    steps.append(f"$$F(s) = {latex(result)}$$")
-                else:
-                    steps.append(f"Calculando a Transformada Inversa de Laplace de $F(s) = {latex(expr)}$:")
-                    steps.append("$$\mathcal{{L}}^{{-1}}\{{F(s)\}} = f(t)$$")
-                    result = inverse_laplace_transform(expr, s, t)
-                    steps.append("**Resultado:**")
-                    steps.append(f"$$f(t) = {latex(result)}$$")
+    def show_solutions(solutions):
+        if solutions:
+            with timed("latex", tool="solve"):
+                sol_latex = [latex(s) for s in solutions]
+            st.success(f"**Soluções encontradas:** {', '.join([f'x = {s}' for s in sol_latex])}")
 
-                render_steps(steps, f"Cálculo da Transformada {transf_type} de Laplace")
+    show_job("solve", inputs, "Passo a Passo da Resolução", on_result=show_solutions,
+             error_label="Erro ao resolver")
 
-            except Exception as e:
-                st.error(f"❌ **Erro no cálculo:** {e}")
+@tool_fragment
+def summation_calculator():
+    from engine import api
 
+    st.header("Calculadora de Somatórios")
+    with st.form("sum_form", border=False):
+        col1, col2, col3, col4 = st.columns(4)
+        sum_expr = col1.text_input("Expressão:", "k^2", key="sum_expr", persist_state="session")
+        sum_var = col2.text_input("Variável:", "k", key="sum_var", persist_state="session")
+        lower = col3.number_input("Início (n):", value=1, step=1, key="sum_lower", persist_state="session")
+        upper = col4.number_input("Fim (m):", value=10, step=1, key="sum_upper", persist_state="session")
+        submitted = st.form_submit_button("Calcular Somatório", key="sum_calc")
+
+    inputs = (sum_expr, sum_var, lower, upper)
+    if submitted:
+        start_job("summation", inputs, api.summation, sum_expr, sum_var, lower, upper)
+    show_job("summation", inputs, "Cálculo do Somatório")
+
+@tool_fragment
+def advanced_calculator():
+    from engine import api
+    from engine.taylor import MAX_ORDER
 
+    st.header("Cálculos Avançados com Passo a Passo")
+    # Um seletor no lugar de abas: só os controles do cálculo escolhido são montados.
+    tab = st.segmented_control("Cálculo:", ["Derivada", "Integral", "Limite", "Série de Taylor",
+                                            "Transformada de Laplace"],
+                               default="Derivada", required=True, key="adv_tab", label_visibility="collapsed",
+                               width="stretch", persist_state="session")
+
+    if tab == "Derivada":
+        with st.form("deriv_form", border=False):
+            func_str = st.text_input("Função para derivar f(x):", "x**3 * cos(x)", key="deriv_func",
+                                     persist_state="session")
+            order = st.number_input("Ordem da derivada:", 1, 10, 1, key="deriv_order", persist_state="session")
+            submitted = st.form_submit_button("Calcular Derivada", key="deriv_calc")
+        inputs = (func_str, order)
+        if submitted:
+            start_job("derivative", inputs, api.derivative, func_str, order)
+        show_job("derivative", inputs, "Cálculo da Derivada")
+
+    elif tab == "Integral":
+        # Fora do formulário: escolher "Definida" mostra os campos dos limites na hora.
+        int_type = st.radio("Tipo de integral:", ["Indefinida", "Definida"], key="int_type", horizontal=True,
+                            persist_state="session")
+        with st.form("int_form", border=False):
+            func_str = st.text_input("Função para integrar f(x):", "x**2 + sin(x)", key="int_func",
+                                     persist_state="session")
+            a, b = "0", "1"
+            if int_type == "Definida":
+                col_a, col_b = st.columns(2)
+                a = col_a.text_input("Limite inferior (a):", "0", key="int_a", persist_state="session")
+                b = col_b.text_input("Limite superior (b):", "1", key="int_b", persist_state="session")
+            submitted = st.form_submit_button("Calcular Integral", key="int_calc")
+
+        inputs = (func_str, int_type, a, b)
+        if submitted:
+            bounds = () if int_type == "Indefinida" else (a, b)
+            start_job("integral", inputs, api.integral, func_str, *bounds)
+        show_job("integral", inputs, "Cálculo da Integral")
+
+    elif tab == "Limite":
+        with st.form("lim_form", border=False):
+            func_str = st.text_input("Função para limite f(x):", "sin(x)/x", key="lim_func",
+                                     persist_state="session")
+            point = st.text_input("Ponto de aproximação x₀:", "0", key="lim_point", persist_state="session")
+            direction = st.selectbox("Direção:", ["bilateral", "pela direita (+)", "pela esquerda (-)"],
+                                     key="lim_dir", persist_state="session")
+            lim_numeric = st.checkbox("Sonda numérica (estimativa rápida, sem cálculo simbólico)",
+                                      key="lim_numeric", persist_state="session")
+            submitted = st.form_submit_button("Calcular Limite", key="lim_calc")
+        dir_map = {"bilateral": "+-", "pela direita (+)": "+", "pela esquerda (-)": "-"}
+
+        inputs = (func_str, point, direction, lim_numeric)
+        if submitted:
+            start_job("limit", inputs, api.limit, func_str, point, dir_map[direction], numeric=lim_numeric)
+        show_job("limit", inputs, "Cálculo do Limite")
+
+    elif tab == "Série de Taylor":
+        with st.form("taylor_form", border=False):
+            func_str = st.text_input("Função f(x):", "exp(x)", key="taylor_func", persist_state="session")
+            x0 = st.text_input("Ponto de expansão (x₀):", "0", key="taylor_x0", persist_state="session")
+            n = st.number_input("Ordem (n):", 1, MAX_ORDER, 4, key="taylor_n", persist_state="session")
+            taylor_derivs = st.checkbox("Mostrar as derivadas simbólicas (mais lento)", key="taylor_derivs",
+                                        persist_state="session")
+            submitted = st.form_submit_button("Calcular Série de Taylor", key="taylor_calc")
+
+        inputs = (func_str, x0, n, taylor_derivs)
+        if submitted:
+            start_job("taylor", inputs, api.taylor, func_str, x0, n, derivatives=taylor_derivs)
+        show_job("taylor", inputs, "Cálculo da Série de Taylor")
+
+    elif tab == "Transformada de Laplace":
+        with st.form("transf_form", border=False):
+            func_str = st.text_input("Função f(t):", "t*exp(-a*t)", key="transf_func", persist_state="session")
+            transf_type = st.radio("Tipo:", ["Direta", "Inversa"], key="transf_type", horizontal=True,
+                                   persist_state="session")
+            submitted = st.form_submit_button("Calcular Transformada", key="transf_calc")
+
+        inputs = (func_str, transf_type)
+        if submitted:
+            start_job("laplace", inputs, api.laplace, func_str, inverse=transf_type == "Inversa")
+        show_job("laplace", inputs, f"Cálculo da Transformada {transf_type} de Laplace")
+
+
+def _graph_view(func_str, x_range, points):
+    """Expressões do gráfico já analisadas e compiladas, guardadas entre as execuções.
+
+    Os controles dos parâmetros só mudam os valores numéricos: mexer neles
+    reaproveita a função compilada daqui, sem analisar nem compilar de novo.
+    """
+    from sympy import latex, symbols
+
+    from engine.api import parse_input
+    from engine.compiled import compile_numeric
+    from engine.plotting import MAX_CURVES
+
+    texts = [text.strip() for text in func_str.split(";") if text.strip()]
+    if len(texts) > MAX_CURVES:
+        raise ValueError(f"no máximo {MAX_CURVES} funções por gráfico.")
+    x = symbols('x')
+    exprs = [parse_input(text) for text in texts]
+    params = sorted({symbol for expr in exprs for symbol in expr.free_symbols} - {x}, key=str)
+    with timed("latex"):
+        latexes = [latex(expr) for expr in exprs]
+    return {
+        "func": func_str,
+        "exprs": [str(expr) for expr in exprs],
+        "latex": latexes,
+        "params": [str(param) for param in params],
+        "param_latex": [latex(param) for param in params],
+        "f": compile_numeric(exprs, (x, *params)),
+        "range": x_range,
+        "initial_range": x_range,
+        "points": points,
+    }
+
+
+def _param_controls(view):
+    """Controles dos parâmetros livres: ``(params, rows, rótulos por valor)``.
+
+    Cada parâmetro tem um controle deslizante; um deles pode ser varrido, e
+    então vira uma coluna de valores avaliada numa única chamada.
+    """
+    import numpy as np
+
+    from engine.plotting import MAX_CURVES
+
+    names = view["params"]
+    if not names:
+        return (), 1, [("", "")]
+    st.markdown("**Parâmetros:**")
+    # Curvas por função que ainda cabem no limite do gráfico.
+    max_rows = MAX_CURVES // len(view["exprs"])
+    can_sweep = max_rows >= 2
+    sweep = st.selectbox("Família de curvas em:", ["Nenhum", *names], key="graph_sweep",
+                         disabled=not can_sweep,
+                         help=None if can_sweep else
+                         f"Com {len(view['exprs'])} funções, uma família passaria de {MAX_CURVES} curvas.")
+    if not can_sweep:
+        sweep = "Nenhum"
+    values = {}
+    rows, suffixes = 1, [("", "")]
+    if sweep != "Nenhum":
+        index = names.index(sweep)
+        col1, col2 = st.columns([3, 1])
+        low, high = col1.slider(f"Intervalo de {sweep}:", -10.0, 10.0, (1.0, 5.0), 0.1,
+                                key=f"graph_sweep_{sweep}")
+        rows = col2.number_input("Curvas:", 2, max_rows, min(5, max_rows), key="graph_sweep_count")
+        column = np.linspace(low, high, int(rows))
+        values[sweep] = column[:, np.newaxis]
+        suffixes = [(f", {sweep} = {value:g}", f",\\ {view['param_latex'][index]} = {value:g}")
+                    for value in column]
+    cols = st.columns(min(len(names), 4))
+    for i, name in enumerate(names):
+        if name != sweep:
+            values[name] = cols[i % len(cols)].slider(name, -10.0, 10.0, 1.0, 0.1, key=f"graph_param_{name}")
+    return tuple(values[name] for name in names), int(rows), suffixes
+
+
+@tool_fragment
 def graphing_calculator():
     st.header("Calculadora Gráfica")
-    func_str = st.text_input("Função f(x) para plotar:", "sin(x) * exp(-x/10)", key="graph_func")
-
-    col1, col2, col3 = st.columns(3)
-    x_min = col1.number_input("X mínimo:", value=-10.0)
-    x_max = col2.number_input("X máximo:", value=10.0)
-    points = col3.number_input("Pontos no gráfico:", 100, 5000, 1000)
-
-    if st.button("Plotar Função", key="plot_func"):
+    with st.form("graph_form", border=False):
+        func_str = st.text_input("Função f(x) para plotar (separe várias com ';'):", "sin(x) * exp(-x/10)",
+                                 key="graph_func",
+                                 help="Símbolos além de x viram parâmetros, ajustáveis depois de plotar (ex.: sin(a*x)).")
+
+        col1, col2, col3 = st.columns(3)
+        x_min = col1.number_input("X mínimo:", value=-10.0, key="graph_x_min")
+        x_max = col2.number_input("X máximo:", value=10.0, key="graph_x_max")
+        points = col3.number_input("Pontos no gráfico (máximo):", 100, 5000, 1000, key="graph_points")
+        submitted = st.form_submit_button("Plotar Função", key="plot_func")
+    backend = st.radio("Renderização:", ["Interativa", "Imagem (Matplotlib)"], key="graph_backend", horizontal=True)
+
+    if submitted:
         if not func_str:
             st.warning("Por favor, insira uma função.")
             return
         try:
-            x = symbols('x')
-            expr = parse_expr(func_str.replace('^', '**'))
-            st.markdown("---")
-            st.write("**Função a ser plotada:**")
-            st.latex(f"f(x) = {latex(expr)}")
-            plot_function(expr, x, (x_min, x_max), int(points))
+            with track("plot"):
+                st.session_state["graph_view"] = _graph_view(func_str, (x_min, x_max), int(points))
         except Exception as e:
             st.error(f"❌ **Erro ao plotar:** {e}")
+            return
+
+    view = st.session_state.get("graph_view")
+    if not view:
+        return
+
+    # Um intervalo selecionado no gráfico anterior é um pedido de zoom.
+    chart_key = f"graph_chart_{view['range'][0]}_{view['range'][1]}"
+    zoom = (st.session_state.get(chart_key) or {}).get("selection", {}).get("zoom", {}).get("x")
+    if zoom and zoom[0] != zoom[1]:
+        view["range"] = (min(zoom), max(zoom))
+        chart_key = f"graph_chart_{view['range'][0]}_{view['range'][1]}"
+
+    try:
+        with track("plot"):
+            st.markdown("---")
+            st.write("**Função a ser plotada:**" if len(view["exprs"]) == 1 else "**Funções a serem plotadas:**")
+            st.latex(";\\quad ".join(f"f(x) = {expr_latex}" for expr_latex in view["latex"]))
+            params, rows, suffixes = _param_controls(view)
+            curves = [(f"f(x) = {expr}{text}", f"{expr_latex}{tex}")
+                      for expr, expr_latex in zip(view["exprs"], view["latex"]) for text, tex in suffixes]
+            title = ("; ".join(f"f(x) = {expr}" for expr in view["exprs"]), ";\\ ".join(view["latex"]))
+            interactive = backend == "Interativa"
+            if interactive:
+                st.caption("Arraste sobre o gráfico para ampliar e reamostrar o intervalo selecionado.")
+            plot_function(view["f"], curves, title, view["range"], view["points"], params, rows,
+                          interactive=interactive, key=chart_key)
+        if view["range"] != view["initial_range"] and st.button("Restaurar intervalo", key="graph_reset"):
+            view["range"] = view["initial_range"]
+            st.rerun(scope="fragment")
+    except Exception as e:
+        st.error(f"❌ **Erro ao plotar:** {e}")
 
 def main():
     st.markdown('<h1 class="header">🧮 Calculadora Avançada Pro</h1>', unsafe_allow_html=True)
@@ -491,8 +558,12 @@ def main():
     st.sidebar.title("Ferramentas")
     selection = st.sidebar.radio("Escolha uma ferramenta:", tool_options)
 
+    st.sidebar.checkbox("Mostrar expressões longas por completo", key="latex_full",
+                        help=f"Por padrão, expressões com mais de {LATEX_NODE_LIMIT} nós são abreviadas no passo a passo.")
+
     st.sidebar.markdown("---")
     st.sidebar.info("Esta aplicação utiliza as bibliotecas SymPy e Streamlit para fornecer uma calculadora simbólica interativa.")
+    cache_placeholder = st.sidebar.empty()
 
     if selection == tool_options[0]:
         basic_calculator()
@@ -505,5 +576,15 @@ def main():
     elif selection == tool_options[4]:
         graphing_calculator()
 
+    stats = result_cache.stats()
+    cache_placeholder.caption(
+        f"Cache de resultados: {stats['hits']} acertos, {stats['misses']} falhas, "
+        f"{stats['size']}/{stats['maxsize']} entradas"
+    )
+
+    # A página já foi enviada; carrega o resto em segundo plano.
+    prewarm()
+    start_metrics_server()
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,64 @@
+import threading
+import time
+
+import pytest
+from sympy import symbols
+
+from engine.cache import ResultCache, make_key
+from engine.parser import parse_expression
+
+x = symbols("x")
+
+
+def test_concurrent_requests_for_the_same_key_compute_once():
+    cache = ResultCache()
+    calls = []
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return "resultado", ["passo"]
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    # Dá tempo para as outras threads chegarem enquanto o primeiro cálculo está em andamento.
+    time.sleep(0.2)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [1]
+    assert results == [("resultado", ["passo"])] * 8
+    assert cache.stats()["misses"] == 1
+
+
+def test_failed_computation_is_not_cached():
+    cache = ResultCache()
+
+    def fail():
+        raise ValueError("falhou")
+
+    with pytest.raises(ValueError):
+        cache.get_or_compute("k", fail)
+    assert cache.get_or_compute("k", lambda: 42) == 42
+    assert len(cache) == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResultCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+
+def test_equivalent_inputs_share_a_key():
+    assert make_key("derivative", parse_expression("x^2"), order=1) == \
+        make_key("derivative", x**2, order=1)
+    assert make_key("derivative", x**2, order=1) != make_key("derivative", x**2, order=2)
@@ -0,0 +1,32 @@
+import time
+
+import pytest
+from sympy import diff, exp, simplify, sin, symbols
+
+from engine.derivative import compute_derivative, derivative_chain
+from engine.workers import ComputationTimeout
+
+x = symbols("x")
+
+
+@pytest.mark.parametrize("expr, order", [
+    (x**3 * sin(x), 2),
+    (exp(x) / (1 + x**2), 3),
+    (x**5 - 3 * x**2, 4),
+])
+def test_derivatives_match_sympy(expr, order):
+    result, _ = compute_derivative(expr, order)
+    assert simplify(result - diff(expr, x, order)) == 0
+
+
+def test_long_chains_stop_at_the_budget_and_keep_earlier_orders():
+    # Sem o orçamento, a 10ª derivada desta função leva vários segundos.
+    expr = x**x * sin(x) / (1 + x**2)
+    orders = []
+    start = time.perf_counter()
+    with pytest.raises(ComputationTimeout):
+        for k, deriv in derivative_chain(expr, x, 10, timeout=1.0):
+            orders.append((k, deriv))
+    assert time.perf_counter() - start < 5
+    assert orders and orders[0][0] == 1
+    assert simplify(orders[0][1] - diff(expr, x)) == 0
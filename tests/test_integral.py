@@ -0,0 +1,63 @@
+import time
+
+import pytest
+from sympy import Integer, Integral, Symbol, pi
+
+from engine.integral import SYMBOLIC_BUDGET, _improper_result, compute_integral
+from engine.parser import parse_expression
+from engine.workers import run_bounded
+
+
+@pytest.fixture(autouse=True)
+def _in_process(monkeypatch):
+    monkeypatch.setattr("engine.workers.DEFAULT_WORKERS", 0)
+
+
+def _steps(expr, a, b):
+    return compute_integral(parse_expression(expr), parse_expression(a), parse_expression(b))
+
+
+@pytest.mark.parametrize("expr, a, b", [
+    ("1/x^2", "-1", "1"),
+    ("1/x", "-1", "1"),
+    ("tan(x)", "0", "2"),
+])
+def test_divergent_integrals_are_reported(expr, a, b):
+    result, steps = _steps(expr, a, b)
+    assert not result.is_finite
+    assert "divergente" in steps[-1]
+    # O valor de F(b) - F(a) (-2 para 1/x^2) não pode aparecer como resultado.
+    assert not any("Teorema Fundamental do Cálculo" in step for step in steps)
+
+
+def test_improper_integral_confirmed_by_sympy():
+    result, steps = _steps("sin(x)/x", "0", "oo")
+    assert result == pi / 2
+    assert any("confirma o valor" in step for step in steps)
+    assert not any("Resultado não confirmado" in step for step in steps)
+
+
+def test_undecided_singularity_does_not_show_the_ftc_value():
+    x = Symbol("x")
+    steps = []
+    result = _improper_result(1 / x**2, x, Integer(-1), Integer(1), Integer(-2), None, steps, 5)
+    assert isinstance(result, Integral)
+    assert "Integral imprópria" in steps[-1]
+
+
+def test_numeric_integral_returns_once_the_quadrature_converges(monkeypatch):
+    # Com o pool de verdade: a primitiva desta função faz o SymPy rodar por minutos.
+    monkeypatch.setattr("engine.workers.DEFAULT_WORKERS", 1)
+    run_bounded(abs, -1)
+    start = time.perf_counter()
+    result, steps = _steps("exp(x^2)*sin(x^3)", "0", "1")
+    assert time.perf_counter() - start < SYMBOLIC_BUDGET
+    assert result.is_Float
+    assert any("convergiu antes" in step for step in steps)
+
+
+def test_convergent_integral_is_cross_checked():
+    result, steps = _steps("x^2", "-1", "1")
+    assert result == parse_expression("2/3")
+    assert any("Conferência numérica" in step for step in steps)
+    assert not any("Resultado não confirmado" in step for step in steps)
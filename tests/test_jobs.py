@@ -0,0 +1,79 @@
+import threading
+import time
+
+from engine.jobs import checkpoint, step_list, submit
+from engine.workers import ComputationCancelled, run_bounded
+
+
+def _wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_steps_are_published_while_the_job_runs():
+    release = threading.Event()
+
+    def compute():
+        steps = step_list()
+        steps.append("primeiro")
+        release.wait(5)
+        steps.append("segundo")
+        return 42, steps
+
+    job = submit("teste", ("entrada",), compute)
+    assert _wait_until(lambda: job.steps == ["primeiro"])
+    assert not job.done()
+    release.set()
+    assert job.wait(5)
+    assert (job.result, job.steps, job.error) == (42, ["primeiro", "segundo"], None)
+
+
+def test_cancel_stops_the_job_at_the_next_checkpoint():
+    iterations = []
+
+    def compute():
+        while True:
+            checkpoint()
+            iterations.append(1)
+            time.sleep(0.01)
+
+    job = submit("teste", ("entrada",), compute)
+    assert _wait_until(lambda: iterations)
+    job.cancel()
+    assert job.wait(5)
+    assert isinstance(job.error, ComputationCancelled)
+    done = len(iterations)
+    time.sleep(0.1)
+    assert len(iterations) == done
+
+
+def test_cancel_interrupts_a_call_running_in_the_pool():
+    def compute():
+        run_bounded(time.sleep, 30, timeout=60)
+        return None, []
+
+    job = submit("teste", ("entrada",), compute)
+    time.sleep(0.5)
+    start = time.monotonic()
+    job.cancel()
+    assert job.wait(10)
+    assert time.monotonic() - start < 5
+    assert isinstance(job.error, ComputationCancelled)
+
+
+def test_errors_are_kept_on_the_job():
+    def compute():
+        raise ValueError("entrada inválida")
+
+    job = submit("teste", ("entrada",), compute)
+    assert job.wait(5)
+    assert isinstance(job.error, ValueError)
+
+
+def test_checkpoint_outside_a_job_does_nothing():
+    checkpoint()
+    steps = step_list()
+    steps.append("passo")
+    assert steps == ["passo"]
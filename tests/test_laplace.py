@@ -0,0 +1,23 @@
+import pytest
+from sympy import Heaviside, Symbol, inverse_laplace_transform, simplify
+
+from engine.laplace import transform
+from engine.parser import parse_expression
+
+t, s = Symbol("t"), Symbol("s")
+
+
+@pytest.mark.parametrize("text", [
+    "1/(s^2 + 2s + 1)",
+    "s/(s^2 - 2s + 1)",
+    "3/(s^2 + 4s + 4)",
+    "1/(2s^2 + 4s + 2)",
+    "(s + 1)/(s^2 - 1)",
+    "(s + 2)/(s^2 + 3s + 2)",
+    "(2s + 3)/(s^2 + 2s + 5)",
+])
+def test_inverse_table_matches_sympy(text):
+    F = parse_expression(text)
+    f, _ = transform(F, inverse=True)
+    expected = inverse_laplace_transform(F, s, t).subs(Heaviside(t), 1)
+    assert simplify(f - expected) == 0
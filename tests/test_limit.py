@@ -0,0 +1,62 @@
+import pytest
+from sympy import Abs, E, Integer, Symbol, exp, log, nan, oo, sin, sqrt
+
+from engine.cache import make_key, result_cache
+from engine.limit import compute_limit, direct_value
+
+x = Symbol("x")
+
+
+@pytest.fixture(autouse=True)
+def _in_process(monkeypatch):
+    monkeypatch.setattr("engine.workers.DEFAULT_WORKERS", 0)
+
+
+def test_continuous_functions_use_direct_substitution():
+    result, steps = compute_limit(sin(x) + x**2, Integer(1))
+    assert result == sin(1) + 1
+    assert any("substituição direta" in step for step in steps)
+    assert direct_value(sin(x) / x, x, Integer(0)) is None
+
+
+@pytest.mark.parametrize("expr, point, expected", [
+    (sin(x) / x, Integer(0), 1),
+    ((1 + 1 / x)**x, oo, E),
+    ((exp(x) - 1) / x, Integer(0), 1),
+    (x * sin(1 / x), oo, 1),
+])
+def test_two_sided_limits(expr, point, expected):
+    result, _ = compute_limit(expr, point)
+    assert result == expected
+
+
+@pytest.mark.parametrize("expr, right, left", [
+    (1 / x, oo, -oo),
+    (Abs(x) / x, 1, -1),
+    (exp(1 / x), oo, 0),
+])
+def test_different_one_sided_limits(expr, right, left):
+    assert compute_limit(expr, Integer(0), "+")[0] == right
+    assert compute_limit(expr, Integer(0), "-")[0] == left
+    result, steps = compute_limit(expr, Integer(0), "+-")
+    assert result is nan
+    assert any("não existe" in step for step in steps)
+
+
+def test_one_sided_limit_where_only_one_side_is_defined():
+    assert compute_limit(sqrt(x) * log(x), Integer(0), "+")[0] == 0
+
+
+def test_two_sided_limit_reuses_the_one_sided_results():
+    expr = sin(2 * x) / x
+    compute_limit(expr, Integer(0), "+-")
+    for side in "+-":
+        key = make_key("limit_side", expr, point=Integer(0), side=side, numeric=False)
+        assert result_cache.get(key) == (2, None)
+
+
+def test_numeric_probe_matches_the_symbolic_limit():
+    result, steps = compute_limit(sin(x) / x, Integer(0), "+", numeric=True)
+    assert result.is_Float
+    assert abs(result - 1) < 1e-10
+    assert any("Sonda numérica" in step for step in steps)
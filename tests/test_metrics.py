@@ -0,0 +1,55 @@
+import os
+import threading
+
+from engine import metrics
+
+
+def test_concurrent_tracks_write_metrics_without_errors(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_FILE", str(tmp_path / "math_app.prom"))
+    monkeypatch.setattr(metrics, "PROFILE_SLOW_MS", "100000")
+    monkeypatch.setattr(metrics, "registry", metrics.MetricsRegistry())
+    errors = []
+
+    def work():
+        for _ in range(100):
+            try:
+                with metrics.track("concurrent"):
+                    sum(range(100))
+            except Exception as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert metrics.registry.requests == {("concurrent", "ok"): 800}
+    assert os.listdir(tmp_path) == ["math_app.prom"]
+
+
+def test_unwritable_metrics_file_does_not_fail_the_request(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_FILE", str(tmp_path / "missing" / "math_app.prom"))
+    with metrics.track("unwritable"):
+        pass
+
+
+def test_profile_includes_work_done_in_the_pool(tmp_path, monkeypatch):
+    import pstats
+
+    from sympy import integrate, sin, symbols
+
+    from engine.workers import run_bounded
+
+    x = symbols("x")
+    monkeypatch.setattr(metrics, "PROFILE_SLOW_MS", "0")
+    monkeypatch.setattr(metrics, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr("engine.workers.DEFAULT_WORKERS", 1)
+    with metrics.track("profiled"):
+        run_bounded(integrate, x * sin(x), x)
+
+    (name,) = os.listdir(tmp_path)
+    stats = pstats.Stats(str(tmp_path / name)).stats
+    # O integrate rodou no worker: o perfil gravado precisa tê-lo.
+    assert any(func == "integrate" and "integrals" in path for path, _, func in stats)
@@ -0,0 +1,31 @@
+import time
+
+import pytest
+from sympy import Symbol, binomial, factorial, sqrt, pi
+
+from engine.parser import ParseError, parse_expression
+
+
+@pytest.mark.parametrize("text", [
+    "factorial(2^20)",
+    "(2^14)!",
+    "gamma(10^6)",
+    "binomial(10^7, 5*10^5)",
+    "factorial(factorial(10))",
+    "factorial(100000)",
+])
+def test_huge_factorials_are_refused_quickly(text):
+    start = time.perf_counter()
+    with pytest.raises(ParseError):
+        parse_expression(text)
+    assert time.perf_counter() - start < 1
+
+
+def test_small_factorials_still_evaluate():
+    n = Symbol("n")
+    assert parse_expression("5!") == 120
+    assert parse_expression("factorial(2^3)") == 40320
+    assert parse_expression("gamma(1/2)") == sqrt(pi)
+    assert parse_expression("binomial(10, 3)") == 120
+    assert parse_expression("factorial(n)") == factorial(n)
+    assert parse_expression("binomial(n, 2)") == binomial(n, 2)
@@ -0,0 +1,50 @@
+import pytest
+from sympy import Eq, Poly, Rational, expand, prod, sqrt, symbols
+
+from engine.polynomial import as_polynomial, numeric_roots, solve_polynomial
+
+x, y = symbols("x y")
+
+
+def _residuals(poly, solutions):
+    return [abs(complex(poly.as_expr().subs(x, r).evalf(30))) for r in solutions]
+
+
+def test_rational_and_quadratic_roots_are_exact():
+    poly = as_polynomial(Eq((x - 2) * (2 * x + 1) * (x**2 - 2), 0), x)
+    solutions, _ = solve_polynomial(poly)
+    assert solutions == [-sqrt(2), Rational(-1, 2), sqrt(2), 2]
+
+
+def test_repeated_roots_are_listed_once_with_multiplicity():
+    poly = as_polynomial(Eq(expand((x - 1)**3 * (x + 3)), 0), x)
+    solutions, steps = solve_polynomial(poly)
+    assert solutions == [-3, 1]
+    assert any("multiplicidade 3" in step for step in steps)
+
+
+@pytest.mark.parametrize("degree", [5, 12, 25])
+def test_numeric_roots_reach_the_requested_precision(degree):
+    # x^n - x - 1 é irredutível: todas as raízes vêm do caminho numérico.
+    poly = as_polynomial(Eq(x**degree - x - 1, 0), x)
+    solutions, _ = solve_polynomial(poly)
+    assert len(solutions) == degree
+    assert max(_residuals(poly, solutions)) < 1e-12
+
+
+def test_wilkinson_polynomial_roots_are_accurate():
+    poly = Poly(prod(x - k for k in range(1, 21)), x)
+    found = sorted(complex(r).real for r in numeric_roots(poly, 15))
+    assert max(abs(r - k) for r, k in zip(found, range(1, 21))) < 1e-10
+
+
+def test_more_digits_on_request():
+    poly = as_polynomial(Eq(x**5 - x - 1, 0), x)
+    (real_root,) = [r for r in solve_polynomial(poly, digits=40)[0] if r.is_real]
+    assert abs(poly.as_expr().subs(x, real_root).evalf(60)) < 1e-35
+
+
+def test_non_polynomial_equations_are_left_to_solve():
+    assert as_polynomial(Eq(x * y, 1), x) is None
+    assert as_polynomial(Eq(1 / x, 2), x) is None
+    assert as_polynomial(Eq(x, x), x) is None
@@ -0,0 +1,20 @@
+from sympy import Add, latex, symbols
+
+from engine.render import _elided, node_count
+
+x = symbols("x")
+
+
+def test_sum_that_fits_has_no_elision_marker():
+    # Todos os termos cabem no orçamento, embora a soma inteira passe dele por um nó.
+    expr = Add(*[x**k for k in range(1, 6)])
+    text = _elided(expr, node_count(expr) - 1)
+    assert "cdots" not in text
+    assert "mais" not in text
+
+
+def test_long_sum_counts_hidden_terms():
+    expr = Add(*[x**k for k in range(1, 40)])
+    text = _elided(expr, 30)
+    assert "mais" in text and "termos" in text
+    assert len(text) < len(latex(expr))
@@ -0,0 +1,62 @@
+import pytest
+from sympy import Float, Integer, Rational, Symbol, binomial, factorial, floor, gamma, pi, sin, sqrt, symbols
+
+from engine.summation import compute_summation, term_values
+
+k, a, x = symbols("k a x")
+
+
+@pytest.fixture(autouse=True)
+def _in_process(monkeypatch):
+    # Sem o pool de processos: os somatórios simbólicos rodam aqui mesmo.
+    monkeypatch.setattr("engine.workers.DEFAULT_WORKERS", 0)
+
+
+@pytest.mark.parametrize("expr, lower, upper, expected", [
+    (a * k, 1, 10, 55 * a),
+    (x**k, 0, 5, sum(x**i for i in range(6))),
+    (sin(a * k), 1, 10, sum(sin(i * a) for i in range(1, 11))),
+])
+def test_parametric_summands(expr, lower, upper, expected):
+    result, steps = compute_summation(expr, k, Integer(lower), Integer(upper))
+    assert (result - expected).expand() == 0
+    assert any("Para" in step for step in steps)
+
+
+def test_parametric_term_values_are_substituted():
+    values, exact = term_values(a * k, k, 1, 3)
+    assert exact
+    assert values == [a, 2 * a, 3 * a]
+
+
+def test_numeric_summands_keep_fast_paths():
+    assert compute_summation(k**2, k, Integer(1), Integer(10))[0] == 385
+    result, _ = compute_summation(sin(k), k, Integer(1), Integer(10))
+    assert result.is_Float
+    assert compute_summation(Symbol("k")**3, k, Integer(1), Integer(4))[0] == 100
+
+
+@pytest.mark.parametrize("expr, lower, upper, expected", [
+    (factorial(k), 1, 10, Integer(4037913)),
+    (binomial(10, k), 0, 10, Integer(1024)),
+    (1 / factorial(k), 0, 20, sum(Rational(1, factorial(i)) for i in range(21))),
+    (floor(k / 2), 1, 10, Integer(25)),
+    (gamma(k + Rational(1, 2)), 1, 5, Rational(1255, 32) * sqrt(pi)),
+])
+def test_integer_only_summands_are_summed_exactly(expr, lower, upper, expected):
+    # Fatoriais, binomiais e partes inteiras não passam pelo NumPy: os termos são exatos.
+    result, _ = compute_summation(expr, k, Integer(lower), Integer(upper))
+    assert result == expected
+    assert not result.atoms(Float)
+
+
+def test_integer_only_term_values_are_exact():
+    values, exact = term_values(factorial(k), k, 1, 5)
+    assert exact
+    assert values == [1, 2, 6, 24, 120]
+    assert term_values(floor(k / 2), k, 1, 4)[0] == [0, 1, 1, 2]
+
+
+def test_huge_exact_sums_are_rounded():
+    result, _ = compute_summation(factorial(k), k, Integer(1), Integer(3000))
+    assert result.is_Float
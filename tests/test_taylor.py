@@ -0,0 +1,20 @@
+import time
+
+from sympy import Integer, Symbol, expand, series, tan
+
+from engine.taylor import coefficients_by_composition, taylor_polynomial
+
+x = Symbol("x")
+
+
+def test_composition_at_nonzero_point_matches_series():
+    coeffs = coefficients_by_composition(tan(x), x, Integer(1), 6)
+    expected = series(tan(x), x, 1, 7).removeO()
+    assert expand(taylor_polynomial(coeffs, x, 1) - expected).equals(0)
+
+
+def test_composition_at_nonzero_point_stays_fast():
+    # Sem expandir os coeficientes a cada ordem, tan(x) em x0 = 1 não terminava em minutos.
+    start = time.perf_counter()
+    coefficients_by_composition(tan(x), x, Integer(1), 30)
+    assert time.perf_counter() - start < 20
@@ -0,0 +1,51 @@
+import os
+import threading
+import time
+
+import pytest
+
+from engine.workers import ComputationCancelled, ComputationTimeout, WorkerPool
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = WorkerPool(size=1)
+    yield pool
+    pool.shutdown()
+
+
+def test_worker_is_reused_between_calls(pool):
+    assert pool.run(os.getpid) == pool.run(os.getpid)
+
+
+def test_timeout_kills_and_replaces_the_worker(pool):
+    before = pool.run(os.getpid)
+    start = time.perf_counter()
+    with pytest.raises(ComputationTimeout):
+        pool.run(time.sleep, (30,), timeout=0.5)
+    assert time.perf_counter() - start < 5
+    # O processo que estourou o tempo foi morto; o pool segue atendendo com outro.
+    assert pool.run(os.getpid) != before
+
+
+def test_memory_limit_recycles_the_worker(pool):
+    before = pool.run(os.getpid)
+    with pytest.raises(ComputationTimeout):
+        pool.run(bytearray, (2 * 1024**3,), max_memory_mb=64)
+    assert pool.run(os.getpid) != before
+
+
+def test_exceptions_from_the_call_are_reraised(pool):
+    before = pool.run(os.getpid)
+    with pytest.raises(ValueError):
+        pool.run(int, ("não é número",))
+    assert pool.run(os.getpid) == before
+
+
+def test_cancel_event_interrupts_the_call(pool):
+    cancel = threading.Event()
+    threading.Timer(0.3, cancel.set).start()
+    start = time.perf_counter()
+    with pytest.raises(ComputationCancelled):
+        pool.run(time.sleep, (30,), timeout=60, cancel=cancel)
+    assert time.perf_counter() - start < 5